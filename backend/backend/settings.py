@@ -38,11 +38,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'books.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware
     'django.middleware.common.CommonMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'books.db_routers.ReadYourWritesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -68,11 +70,95 @@ TEMPLATES = [
 WSGI_APPLICATION = 'backend.wsgi.application'
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite by default. Set DATABASE_ENGINE=postgresql (plus the DATABASE_*
+# variables below) to use PostgreSQL, which handles concurrent writers.
+DATABASE_ENGINE = os.getenv('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE in ('postgres', 'postgresql'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DATABASE_NAME', 'books'),
+            'USER': os.getenv('DATABASE_USER', ''),
+            'PASSWORD': os.getenv('DATABASE_PASSWORD', ''),
+            'HOST': os.getenv('DATABASE_HOST', ''),
+            'PORT': os.getenv('DATABASE_PORT', ''),
+            # Persistent connections, checked before reuse
+            'CONN_MAX_AGE': int(os.getenv('DATABASE_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
     }
+    # Read replicas, e.g. DATABASE_REPLICA_HOSTS=replica-1,replica-2
+    for index, host in enumerate(filter(None, os.getenv('DATABASE_REPLICA_HOSTS', '').split(',')), 1):
+        DATABASES[f'replica_{index}'] = {
+            **DATABASES['default'],
+            'HOST': host.strip(),
+            'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+            'TEST': {'MIRROR': 'default'},
+        }
+    # Django's built-in psycopg pool (needs psycopg[pool]). Pooled
+    # connections replace persistent ones, so CONN_MAX_AGE must be 0.
+    DATABASE_POOL_MAX_SIZE = int(os.getenv('DATABASE_POOL_MAX_SIZE', 0))
+    if DATABASE_POOL_MAX_SIZE:
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', 2)),
+            'max_size': DATABASE_POOL_MAX_SIZE,
+            'timeout': int(os.getenv('DATABASE_POOL_TIMEOUT', 10)),
+        }
+else:
+    # WAL lets readers run alongside the single writer; writers wait up to
+    # the busy timeout for the lock instead of failing straight away, and
+    # IMMEDIATE transactions take the lock up front so a read-then-write
+    # transaction can't fail half way through on a lock upgrade.
+    SQLITE_PRAGMAS = (
+        f"PRAGMA journal_mode={os.getenv('SQLITE_JOURNAL_MODE', 'WAL')}; "
+        f"PRAGMA synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')}; "
+        f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))}; "
+        "PRAGMA temp_store=MEMORY; "
+        "PRAGMA foreign_keys=ON;"
+    )
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'init_command': SQLITE_PRAGMAS,
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+    # Optional read-only replica alias: SQLITE_READ_CONNECTION opens the
+    # same file, SQLITE_REPLICA_NAME a second file standing in for a replica
+    # locally (refresh it with e.g. `sqlite3 db.sqlite3 ".backup replica.sqlite3"`)
+    SQLITE_REPLICA_NAME = os.getenv('SQLITE_REPLICA_NAME', '')
+    if SQLITE_REPLICA_NAME or os.getenv('SQLITE_READ_CONNECTION', '').lower() in ('1', 'true', 'yes'):
+        DATABASES['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': SQLITE_REPLICA_NAME or DATABASES['default']['NAME'],
+            'OPTIONS': {
+                'init_command': SQLITE_PRAGMAS + ' PRAGMA query_only=ON;',
+            },
+            'TEST': {'MIRROR': 'default'},
+        }
+
+# Safe read-only actions (books.db_routers.ReplicaReadMixin) read from a
+# replica; a user whose request wrote reads from the primary for the next
+# DATABASE_REPLICA_STICKY_SECONDS
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv('DATABASE_REPLICA_STICKY_SECONDS', 5))
+DATABASE_ROUTERS = ['books.db_routers.ReadWriteRouter']
+
+# Cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'google_books': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'google-books',
+    },
 }
 
 # Password validation
@@ -111,7 +197,8 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'books.pagination.KeysetPagination',
 }
 
 # CORS Settings
@@ -140,4 +227,103 @@ CORS_ALLOW_HEADERS = [
 ]
 
 # Google Books API
-GOOGLE_BOOKS_API_KEY = os.getenv('GOOGLE_BOOKS_API_KEY')
\ No newline at end of file
+GOOGLE_BOOKS_API_KEY = os.getenv('GOOGLE_BOOKS_API_KEY')
+
+# Google Books response cache and HTTP connection pool
+GOOGLE_BOOKS_CACHE_TTL = int(os.getenv('GOOGLE_BOOKS_CACHE_TTL', 3600))
+GOOGLE_BOOKS_CACHE_MAX_ENTRIES = int(os.getenv('GOOGLE_BOOKS_CACHE_MAX_ENTRIES', 1024))
+GOOGLE_BOOKS_CACHE_ALIAS = 'google_books'
+GOOGLE_BOOKS_HTTP_POOL_SIZE = 10
+GOOGLE_BOOKS_HTTP_RETRIES = 3
+GOOGLE_BOOKS_HTTP_BACKOFF = 0.3
+GOOGLE_BOOKS_HTTP_TIMEOUT = 10
+
+
+# Store remote search results in the local catalog (as an upsert_books job)
+GOOGLE_BOOKS_UPSERT_REMOTE_RESULTS = True
+GOOGLE_BOOKS_UPSERT_IN_BACKGROUND = True
+
+# Bulk book import
+BULK_IMPORT_BATCH_SIZE = 500
+BULK_IMPORT_MAX_WORKERS = 8
+BULK_IMPORT_MAX_ITEMS = 1000
+
+# Async Google Books client (books/async_services.py, requires httpx)
+GOOGLE_BOOKS_ASYNC_MAX_CONNECTIONS = 20
+GOOGLE_BOOKS_ASYNC_CONCURRENCY = 10
+GOOGLE_BOOKS_ASYNC_TIMEOUT = 5
+GOOGLE_BOOKS_FETCH_MAX_IDS = 40
+
+# Batch reading progress sync for offline clients
+PROGRESS_SYNC_MAX_ITEMS = 500
+
+# Per-user cache of rendered list responses (books/view_cache.py)
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TTL = 300
+
+# Rows fetched per database round trip by the streaming library export
+EXPORT_CHUNK_SIZE = 500
+
+# Streaming library import: rows written per transaction
+LIBRARY_IMPORT_CHUNK_SIZE = 200
+
+# Background job queue (books/jobs.py, run with `manage.py run_jobs`)
+JOBS_WORKER_CONCURRENCY = 4
+JOBS_POLL_INTERVAL = 1
+JOBS_MAX_ATTEMPTS = 3
+JOBS_RETRY_BACKOFF = 30
+# Running jobs touch heartbeat_at every JOBS_HEARTBEAT_INTERVAL seconds;
+# one silent for JOBS_LOCK_TIMEOUT seconds is assumed to have lost its worker
+JOBS_HEARTBEAT_INTERVAL = 30
+JOBS_LOCK_TIMEOUT = 120
+# Succeeded and failed jobs are purged (by the purge_jobs periodic job) after
+JOBS_RETENTION_DAYS = 7
+# Per-kind limits on jobs running at once in one worker
+JOBS_CONCURRENCY = {
+    'import_books': 1,
+    'refresh_book': 4,
+    'upsert_books': 1,
+    'refresh_catalog': 1,
+    'fetch_thumbnail': 4,
+    'purge_jobs': 1,
+}
+
+# Google Books rate limit (token bucket shared through GOOGLE_BOOKS_CACHE_ALIAS),
+# circuit breaker and stale fallback (books/resilience.py)
+GOOGLE_BOOKS_RATE_LIMIT = float(os.getenv('GOOGLE_BOOKS_RATE_LIMIT', 10))
+GOOGLE_BOOKS_RATE_BURST = int(os.getenv('GOOGLE_BOOKS_RATE_BURST', 20))
+GOOGLE_BOOKS_RATE_LIMIT_WAIT = 1
+GOOGLE_BOOKS_CIRCUIT_FAILURES = 5
+GOOGLE_BOOKS_CIRCUIT_RECOVERY = 30
+GOOGLE_BOOKS_STALE_TTL = 86400
+
+# Incremental catalog refresh (books/catalog_refresh.py): books not fetched
+# within the max age are re-fetched, most-shelved first
+CATALOG_REFRESH_MAX_AGE_DAYS = int(os.getenv('CATALOG_REFRESH_MAX_AGE_DAYS', 30))
+CATALOG_REFRESH_BATCH_SIZE = 100
+CATALOG_REFRESH_LIMIT = 1000
+
+# Jobs queued by `run_jobs` workers every N seconds
+JOBS_PERIODIC = {
+    'refresh_catalog': 3600,
+    'purge_jobs': 86400,
+}
+
+# Thumbnail proxy (/api/books/{id}/thumbnail/) and its on-disk LRU cache
+THUMBNAIL_CACHE_DIR = os.getenv('THUMBNAIL_CACHE_DIR', BASE_DIR / 'thumbnail_cache')
+THUMBNAIL_CACHE_MAX_BYTES = int(os.getenv('THUMBNAIL_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+THUMBNAIL_MAX_IMAGE_BYTES = 2 * 1024 * 1024
+THUMBNAIL_HTTP_TIMEOUT = 10
+# Each redirect target must also be on THUMBNAIL_ALLOWED_HOSTS
+THUMBNAIL_MAX_REDIRECTS = 3
+THUMBNAIL_MAX_AGE = 7 * 24 * 3600
+THUMBNAIL_ALLOWED_HOSTS = ['books.google.com', 'books.googleusercontent.com']
+
+# Request instrumentation (books/instrumentation.py): Server-Timing headers
+# and per-process metrics at /api/metrics/ (staff or METRICS_TOKEN)
+METRICS_ENABLED = True
+METRICS_SERVER_TIMING = True
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_SLOW_REQUEST_MS = int(os.getenv('METRICS_SLOW_REQUEST_MS', 500))
+METRICS_SLOW_SAMPLE_RATE = 1.0
+METRICS_SLOW_SAMPLE_SIZE = 100
@@ -1,3 +1,4 @@
+import logging
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.authtoken import views as auth_views
@@ -8,6 +9,8 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 
+logger = logging.getLogger(__name__)
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register(request):
@@ -35,7 +38,7 @@ def register(request):
         }, status=status.HTTP_201_CREATED)
         
     except Exception as e:
-        print(f"Registration error: {str(e)}")  # Debug print
+        logger.exception('Registration error')
         return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['POST'])
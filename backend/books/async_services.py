@@ -0,0 +1,200 @@
+# backend/books/async_services.py
+import asyncio
+import copy
+import logging
+import os
+import weakref
+from typing import Dict, Iterable, List, Optional
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from .cache import MISSING
+from .instrumentation import UPSTREAM, timed
+from .resilience import AsyncSingleFlight, UpstreamUnavailable
+from .services import GoogleBooksService, circuit_breaker, rate_limiter, response_cache, stale_cache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+# One client per event loop: an httpx.AsyncClient can't be shared across loops
+_clients = weakref.WeakKeyDictionary()
+# Tasks closing those clients when their loop shuts down
+_closers = set()
+in_flight = AsyncSingleFlight()
+
+# Failures callers handle; UpstreamUnavailable means the call wasn't made
+UPSTREAM_ERRORS = (UpstreamUnavailable, asyncio.TimeoutError) + ((httpx.HTTPError,) if httpx else ())
+
+
+async def _close_on_shutdown(client: 'httpx.AsyncClient') -> None:
+    # asyncio.run() (and so async_to_sync) cancels the tasks left on a loop
+    # before closing it, which closes the client's connections
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await client.aclose()
+
+
+class AsyncGoogleBooksService:
+    """
+    asyncio variant of GoogleBooksService for fanning out many upstream calls
+    from a single worker. Shares the response and stale caches, the rate
+    limiter, the circuit breaker and parsing with the synchronous service.
+    Requires httpx.
+    """
+
+    @staticmethod
+    def _build_client() -> 'httpx.AsyncClient':
+        if httpx is None:
+            raise ImproperlyConfigured('AsyncGoogleBooksService requires the httpx package')
+        max_connections = getattr(settings, 'GOOGLE_BOOKS_ASYNC_MAX_CONNECTIONS', 20)
+        return httpx.AsyncClient(
+            base_url=GoogleBooksService.BASE_URL,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=getattr(settings, 'GOOGLE_BOOKS_HTTP_TIMEOUT', 10),
+        )
+
+    @staticmethod
+    def get_client() -> 'httpx.AsyncClient':
+        loop = asyncio.get_running_loop()
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = AsyncGoogleBooksService._build_client()
+            _clients[loop] = client
+            closer = loop.create_task(_close_on_shutdown(client))
+            _closers.add(closer)
+            closer.add_done_callback(_closers.discard)
+        return client
+
+    @staticmethod
+    async def _get(client, path: str, params: Dict, timeout: Optional[float]):
+        """
+        GET from the API through the circuit breaker and the shared rate
+        limiter, like GoogleBooksService._get, raising for error statuses.
+        Their cache round trips run in a thread.
+        """
+        if not await sync_to_async(circuit_breaker.allow)():
+            raise UpstreamUnavailable('Google Books circuit is open')
+        if not await rate_limiter.aacquire(getattr(settings, 'GOOGLE_BOOKS_RATE_LIMIT_WAIT', 1)):
+            raise UpstreamUnavailable('Google Books rate limit exceeded')
+
+        params = {**params, 'key': os.getenv('GOOGLE_BOOKS_API_KEY')}
+        if timeout is None:
+            timeout = getattr(settings, 'GOOGLE_BOOKS_ASYNC_TIMEOUT', 5)
+        try:
+            with timed(UPSTREAM):
+                response = await asyncio.wait_for(client.get(path, params=params), timeout)
+        except (httpx.HTTPError, asyncio.TimeoutError):
+            await sync_to_async(circuit_breaker.record_failure)()
+            raise
+
+        if response.status_code == 429 or response.status_code >= 500:
+            await sync_to_async(circuit_breaker.record_failure)()
+        else:
+            await sync_to_async(circuit_breaker.record_success)()
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    async def _fetch(cache_key: str, fetch):
+        """
+        Return the cached value for `cache_key`, or await `fetch` (shared
+        with identical requests already in flight on this loop) and cache
+        its result. When the upstream fails, fall back to the last good copy.
+        """
+        cached = await sync_to_async(response_cache.get)(cache_key)
+        if cached is not MISSING:
+            return copy.deepcopy(cached)
+
+        async def fetch_and_store():
+            result = await fetch()
+            if result is not None:
+                await sync_to_async(response_cache.set)(cache_key, copy.deepcopy(result))
+                await sync_to_async(stale_cache.set)(cache_key, copy.deepcopy(result))
+            return result
+
+        try:
+            return copy.deepcopy(await in_flight.do(cache_key, fetch_and_store))
+        except UPSTREAM_ERRORS:
+            stale = await sync_to_async(stale_cache.get)(cache_key)
+            if stale is MISSING:
+                raise
+            return copy.deepcopy(stale)
+
+    @staticmethod
+    async def search_books(query: str, max_results: int = 10,
+                           timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Search books using the Google Books API.
+        Returns a list of book data dictionaries.
+        """
+        cache_key = GoogleBooksService._cache_key(
+            'search', GoogleBooksService._normalize_query(query), max_results
+        )
+
+        async def fetch():
+            response = await AsyncGoogleBooksService._get(
+                AsyncGoogleBooksService.get_client(), '/volumes',
+                {'q': query, 'maxResults': max_results}, timeout
+            )
+            books = []
+            for item in response.json().get('items', []):
+                book_data = GoogleBooksService._parse_book_data(item)
+                if book_data:
+                    books.append(book_data)
+            return books
+
+        try:
+            return await AsyncGoogleBooksService._fetch(cache_key, fetch)
+        except UPSTREAM_ERRORS as e:
+            logger.warning('Error searching books: %r', e)
+            return []
+
+    @staticmethod
+    async def get_book_by_id(google_books_id: str,
+                             timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Fetch a specific book by its Google Books ID.
+        Returns book data dictionary if found, None otherwise.
+        """
+        cache_key = GoogleBooksService._cache_key('volume', google_books_id)
+
+        async def fetch():
+            response = await AsyncGoogleBooksService._get(
+                AsyncGoogleBooksService.get_client(), f'/volumes/{google_books_id}', {}, timeout
+            )
+            return GoogleBooksService._parse_book_data(response.json())
+
+        try:
+            return await AsyncGoogleBooksService._fetch(cache_key, fetch)
+        except UPSTREAM_ERRORS as e:
+            logger.warning('Error fetching book %s: %r', google_books_id, e)
+            return None
+
+    @staticmethod
+    async def get_books_by_ids(google_books_ids: Iterable[str],
+                               timeout: Optional[float] = None,
+                               concurrency: Optional[int] = None) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch several books concurrently, with at most `concurrency` requests
+        in flight and `timeout` seconds per call. Cancelling the caller
+        cancels all outstanding requests.
+        """
+        google_books_ids = list(dict.fromkeys(google_books_ids))
+        if concurrency is None:
+            concurrency = getattr(settings, 'GOOGLE_BOOKS_ASYNC_CONCURRENCY', 10)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(google_books_id):
+            async with semaphore:
+                return await AsyncGoogleBooksService.get_book_by_id(google_books_id, timeout)
+
+        results = await asyncio.gather(*(fetch(google_books_id) for google_books_id in google_books_ids))
+        return dict(zip(google_books_ids, results))
@@ -0,0 +1,89 @@
+# backend/books/async_views.py
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework import exceptions
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework.request import Request
+from .async_services import AsyncGoogleBooksService
+from .search import (
+    new_remote_results, search_local_results, serialize_remote_results, upsert_remote_results
+)
+
+# Native Django async views, so upstream calls don't hold a worker thread
+# when served through backend/asgi.py. DRF views are synchronous, so these
+# authenticate with DRF's authentication classes directly.
+
+
+@sync_to_async
+def _authenticate(request):
+    drf_request = Request(
+        request,
+        authenticators=[TokenAuthentication(), SessionAuthentication()]
+    )
+    try:
+        user = drf_request.user
+    except exceptions.AuthenticationFailed:
+        return None
+    return user if user.is_authenticated else None
+
+
+def _unauthorized():
+    return JsonResponse(
+        {'detail': 'Authentication credentials were not provided.'},
+        status=401
+    )
+
+
+@require_GET
+async def search_google_books(request):
+    if await _authenticate(request) is None:
+        return _unauthorized()
+
+    query = request.GET.get('q', '')
+    if not query:
+        return JsonResponse({'error': 'Search query is required'}, status=400)
+    try:
+        max_results = int(request.GET.get('max_results', 10))
+    except ValueError:
+        return JsonResponse({'error': 'max_results must be an integer'}, status=400)
+
+    if request.GET.get('source', 'hybrid') == 'remote':
+        books = await AsyncGoogleBooksService.search_books(query, max_results)
+        return JsonResponse(books, safe=False)
+
+    results = await sync_to_async(search_local_results)(query, max_results)
+    if len(results) >= max_results:
+        return JsonResponse(results, safe=False)
+
+    remote_books = new_remote_results(
+        results, await AsyncGoogleBooksService.search_books(query, max_results)
+    )
+    if getattr(settings, 'GOOGLE_BOOKS_UPSERT_REMOTE_RESULTS', True):
+        await sync_to_async(upsert_remote_results)(remote_books)
+    return JsonResponse(
+        results + serialize_remote_results(remote_books[:max_results - len(results)]), safe=False
+    )
+
+
+@require_GET
+async def fetch_google_books(request):
+    """
+    Fetch several Google Books volumes concurrently: ?ids=id1,id2,...
+    Returns a mapping of ID to book data, or null for IDs that failed.
+    """
+    if await _authenticate(request) is None:
+        return _unauthorized()
+
+    ids = [value.strip() for value in request.GET.get('ids', '').split(',') if value.strip()]
+    if not ids:
+        return JsonResponse({'error': 'ids is required'}, status=400)
+    if len(ids) > settings.GOOGLE_BOOKS_FETCH_MAX_IDS:
+        return JsonResponse(
+            {'error': f'At most {settings.GOOGLE_BOOKS_FETCH_MAX_IDS} ids can be fetched per request'},
+            status=400
+        )
+
+    books = await AsyncGoogleBooksService.get_books_by_ids(ids)
+    return JsonResponse(books)
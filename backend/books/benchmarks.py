@@ -0,0 +1,487 @@
+# backend/books/benchmarks.py
+import hashlib
+import json
+import math
+import platform
+import random
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from .catalog_refresh import count_shelvings
+from .models import Book, Shelf, UserBook, ReadingSession, Note, Review
+from .review_feed import sync_reviews
+from .search import get_search_backend
+from .services import GoogleBooksService, rate_limiter, response_cache
+from .statistics import rebuild_statistics
+from .taxonomy import sync_book_taxonomy
+
+GENRES = [
+    'Fiction', 'Fantasy', 'Science Fiction', 'Mystery', 'History', 'Biography',
+    'Science', 'Philosophy', 'Poetry', 'Romance', 'Thriller', 'Travel',
+]
+WORDS = [
+    'shadow', 'river', 'empire', 'garden', 'winter', 'stone', 'light', 'memory',
+    'ocean', 'machine', 'silent', 'crown', 'forest', 'letter', 'city', 'storm',
+    'glass', 'night', 'journey', 'secret', 'fire', 'island', 'mirror', 'song',
+]
+STATUSES = ['want_to_read', 'reading', 'read']
+
+
+def _title(rng: random.Random) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))).title()
+
+
+def _author(rng: random.Random) -> str:
+    return f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}son'
+
+
+def generate_dataset(users: int = 20, books: int = 2000, books_per_user: int = 100,
+                     sessions_per_book: int = 3, notes_per_book: int = 1,
+                     seed: int = 42) -> Dict:
+    """
+    Fill the current database with a reproducible synthetic library: a
+    catalog of `books`, and `users` readers who each shelve
+    `books_per_user` of them with reading sessions, notes and reviews.
+    Popular books are shelved more often, as in a real catalog. Returns the
+    row counts.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    catalog = Book.objects.bulk_create([
+        Book(
+            google_books_id=f'bench{index:06d}',
+            title=_title(rng),
+            authors=[_author(rng) for _ in range(rng.choice([1, 1, 1, 2]))],
+            description=' '.join(rng.choice(WORDS) for _ in range(40)),
+            page_count=rng.randint(80, 900),
+            categories=rng.sample(GENRES, rng.randint(1, 2)),
+            language='en',
+        )
+        for index in range(books)
+    ], batch_size=500)
+
+    readers = User.objects.bulk_create([
+        User(username=f'bench{index}', email=f'bench{index}@example.com', password=make_password(None))
+        for index in range(users)
+    ])
+    Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in readers])
+
+    shelves = Shelf.objects.bulk_create([
+        Shelf(user=user, name=name, is_default=name == 'Favorites')
+        for user in readers
+        for name in ('Favorites', 'To Buy', 'Book Club')
+    ])
+    shelves_by_user = {}
+    for shelf in shelves:
+        shelves_by_user.setdefault(shelf.user_id, []).append(shelf)
+
+    # Zipf-like popularity: low indexes are picked far more often
+    weights = [1 / (rank + 1) for rank in range(len(catalog))]
+    user_books = []
+    for user in readers:
+        picked = set()
+        while len(picked) < min(books_per_user, len(catalog)):
+            picked.update(rng.choices(range(len(catalog)), weights=weights, k=books_per_user))
+        for index in rng.sample(sorted(picked), min(books_per_user, len(picked))):
+            book = catalog[index]
+            reading_status = rng.choice(STATUSES)
+            user_books.append(UserBook(
+                user=user,
+                book=book,
+                status=reading_status,
+                current_page=rng.randint(0, book.page_count) if reading_status != 'want_to_read' else 0,
+                rating=rng.randint(1, 5) if reading_status == 'read' else None,
+            ))
+    user_books = UserBook.objects.bulk_create(user_books, batch_size=500)
+    count_shelvings(user_book.book_id for user_book in user_books)
+
+    links = []
+    sessions = []
+    notes = []
+    reviews = []
+    Link = UserBook.shelves.through
+    for user_book in user_books:
+        for shelf in rng.sample(shelves_by_user[user_book.user_id], rng.randint(0, 2)):
+            links.append(Link(userbook_id=user_book.id, shelf_id=shelf.id))
+        if user_book.status == 'want_to_read':
+            continue
+        page = 0
+        for _ in range(sessions_per_book):
+            start = now - timedelta(days=rng.randint(0, 90), minutes=rng.randint(0, 1440))
+            pages = rng.randint(5, 60)
+            sessions.append(ReadingSession(
+                user_book=user_book,
+                start_time=start,
+                end_time=start + timedelta(minutes=rng.randint(10, 120)),
+                start_page=page,
+                end_page=page + pages,
+            ))
+            page += pages
+        for _ in range(notes_per_book):
+            notes.append(Note(
+                user_book=user_book,
+                content=' '.join(rng.choice(WORDS) for _ in range(20)),
+                page_number=rng.randint(1, 300),
+            ))
+        if user_book.status == 'read' and rng.random() < 0.5:
+            reviews.append(Review(
+                user_book=user_book,
+                content=' '.join(rng.choice(WORDS) for _ in range(60)),
+                is_public=rng.random() < 0.7,
+            ))
+    Link.objects.bulk_create(links, batch_size=1000)
+    ReadingSession.objects.bulk_create(sessions, batch_size=1000)
+    Note.objects.bulk_create(notes, batch_size=1000)
+    Review.objects.bulk_create(reviews, batch_size=1000)
+
+    # bulk_create skips the signals that maintain these
+    sync_reviews(review for review in reviews if review.is_public)
+    get_search_backend().rebuild()
+    sync_book_taxonomy(catalog)
+    for user in readers:
+        rebuild_statistics(user)
+
+    return {
+        'users': len(readers),
+        'books': len(catalog),
+        'user_books': len(user_books),
+        'sessions': len(sessions),
+        'notes': len(notes),
+        'reviews': len(reviews),
+        'seed': seed,
+    }
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _volume(self, google_books_id: str) -> Dict:
+        digest = int(hashlib.sha1(google_books_id.encode()).hexdigest(), 16)
+        return {
+            'id': google_books_id,
+            'volumeInfo': {
+                'title': f'{WORDS[digest % len(WORDS)].title()} {WORDS[digest // 7 % len(WORDS)].title()}',
+                'authors': [f'Author {digest % 997}'],
+                'publishedDate': str(1900 + digest % 120),
+                'description': 'Synthetic volume served by the benchmark stub.',
+                'pageCount': 100 + digest % 700,
+                'categories': [GENRES[digest % len(GENRES)]],
+                'language': 'en',
+                'imageLinks': {'thumbnail': f'http://books.google.com/books/content?id={google_books_id}'},
+            },
+        }
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip('/')
+        if path.endswith('/volumes'):
+            params = parse_qs(parts.query)
+            query = params.get('q', [''])[0]
+            count = int(params.get('maxResults', ['10'])[0])
+            seed = hashlib.sha1(query.encode()).hexdigest()[:8]
+            body = {'items': [self._volume(f'stub{seed}{index}') for index in range(count)]}
+        elif '/volumes/' in path:
+            body = self._volume(path.rsplit('/', 1)[1])
+        else:
+            self.send_error(404)
+            return
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class GoogleBooksStub:
+    """
+    Local stand-in for the Google Books API with optional added latency.
+    Used as a context manager, it points GoogleBooksService at itself.
+    """
+
+    def __init__(self, latency_ms: float = 0):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency_ms / 1000
+        self.url = f'http://127.0.0.1:{self.server.server_port}/books/v1'
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        self._base_url = GoogleBooksService.BASE_URL
+        # The stub is local: rate limiting would measure the limiter
+        self._rate = rate_limiter.rate
+        GoogleBooksService.BASE_URL = self.url
+        rate_limiter.rate = 0
+        return self
+
+    def __exit__(self, *exc_info):
+        GoogleBooksService.BASE_URL = self._base_url
+        rate_limiter.rate = self._rate
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def _rss_mb() -> float:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 1024 / 1024
+    except OSError:
+        return _peak_rss_mb()
+
+
+class BenchmarkClient(APIClient):
+    """
+    An API client authenticated as one benchmark user, with that user's
+    library entries at hand.
+    """
+
+    def __init__(self, user: User, **kwargs):
+        super().__init__(**kwargs)
+        token, _ = Token.objects.get_or_create(user=user)
+        self.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.user_books = list(
+            UserBook.objects.filter(user=user).order_by('id').values_list('id', flat=True)
+        )
+
+
+class Scenario:
+    """
+    A named request pattern. `request(client, iteration)` issues one
+    request; `before(context)`, if given, runs untimed before each request,
+    e.g. to drop response caches. With `concurrency` above 1 the timed
+    requests are spread over that many threads, each with its own client
+    (and so its own user and database connection).
+    """
+
+    def __init__(self, name: str, request: Callable, before: Optional[Callable] = None,
+                 description: str = '', concurrency: int = 1):
+        self.name = name
+        self.request = request
+        self.before = before
+        self.description = description
+        self.concurrency = concurrency
+
+
+def _clear_response_caches(context):
+    caches['default'].clear()
+    response_cache.clear()
+
+
+def build_scenarios(context: Dict) -> Dict[str, Scenario]:
+    """
+    The benchmark scenarios, given a context with the 'search_terms' to
+    cycle through.
+    """
+    terms = context['search_terms']
+
+    def progress(client, i):
+        return client.post(
+            f'/api/userbooks/{client.user_books[i % len(client.user_books)]}/update_progress/',
+            {'current_page': 10 + i}, format='json'
+        )
+
+    scenarios = [
+        Scenario('list', lambda client, i: client.get('/api/userbooks/'), _clear_response_caches,
+                 'First page of the library with response caches dropped'),
+        Scenario('list_cached', lambda client, i: client.get('/api/userbooks/'), None,
+                 'Repeated library page (response cache warm)'),
+        Scenario('search', lambda client, i: client.get('/api/books/search/', {'q': terms[i % len(terms)]}),
+                 None, 'Local full-text search'),
+        Scenario('search_remote', lambda client, i: client.get(
+            '/api/books/search_google_books/', {'q': f'{terms[i % len(terms)]} {i}', 'source': 'remote'}
+        ), None, 'Uncached Google Books search against the stub'),
+        Scenario('progress_update', progress, None, 'Reading progress update'),
+        Scenario('concurrent_progress', progress, None,
+                 'Reading progress updates from 8 users at once (write concurrency)', concurrency=8),
+        Scenario('statistics', lambda client, i: client.get('/api/userbooks/statistics/'),
+                 _clear_response_caches, 'Reading statistics'),
+        Scenario('review_feed', lambda client, i: client.get('/api/reviews/'), _clear_response_caches,
+                 'Public review feed with response caches dropped'),
+    ]
+    return {scenario.name: scenario for scenario in scenarios}
+
+
+@contextmanager
+def _count_queries():
+    """
+    Count the queries this thread makes on every database alias.
+    """
+    with ExitStack() as stack:
+        captured = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections]
+        counter = {'queries': 0}
+        yield counter
+    counter['queries'] = sum(len(capture.captured_queries) for capture in captured)
+
+
+def _timed_request(scenario: Scenario, client, i: int):
+    with _count_queries() as counted:
+        start = time.perf_counter()
+        try:
+            status_code = str(scenario.request(client, i).status_code)
+        except Exception as e:
+            status_code = type(e).__name__
+        elapsed = time.perf_counter() - start
+    return elapsed * 1000, counted['queries'], status_code
+
+
+def run_scenario(scenario: Scenario, clients: List, context: Dict, iterations: int = 50,
+                 warmup: int = 5) -> Dict:
+    for i in range(warmup):
+        if scenario.before:
+            scenario.before(context)
+        scenario.request(clients[0], i)
+
+    concurrency = min(scenario.concurrency, len(clients))
+
+    def worker(index):
+        samples = []
+        try:
+            for i in range(warmup + index, warmup + iterations, concurrency):
+                if scenario.before:
+                    scenario.before(context)
+                samples.append(_timed_request(scenario, clients[index], i))
+        finally:
+            if concurrency > 1:
+                connection.close()
+        return samples
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = [sample for result in pool.map(worker, range(concurrency)) for sample in result]
+    else:
+        samples = worker(0)
+    wall = time.perf_counter() - start
+
+    latencies = [latency for latency, _, _ in samples]
+    status_codes = {}
+    for _, _, status_code in samples:
+        status_codes[status_code] = status_codes.get(status_code, 0) + 1
+    return {
+        'requests': iterations,
+        'concurrency': concurrency,
+        'p50_ms': round(_percentile(latencies, 50), 3),
+        'p95_ms': round(_percentile(latencies, 95), 3),
+        'p99_ms': round(_percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'max_ms': round(max(latencies), 3),
+        'throughput_rps': round(iterations / wall, 1) if wall else 0.0,
+        'queries_per_request': round(sum(queries for _, queries, _ in samples) / len(samples), 2),
+        'rss_mb': round(_rss_mb(), 1),
+        'status_codes': status_codes,
+    }
+
+
+def _database_meta() -> Dict:
+    meta = {'database': connection.vendor, 'aliases': sorted(connections)}
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            meta['journal_mode'] = cursor.fetchone()[0]
+            cursor.execute('PRAGMA synchronous')
+            meta['synchronous'] = cursor.fetchone()[0]
+    else:
+        meta['pooled'] = 'pool' in connection.settings_dict.get('OPTIONS', {})
+        meta['conn_max_age'] = connection.settings_dict.get('CONN_MAX_AGE')
+    return meta
+
+
+def run_benchmarks(scenario_names: Optional[List[str]] = None, iterations: int = 50,
+                   warmup: int = 5, stub_latency_ms: float = 0) -> Dict:
+    """
+    Run the scenarios against the data in the current database through the
+    full middleware stack, with Google Books replaced by a local stub.
+    Single-client scenarios run as the first benchmark user; concurrent
+    ones add the next users. Returns the machine-readable results.
+    """
+    context = {'search_terms': WORDS[:12]}
+    scenarios = build_scenarios(context)
+    names = scenario_names or list(scenarios)
+    unknown = set(names) - set(scenarios)
+    if unknown:
+        raise ValueError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+
+    concurrency = max(scenarios[name].concurrency for name in names)
+    users = list(User.objects.filter(username__startswith='bench').order_by('id')[:concurrency])
+    if not users:
+        raise ValueError('No benchmark data: run generate_dataset() first')
+    # Concurrent requests that fail (e.g. "database is locked") are
+    # reported as 500s rather than raised
+    clients = [BenchmarkClient(user, raise_request_exception=False) for user in users]
+
+    results = {}
+    with GoogleBooksStub(latency_ms=stub_latency_ms):
+        for name in names:
+            results[name] = run_scenario(scenarios[name], clients, context, iterations, warmup)
+
+    return {
+        'meta': {
+            'iterations': iterations,
+            'warmup': warmup,
+            'stub_latency_ms': stub_latency_ms,
+            **_database_meta(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'rss_peak_mb': round(_peak_rss_mb(), 1),
+        },
+        'scenarios': results,
+    }
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, latency_tolerance: float = 0.25,
+                        min_latency_delta_ms: float = 1.0) -> List[str]:
+    """
+    Regressions of `results` against `baseline`: any increase in queries per
+    request, or a p95 latency more than `latency_tolerance` (and at least
+    `min_latency_delta_ms`) above the baseline. Scenarios missing from either
+    side are skipped.
+    """
+    regressions = []
+    for name, result in results['scenarios'].items():
+        expected = baseline.get('scenarios', {}).get(name)
+        if expected is None:
+            continue
+        if result['queries_per_request'] > expected['queries_per_request'] + 0.01:
+            regressions.append(
+                f"{name}: {result['queries_per_request']} queries per request "
+                f"(baseline {expected['queries_per_request']})"
+            )
+        limit = max(expected['p95_ms'] * (1 + latency_tolerance), expected['p95_ms'] + min_latency_delta_ms)
+        if result['p95_ms'] > limit:
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']} ms (baseline {expected['p95_ms']} ms, limit {limit:.3f} ms)"
+            )
+    return regressions
@@ -0,0 +1,177 @@
+# backend/books/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from django.core.cache import caches
+
+# Returned by cache tiers on a miss, so that falsy values such as an empty
+# search result can still be cached.
+MISSING = object()
+
+
+class LocalTTLCache:
+    """
+    Thread-safe in-process LRU cache whose entries expire after a TTL.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: int = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DjangoCacheTier:
+    """
+    Cache tier backed by one of the aliases in settings.CACHES, shared
+    between worker processes.
+    """
+
+    def __init__(self, alias: str = 'default', ttl: int = 300, key_prefix: str = 'gbooks'):
+        self.alias = alias
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def _make_key(self, key: str) -> str:
+        return f'{self.key_prefix}:{key}'
+
+    def get(self, key: str) -> Any:
+        return self.backend.get(self._make_key(key), MISSING)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self.backend.set(self._make_key(key), value, self.ttl if ttl is None else ttl)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(self._make_key(key))
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+class ResponseCache:
+    """
+    Read-through cache made of ordered tiers (fastest first).
+
+    A hit in a slower tier is copied into the faster tiers above it. Hits are
+    counted per tier and misses overall, so the sizes and TTLs can be tuned.
+    """
+
+    def __init__(self, tiers: List):
+        self.tiers = tiers
+        self._lock = threading.Lock()
+        self._hits = [0] * len(tiers)
+        self._misses = 0
+
+    def get(self, key: str) -> Any:
+        for index, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not MISSING:
+                for faster_tier in self.tiers[:index]:
+                    faster_tier.set(key, value)
+                with self._lock:
+                    self._hits[index] += 1
+                return value
+        with self._lock:
+            self._misses += 1
+        return MISSING
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        for tier in self.tiers:
+            tier.set(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        for tier in self.tiers:
+            tier.delete(key)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._hits = [0] * len(self.tiers)
+            self._misses = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = sum(self._hits)
+            lookups = hits + self._misses
+            return {
+                'hits': hits,
+                'misses': self._misses,
+                'hit_ratio': hits / lookups if lookups else 0.0,
+                'tiers': [
+                    {'tier': type(tier).__name__, 'hits': tier_hits}
+                    for tier, tier_hits in zip(self.tiers, self._hits)
+                ],
+                'local_entries': sum(
+                    len(tier) for tier in self.tiers if isinstance(tier, LocalTTLCache)
+                ),
+            }
+
+
+def build_response_cache() -> ResponseCache:
+    """
+    Build the Google Books response cache from the GOOGLE_BOOKS_CACHE_* settings.
+    """
+    ttl = getattr(settings, 'GOOGLE_BOOKS_CACHE_TTL', 3600)
+    tiers = [
+        LocalTTLCache(
+            max_entries=getattr(settings, 'GOOGLE_BOOKS_CACHE_MAX_ENTRIES', 1024),
+            ttl=ttl,
+        )
+    ]
+    alias = getattr(settings, 'GOOGLE_BOOKS_CACHE_ALIAS', None)
+    if alias:
+        tiers.append(DjangoCacheTier(alias=alias, ttl=ttl))
+    return ResponseCache(tiers)
+
+
+def build_stale_cache():
+    """
+    Longer-lived copies of Google Books responses, served when the upstream
+    is unavailable.
+    """
+    ttl = getattr(settings, 'GOOGLE_BOOKS_STALE_TTL', 86400)
+    alias = getattr(settings, 'GOOGLE_BOOKS_CACHE_ALIAS', None)
+    if alias:
+        return DjangoCacheTier(alias=alias, ttl=ttl, key_prefix='gbooks-stale')
+    return LocalTTLCache(max_entries=getattr(settings, 'GOOGLE_BOOKS_CACHE_MAX_ENTRIES', 1024), ttl=ttl)
@@ -0,0 +1,171 @@
+# backend/books/catalog_refresh.py
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, QuerySet
+from django.utils import timezone
+from . import statistics
+from .models import Book, UserBook
+from .review_feed import update_books
+from .search import get_search_backend
+from .services import GoogleBooksService
+from .taxonomy import sync_book_taxonomy
+from .versioning import bump_for_books
+
+METADATA_FIELDS = [field for field in GoogleBooksService.BOOK_FIELDS if field != 'google_books_id']
+
+
+def count_shelvings(book_ids: Iterable[int], delta: int = 1) -> None:
+    """
+    Add `delta` to the shelved count of each book in `book_ids` once per
+    occurrence, for the bulk paths that create or delete user books without
+    sending the UserBook signals.
+    """
+    by_count = defaultdict(list)
+    for book_id, count in Counter(book_ids).items():
+        by_count[count].append(book_id)
+    for count, ids in by_count.items():
+        Book.objects.filter(pk__in=ids).update(shelved_count=F('shelved_count') + delta * count)
+
+
+def stale_books(max_age: timedelta,
+                after: Optional[Tuple[int, Optional[datetime], int]] = None) -> QuerySet:
+    """
+    Books not fetched from Google Books within `max_age`, most-shelved first,
+    then never-fetched ones, then the ones that have gone longest without a
+    refresh. Ordered by (-shelved_count, last_fetched_at, id) so it can be
+    walked a page at a time: pass the (shelved_count, last_fetched_at, id) of
+    the previous page's last book as `after`.
+    """
+    cutoff = timezone.now() - max_age
+    books = Book.objects.filter(Q(last_fetched_at__isnull=True) | Q(last_fetched_at__lt=cutoff))
+    if after is not None:
+        shelved_count, last_fetched_at, pk = after
+        if last_fetched_at is None:
+            later = Q(last_fetched_at__isnull=True, id__gt=pk) | Q(last_fetched_at__isnull=False)
+        else:
+            later = Q(last_fetched_at__gt=last_fetched_at) | Q(last_fetched_at=last_fetched_at, id__gt=pk)
+        books = books.filter(Q(shelved_count__lt=shelved_count) | Q(later, shelved_count=shelved_count))
+    return books.order_by('-shelved_count', F('last_fetched_at').asc(nulls_first=True), 'id')
+
+
+def _stored_hash(book: Book) -> str:
+    # Rows stored before content hashes existed are hashed on the fly
+    return book.content_hash or GoogleBooksService.content_hash(
+        {field: getattr(book, field) for field in METADATA_FIELDS}
+    )
+
+
+def _update_genre_counts(changed: List[Tuple[Book, List]]) -> None:
+    """
+    Move the owners' genre counts from the old to the new categories of the
+    books whose categories changed.
+    """
+    old_categories = {book.pk: categories for book, categories in changed}
+    books = {book.pk: book for book, _ in changed}
+    changes = defaultdict(list)
+    for user_book in UserBook.objects.filter(book_id__in=list(books)).only('user', 'book', 'status', 'rating'):
+        user_book.book = books[user_book.book_id]
+        new = statistics.user_book_snapshot(user_book)
+        old = {**new, 'categories': list(old_categories[user_book.book_id])}
+        changes[user_book.user_id].append((old, new))
+    for user_id, user_book_changes in changes.items():
+        statistics.apply_batch(user_id, user_book_changes=user_book_changes)
+
+
+def refresh_batch(books: List[Book], max_workers: int = 8) -> Tuple[List[Book], List[Book], List[Book]]:
+    """
+    Re-fetch `books` from Google Books and store the ones whose metadata
+    changed. Returns the (changed, unchanged, failed) books.
+    """
+    fetched = GoogleBooksService.get_books_by_ids(
+        [book.google_books_id for book in books], max_workers=max_workers, use_cache=False
+    )
+    now = timezone.now()
+    changed, unchanged, failed = [], [], []
+    new_categories = []
+    for book in books:
+        book_data = fetched.get(book.google_books_id)
+        if not book_data:
+            failed.append(book)
+            continue
+        fields = GoogleBooksService._to_model_fields(book_data)
+        new_hash = GoogleBooksService.content_hash(fields)
+        book.last_fetched_at = now
+        if new_hash == _stored_hash(book):
+            unchanged.append(book)
+            continue
+
+        if list(fields.get('categories', [])) != list(book.categories or []):
+            new_categories.append((book, list(book.categories or [])))
+        for field in METADATA_FIELDS:
+            if field in fields:
+                setattr(book, field, fields[field])
+        book.content_hash = new_hash
+        changed.append(book)
+
+    unhashed = [book for book in unchanged if not book.content_hash]
+    for book in unhashed:
+        book.content_hash = _stored_hash(book)
+    unhashed_ids = {book.pk for book in unhashed}
+
+    with transaction.atomic():
+        if changed:
+            Book.objects.bulk_update(changed, METADATA_FIELDS + ['content_hash', 'last_fetched_at'])
+        if unhashed:
+            Book.objects.bulk_update(unhashed, ['content_hash', 'last_fetched_at'])
+        untouched = [book.pk for book in unchanged if book.pk not in unhashed_ids]
+        if untouched:
+            Book.objects.filter(pk__in=untouched).update(last_fetched_at=now)
+
+        # bulk_update doesn't send post_save, so do what the Book signal does
+        if changed:
+            backend = get_search_backend()
+            for book in changed:
+                backend.index_book(book)
+            sync_book_taxonomy(changed)
+            bump_for_books(book.pk for book in changed)
+            update_books(changed)
+        if new_categories:
+            _update_genre_counts(new_categories)
+    return changed, unchanged, failed
+
+
+def refresh_catalog(max_age: Optional[timedelta] = None, batch_size: Optional[int] = None,
+                    limit: Optional[int] = None, max_workers: Optional[int] = None) -> Dict:
+    """
+    Refresh up to `limit` stale books in batches of `batch_size`. Books that
+    fail to fetch are left stale for the next run; a batch in which every
+    fetch failed ends the run early, since the upstream is most likely down.
+    """
+    if max_age is None:
+        max_age = timedelta(days=getattr(settings, 'CATALOG_REFRESH_MAX_AGE_DAYS', 30))
+    batch_size = batch_size or getattr(settings, 'CATALOG_REFRESH_BATCH_SIZE', 100)
+    limit = limit or getattr(settings, 'CATALOG_REFRESH_LIMIT', 1000)
+    max_workers = max_workers or getattr(settings, 'BULK_IMPORT_MAX_WORKERS', 8)
+
+    start = time.monotonic()
+    summary = {'checked': 0, 'changed': 0, 'unchanged': 0, 'failed': 0, 'batches': 0}
+    after = None
+    while summary['checked'] < limit:
+        books = list(stale_books(max_age, after)[:min(batch_size, limit - summary['checked'])])
+        if not books:
+            break
+        # Refreshed books leave the stale set; the key skips the failed ones
+        after = (books[-1].shelved_count, books[-1].last_fetched_at, books[-1].pk)
+        changed, unchanged, failed = refresh_batch(books, max_workers)
+        summary['batches'] += 1
+        summary['checked'] += len(books)
+        summary['changed'] += len(changed)
+        summary['unchanged'] += len(unchanged)
+        summary['failed'] += len(failed)
+        if len(failed) == len(books):
+            break
+
+    seconds = time.monotonic() - start
+    summary['seconds'] = round(seconds, 2)
+    summary['books_per_second'] = round(summary['checked'] / seconds, 2) if seconds else 0.0
+    return summary
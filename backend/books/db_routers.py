@@ -0,0 +1,147 @@
+# backend/books/db_routers.py
+import random
+from contextvars import ContextVar
+from typing import List
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+_replica: ContextVar = ContextVar('books_db_replica', default=None)
+_writes: ContextVar = ContextVar('books_db_writes', default=None)
+
+
+def replica_aliases() -> List[str]:
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def _sticky_key(user_id) -> str:
+    return f'db:primary:{user_id}'
+
+
+def stick_to_primary(user) -> None:
+    """
+    Read from the primary on `user`'s requests for the next
+    DATABASE_REPLICA_STICKY_SECONDS, so they see their own writes while
+    the replicas catch up. Kept in the default cache, which must be shared
+    between workers for this to hold across them.
+    """
+    seconds = getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 5)
+    if seconds > 0 and user is not None and user.is_authenticated:
+        cache.set(_sticky_key(user.pk), True, seconds)
+
+
+def is_sticky(user) -> bool:
+    return bool(user is not None and user.is_authenticated and cache.get(_sticky_key(user.pk)))
+
+
+def use_replica():
+    """
+    Route this context's reads to one of the replicas, if any is configured.
+    Returns a token for release_replica().
+    """
+    aliases = replica_aliases()
+    return _replica.set(random.choice(aliases) if aliases else None)
+
+
+def release_replica(token) -> None:
+    _replica.reset(token)
+
+
+class ReadWriteRouter:
+    """
+    Writes go to the default (primary) database. Reads go to the primary
+    too, except in contexts that opted into a replica with use_replica(),
+    i.e. safe read-only viewset actions (see ReplicaReadMixin). Reads made
+    while the primary connection is inside a transaction always stay on
+    it, so they see the transaction's own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _replica.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        writes = _writes.get()
+        if writes is not None:
+            writes.add(model._meta.label)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReadYourWritesMiddleware:
+    """
+    Make users whose request wrote to the database stick to the primary for
+    a short while. Does nothing when no replica is configured. Sync and
+    async capable; the writes set is shared with the sync_to_async threads
+    an async view writes from, as they run in a copy of its context.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+
+        token = _writes.set(set())
+        try:
+            response = self.get_response(request)
+            wrote = bool(_writes.get())
+        finally:
+            _writes.reset(token)
+        if wrote:
+            stick_to_primary(getattr(request, 'user', None))
+        return response
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+
+        token = _writes.set(set())
+        try:
+            response = await self.get_response(request)
+            wrote = bool(_writes.get())
+        finally:
+            _writes.reset(token)
+        if wrote:
+            await sync_to_async(stick_to_primary)(getattr(request, 'user', None))
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Serve the viewset actions named in `replica_actions` from a read
+    replica on GET/HEAD/OPTIONS, unless the user wrote recently.
+    Authentication and permission checks still read from the primary.
+    """
+    replica_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (request.method in SAFE_METHODS and self.action in self.replica_actions
+                and not is_sticky(request.user)):
+            self._replica_token = use_replica()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            release_replica(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,122 @@
+# backend/books/exporting.py
+import csv
+import json
+from typing import Dict, Iterator, List, Optional, Tuple
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from .fast_serializers import get_plan
+from .models import Shelf, UserBook, ReadingSession, Note, Review, Quote
+from .serializers import (
+    ShelfSerializer, UserBookSerializer, ReadingSessionSerializer, NoteSerializer,
+    ReviewSerializer, QuoteSerializer
+)
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+EXPORT_FORMATS = (NDJSON, CSV)
+EXPORT_TYPES = ('shelves', 'books', 'sessions', 'notes', 'quotes', 'reviews')
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv; charset=utf-8',
+}
+
+
+def _querysets(user: User) -> Dict:
+    # Ordered by primary key so repeated exports are stable and diffable
+    return {
+        'shelves': (Shelf.objects.filter(user=user), ShelfSerializer),
+        'books': (
+            UserBook.objects.filter(user=user).select_related('book').prefetch_related('shelves'),
+            UserBookSerializer
+        ),
+        'sessions': (ReadingSession.objects.filter(user_book__user=user), ReadingSessionSerializer),
+        'notes': (Note.objects.filter(user_book__user=user), NoteSerializer),
+        'quotes': (Quote.objects.filter(user_book__user=user), QuoteSerializer),
+        'reviews': (
+            Review.objects.filter(user_book__user=user).select_related('user_book__user'),
+            ReviewSerializer
+        ),
+    }
+
+
+def iter_records(user: User, record_type: str, chunk_size: int = 500) -> Iterator[Dict]:
+    """
+    Yield a user's rows of one type, rendered like the API does, reading
+    `chunk_size` rows (plus their prefetches) from the database at a time.
+    """
+    queryset, serializer_class = _querysets(user)[record_type]
+    plan = get_plan(serializer_class)
+    for instance in queryset.order_by('pk').iterator(chunk_size=chunk_size):
+        yield plan.serialize(instance)
+
+
+def iter_ndjson(user: User, record_types: Optional[List[str]] = None,
+                chunk_size: int = 500) -> Iterator[str]:
+    """
+    One {"type": ..., "data": {...}} JSON object per line, for every record
+    type in turn.
+    """
+    for record_type in record_types or EXPORT_TYPES:
+        for record in iter_records(user, record_type, chunk_size):
+            yield json.dumps(
+                {'type': record_type, 'data': record},
+                cls=DjangoJSONEncoder, ensure_ascii=False
+            ) + '\n'
+
+
+def _flatten(record: Dict, prefix: str = '') -> Dict:
+    """
+    Flatten nested objects into prefixed columns (book_details.title becomes
+    book_details__title); lists become JSON strings.
+    """
+    row = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            row.update(_flatten(value, f'{prefix}{key}__'))
+        elif isinstance(value, list):
+            row[f'{prefix}{key}'] = json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+        else:
+            row[f'{prefix}{key}'] = value
+    return row
+
+
+class _Echo:
+    """
+    File-like object whose write() hands back the line, so csv.writer can
+    feed a generator.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(user: User, record_type: str, chunk_size: int = 500) -> Iterator[str]:
+    """
+    A CSV file with a header row for one record type. The columns are those
+    of the first row, so the header goes out as soon as that row is read.
+    """
+    writer = None
+    for record in iter_records(user, record_type, chunk_size):
+        row = _flatten(record)
+        if writer is None:
+            writer = csv.DictWriter(_Echo(), fieldnames=list(row), extrasaction='ignore')
+            yield writer.writeheader()
+        yield writer.writerow(row)
+
+
+def export_stream(user: User, export_format: str, record_type: Optional[str] = None,
+                  chunk_size: int = 500) -> Tuple[Iterator[str], str]:
+    """
+    (chunks, content type) of a library export. NDJSON covers every record
+    type unless one is given; CSV holds a single type (books by default).
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'Unsupported export format: {export_format}')
+    if record_type is not None and record_type not in EXPORT_TYPES:
+        raise ValueError(f'Unknown record type: {record_type}')
+
+    if export_format == CSV:
+        chunks = iter_csv(user, record_type or 'books', chunk_size)
+    else:
+        chunks = iter_ndjson(user, [record_type] if record_type else None, chunk_size)
+    return chunks, CONTENT_TYPES[export_format]
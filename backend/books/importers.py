@@ -0,0 +1,119 @@
+# backend/books/importers.py
+import csv
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple
+from .instrumentation import propagate
+from .services import GoogleBooksService
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_BOOKS_ID = 'google_books_id'
+ISBN = 'isbn'
+
+# CSV/JSON column names accepted for each identifier type
+ID_COLUMNS = ('google_books_id', 'google_id', 'id')
+ISBN_COLUMNS = ('isbn', 'isbn13', 'isbn_13', 'isbn10', 'isbn_10')
+
+
+def _identifier_from_record(record: Dict) -> Tuple[str, str]:
+    for column in ID_COLUMNS:
+        if record.get(column):
+            return GOOGLE_BOOKS_ID, str(record[column]).strip()
+    for column in ISBN_COLUMNS:
+        if record.get(column):
+            return ISBN, str(record[column]).strip()
+    raise ValueError(f'No google_books_id or isbn in record: {record}')
+
+
+def parse_identifier_file(lines: Iterable[str], file_format: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (identifier_type, value) pairs from a CSV file with a header row or
+    a JSON-lines file with one object per line.
+    """
+    if file_format == 'csv':
+        for record in csv.DictReader(lines):
+            record = {key.strip().lower(): value for key, value in record.items() if key}
+            yield _identifier_from_record(record)
+    elif file_format in ('jsonl', 'ndjson'):
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield _identifier_from_record(json.loads(line))
+    else:
+        raise ValueError(f'Unsupported file format: {file_format}')
+
+
+def guess_file_format(filename: str) -> str:
+    return 'csv' if filename.lower().endswith('.csv') else 'jsonl'
+
+
+def read_uploaded_file(uploaded_file) -> Iterator[str]:
+    return io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+
+
+def import_books(identifiers: Iterable[Tuple[str, str]], batch_size: int = 500,
+                 max_workers: int = 8) -> List[Dict]:
+    """
+    Fetch metadata for Google Books IDs and ISBNs concurrently, then upsert
+    the books in batches. Returns one result dictionary per identifier.
+    """
+    identifiers = list(dict.fromkeys(identifiers))
+    google_books_ids = [value for kind, value in identifiers if kind == GOOGLE_BOOKS_ID]
+    isbns = [value for kind, value in identifiers if kind == ISBN]
+
+    fetched = {
+        (GOOGLE_BOOKS_ID, value): book_data
+        for value, book_data in GoogleBooksService.get_books_by_ids(
+            google_books_ids, max_workers=max_workers
+        ).items()
+    }
+    if isbns:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for isbn, book_data in zip(isbns, executor.map(propagate(GoogleBooksService.get_book_by_isbn), isbns)):
+                fetched[(ISBN, isbn)] = book_data
+
+    results = []
+    found = []
+    for kind, value in identifiers:
+        book_data = fetched.get((kind, value))
+        result = {'type': kind, 'identifier': value}
+        if book_data:
+            found.append((result, book_data))
+        else:
+            result.update(status='failed', error='Book not found')
+        results.append(result)
+
+    for start in range(0, len(found), batch_size):
+        batch = found[start:start + batch_size]
+        try:
+            stored = GoogleBooksService.bulk_upsert_books(
+                [book_data for _, book_data in batch], batch_size=batch_size
+            )
+        except Exception as e:
+            logger.exception('Error importing batch')
+            for result, _ in batch:
+                result.update(status='failed', error=str(e))
+            continue
+
+        for result, book_data in batch:
+            book = stored.get(book_data['google_books_id'])
+            if book:
+                result.update(status='imported', book_id=book.id,
+                              google_books_id=book.google_books_id)
+            else:
+                result.update(status='failed', error='Book was not stored')
+
+    return results
+
+
+def summarize(results: List[Dict]) -> Dict:
+    imported = sum(1 for result in results if result['status'] == 'imported')
+    return {
+        'total': len(results),
+        'imported': imported,
+        'failed': len(results) - imported,
+        'results': results,
+    }
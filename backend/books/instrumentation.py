@@ -0,0 +1,331 @@
+# backend/books/instrumentation.py
+import heapq
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Request latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+DB = 'db'
+SERIALIZER = 'serializer'
+UPSTREAM = 'upstream'
+
+_current: ContextVar = ContextVar('books_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Time and call counts per component (db, serializer, upstream) for one
+    request. Upstream calls may run on pool threads, so updates are locked;
+    their durations are summed, not wall-clock.
+    """
+
+    def __init__(self, slow_query_count: int = 5):
+        self.durations: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.slowest_queries: List = []
+        self.slow_query_count = slow_query_count
+        self._lock = threading.Lock()
+        self._depth = threading.local()
+
+    def add(self, name: str, seconds: float, count: int = 1) -> None:
+        with self._lock:
+            self.durations[name] += seconds
+            self.counts[name] += count
+
+    def add_query(self, sql: str, seconds: float) -> None:
+        with self._lock:
+            self.durations[DB] += seconds
+            self.counts[DB] += 1
+            entry = (seconds, sql[:500])
+            if len(self.slowest_queries) < self.slow_query_count:
+                heapq.heappush(self.slowest_queries, entry)
+            elif entry > self.slowest_queries[0]:
+                heapq.heapreplace(self.slowest_queries, entry)
+
+    def _enter(self, name: str) -> bool:
+        depth = getattr(self._depth, name, 0)
+        setattr(self._depth, name, depth + 1)
+        return depth == 0
+
+    def _exit(self, name: str) -> None:
+        setattr(self._depth, name, getattr(self._depth, name) - 1)
+
+
+def current() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+@contextmanager
+def timed(name: str, outermost_only: bool = False):
+    """
+    Add the time spent in the block to the current request's `name`
+    component. With outermost_only, blocks nested in another block of the
+    same component (on the same thread) aren't counted again.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    counted = metrics._enter(name) or not outermost_only
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if counted:
+            metrics.add(name, time.perf_counter() - start)
+        metrics._exit(name)
+
+
+def propagate(func: Callable) -> Callable:
+    """
+    Wrap `func` to run with the calling request's metrics, for work handed
+    to a thread pool (which doesn't inherit context variables).
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return func
+
+    def wrapper(*args, **kwargs):
+        token = _current.set(metrics)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return wrapper
+
+
+class TimedSerializerMixin:
+    """
+    Count a serializer's to_representation as serializer time. Nested
+    serializers are part of their parent's time.
+    """
+
+    def to_representation(self, instance):
+        with timed(SERIALIZER, outermost_only=True):
+            return super().to_representation(instance)
+
+
+class MetricsRegistry:
+    """
+    In-process aggregates per (view, method): request counts by status,
+    a latency histogram and component totals, plus a bounded sample of
+    slow requests. Each worker process keeps its own registry.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, max_slow_samples: int = 100):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.max_slow_samples = max_slow_samples
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = defaultdict(int)
+            self.histograms = {}
+            self.durations = defaultdict(float)
+            self.counts = defaultdict(int)
+            self.slow_requests = defaultdict(int)
+            self.slow_samples = deque(maxlen=self.max_slow_samples)
+
+    def observe(self, view: str, method: str, status: int, seconds: float,
+                metrics: RequestMetrics, slow: bool = False, slow_sample: Optional[Dict] = None) -> None:
+        with self._lock:
+            self.requests[(view, method, str(status))] += 1
+            histogram = self.histograms.get((view, method))
+            if histogram is None:
+                histogram = self.histograms[(view, method)] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect_left(self.buckets, seconds)
+            if index < len(self.buckets):
+                histogram[0][index] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+            for name, duration in metrics.durations.items():
+                self.durations[(view, name)] += duration
+                self.counts[(view, name)] += metrics.counts[name]
+            if slow:
+                self.slow_requests[(view, method)] += 1
+            if slow_sample is not None:
+                self.slow_samples.append(slow_sample)
+
+    def samples(self) -> List[Dict]:
+        with self._lock:
+            return list(reversed(self.slow_samples))
+
+    def render_prometheus(self) -> str:
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        with self._lock:
+            metric('books_http_requests_total', 'counter', 'HTTP requests by view, method and status.')
+            for (view, method, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'books_http_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}'
+                )
+
+            metric('books_http_request_duration_seconds', 'histogram', 'Request latency.')
+            for (view, method), (bucket_counts, total, count) in sorted(self.histograms.items()):
+                labels = f'view="{view}",method="{method}"'
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(
+                        f'books_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f'books_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f'books_http_request_duration_seconds_sum{{{labels}}} {total:.6f}')
+                lines.append(f'books_http_request_duration_seconds_count{{{labels}}} {count}')
+
+            for name, help_text in (
+                (DB, 'Database queries'),
+                (SERIALIZER, 'Serializer calls'),
+                (UPSTREAM, 'Google Books requests'),
+            ):
+                items = sorted((view, value) for (view, component), value in self.counts.items()
+                               if component == name)
+                metric(f'books_{name}_calls_total', 'counter', f'{help_text} made while serving requests.')
+                for view, value in items:
+                    lines.append(f'books_{name}_calls_total{{view="{view}"}} {value}')
+                metric(f'books_{name}_duration_seconds_total', 'counter', f'Time spent in {help_text.lower()}.')
+                for view, _ in items:
+                    lines.append(
+                        f'books_{name}_duration_seconds_total{{view="{view}"}} '
+                        f'{self.durations[(view, name)]:.6f}'
+                    )
+
+            metric('books_slow_requests_total', 'counter', 'Requests slower than METRICS_SLOW_REQUEST_MS.')
+            for (view, method), count in sorted(self.slow_requests.items()):
+                lines.append(f'books_slow_requests_total{{view="{view}",method="{method}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry(max_slow_samples=getattr(settings, 'METRICS_SLOW_SAMPLE_SIZE', 100))
+
+
+def _view_name(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    return (match.view_name or match.func.__name__) if match else 'unmatched'
+
+
+class InstrumentationMiddleware:
+    """
+    Time every request and the database, serializer and upstream work done
+    on its behalf. Adds a Server-Timing header and feeds the registry
+    exposed at /api/metrics/. Streamed bodies are timed up to the point the
+    response is returned. Sync and async capable, so native async views
+    stay on the event loop under ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _wrap_connections(metrics: RequestMetrics) -> ExitStack:
+        def record_query(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                metrics.add_query(sql, time.perf_counter() - start)
+
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(record_query))
+        return stack
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with self._wrap_connections(metrics):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._record(request, response, time.perf_counter() - start, metrics)
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        # Connections are per thread: wrap the ones of the thread that runs
+        # this request's sync_to_async (thread-sensitive) database work
+        stack = await sync_to_async(self._wrap_connections)(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            elapsed = time.perf_counter() - start
+            await sync_to_async(stack.close)()
+            _current.reset(token)
+        return self._record(request, response, elapsed, metrics)
+
+    def _record(self, request, response, elapsed: float, metrics: RequestMetrics):
+        view = _view_name(request)
+        slow = elapsed * 1000 >= getattr(settings, 'METRICS_SLOW_REQUEST_MS', 500)
+        sample = None
+        if slow and random.random() < getattr(settings, 'METRICS_SLOW_SAMPLE_RATE', 1.0):
+            sample = self._slow_sample(request, response, view, elapsed, metrics)
+        registry.observe(view, request.method, response.status_code, elapsed, metrics, slow, sample)
+        if getattr(settings, 'METRICS_SERVER_TIMING', True):
+            response['Server-Timing'] = self._server_timing(elapsed, metrics)
+        return response
+
+    @staticmethod
+    def _server_timing(elapsed: float, metrics: RequestMetrics) -> str:
+        entries = [
+            f'{name};dur={metrics.durations[name] * 1000:.1f};desc="{metrics.counts[name]} calls"'
+            for name in (DB, SERIALIZER, UPSTREAM)
+            if metrics.counts[name]
+        ]
+        entries.append(f'total;dur={elapsed * 1000:.1f}')
+        return ', '.join(entries)
+
+    @staticmethod
+    def _slow_sample(request, response, view: str, elapsed: float,
+                     metrics: RequestMetrics) -> Dict:
+        sample = {
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 1),
+            'timings_ms': {name: round(value * 1000, 1) for name, value in metrics.durations.items()},
+            'counts': dict(metrics.counts),
+            'slowest_queries': [
+                {'duration_ms': round(seconds * 1000, 1), 'sql': sql}
+                for seconds, sql in sorted(metrics.slowest_queries, reverse=True)
+            ],
+            'at': time.time(),
+        }
+        logger.warning('Slow request %s %s took %.1f ms', request.method, request.path, elapsed * 1000)
+        return sample
@@ -0,0 +1,388 @@
+# backend/books/jobs.py
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .catalog_refresh import refresh_catalog
+from .importers import GOOGLE_BOOKS_ID, ISBN, import_books, summarize
+from .models import Book, Job, JobSchedule
+from .services import GoogleBooksService
+from .thumbnails import get_thumbnail, is_allowed_url
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+# kind -> function(payload) returning a JSON-serializable result
+HANDLERS: Dict[str, Callable[[Dict], Optional[Dict]]] = {}
+
+
+# Raised for a malformed job; retrying won't help
+PERMANENT_ERRORS = (ValueError, KeyError, TypeError)
+
+
+class JobError(Exception):
+    """
+    Raised by handlers for failures worth retrying.
+    """
+
+
+def register(kind: str):
+    """
+    Decorator registering a job handler for `kind`.
+    """
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def _active(kind: str, dedupe_key: str) -> Optional[Job]:
+    return Job.objects.filter(kind=kind, dedupe_key=dedupe_key, status__in=ACTIVE_STATUSES).first()
+
+
+def enqueue(kind: str, payload: Optional[Dict] = None, user=None, dedupe_key: str = '',
+            max_attempts: Optional[int] = None, delay: float = 0) -> Job:
+    """
+    Queue a job, or return the queued/running job of the same kind and
+    dedupe_key if there is one.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    if dedupe_key:
+        active = _active(kind, dedupe_key)
+        if active:
+            return active
+
+    fields = {
+        'kind': kind,
+        'payload': payload or {},
+        'user': user,
+        'dedupe_key': dedupe_key,
+        'max_attempts': max_attempts or getattr(settings, 'JOBS_MAX_ATTEMPTS', 3),
+        'run_after': timezone.now() + timedelta(seconds=delay),
+    }
+    try:
+        with transaction.atomic():
+            return Job.objects.create(**fields)
+    except IntegrityError:
+        # Lost a race with another enqueue of the same key
+        active = _active(kind, dedupe_key)
+        if active is None:
+            raise
+        return active
+
+
+def purge_finished_jobs() -> int:
+    """
+    Delete jobs that succeeded or failed more than JOBS_RETENTION_DAYS ago
+    and return how many were deleted.
+    """
+    cutoff = timezone.now() - timedelta(days=getattr(settings, 'JOBS_RETENTION_DAYS', 7))
+    deleted, _ = Job.objects.filter(status__in=(SUCCEEDED, FAILED), finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def _retry_delay(attempts: int) -> float:
+    return getattr(settings, 'JOBS_RETRY_BACKOFF', 30) * 2 ** (attempts - 1)
+
+
+def recover_stale_jobs() -> int:
+    """
+    Put jobs whose heartbeat stopped for JOBS_LOCK_TIMEOUT seconds back in
+    the queue (or fail them if they are out of attempts). Long jobs keep
+    beating while they run, so only lost workers' jobs are picked up.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'JOBS_LOCK_TIMEOUT', 120))
+    stale = Job.objects.alias(last_seen=Coalesce('heartbeat_at', 'locked_at')).filter(
+        status=RUNNING, last_seen__lt=cutoff
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=FAILED, last_error='Worker stopped while running the job',
+        locked_by='', locked_at=None, heartbeat_at=None, finished_at=timezone.now()
+    )
+    requeued = stale.update(status=QUEUED, locked_by='', locked_at=None, heartbeat_at=None)
+    return failed + requeued
+
+
+def claim(worker_id: str, limit: int, kinds: Optional[Iterable[str]] = None,
+          running: Optional[Dict[str, int]] = None) -> List[Job]:
+    """
+    Atomically take up to `limit` due jobs for this worker, respecting the
+    per-kind limits in JOBS_CONCURRENCY given the jobs already `running`.
+    Each claim is a conditional UPDATE, so several workers can share a queue.
+    """
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    per_kind = getattr(settings, 'JOBS_CONCURRENCY', {})
+    running = dict(running or {})
+
+    candidates = Job.objects.filter(status=QUEUED, run_after__lte=now)
+    if kinds:
+        candidates = candidates.filter(kind__in=list(kinds))
+    candidates = candidates.order_by('run_after', 'id').values_list('id', 'kind')[:limit * 4]
+
+    claimed = []
+    for job_id, kind in candidates:
+        if len(claimed) >= limit:
+            break
+        if kind in per_kind and running.get(kind, 0) >= per_kind[kind]:
+            continue
+        taken = Job.objects.filter(id=job_id, status=QUEUED).update(
+            status=RUNNING, locked_by=worker_id, locked_at=now, heartbeat_at=now,
+            attempts=F('attempts') + 1
+        )
+        if taken:
+            claimed.append(job_id)
+            running[kind] = running.get(kind, 0) + 1
+    return list(Job.objects.filter(id__in=claimed).order_by('run_after', 'id'))
+
+
+@contextmanager
+def heartbeat(job: Job):
+    """
+    Touch `job`'s heartbeat_at every JOBS_HEARTBEAT_INTERVAL seconds from a
+    background thread while the block runs.
+    """
+    interval = getattr(settings, 'JOBS_HEARTBEAT_INTERVAL', 30)
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                Job.objects.filter(id=job.id, status=RUNNING, locked_by=job.locked_by).update(
+                    heartbeat_at=timezone.now()
+                )
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, name=f'job-{job.id}-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job: Job) -> Job:
+    """
+    Execute a claimed job and record the outcome, scheduling a retry with
+    exponential backoff if attempts remain.
+    """
+    handler = HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f'Unknown job kind: {job.kind}')
+        with heartbeat(job):
+            job.result = handler(job.payload)
+        job.status = SUCCEEDED
+        job.last_error = ''
+    except Exception as e:
+        logger.exception('Error running %s job %s', job.kind, job.id)
+        job.last_error = f'{type(e).__name__}: {e}'
+        if job.attempts < job.max_attempts and not isinstance(e, PERMANENT_ERRORS):
+            job.status = QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=_retry_delay(job.attempts))
+        else:
+            job.status = FAILED
+
+    job.locked_by = ''
+    job.locked_at = None
+    job.heartbeat_at = None
+    if job.status in (SUCCEEDED, FAILED):
+        job.finished_at = timezone.now()
+    job.save(update_fields=[
+        'result', 'status', 'last_error', 'run_after', 'locked_by', 'locked_at',
+        'heartbeat_at', 'finished_at', 'updated_at'
+    ])
+    return job
+
+
+class Worker:
+    """
+    Polls the job table and runs jobs on a thread pool of `concurrency`
+    threads. With concurrency=1 jobs run on the calling thread.
+    """
+
+    def __init__(self, concurrency: int = 4, poll_interval: float = 1.0,
+                 kinds: Optional[Iterable[str]] = None, worker_id: Optional[str] = None):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.kinds = list(kinds) if kinds else None
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.running: Dict[str, int] = {}
+        self._scheduled: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, job: Job) -> None:
+        try:
+            run_job(job)
+        finally:
+            with self._lock:
+                self.running[job.kind] -= 1
+            if self.concurrency > 1:
+                # Pool threads each hold their own connection
+                connections.close_all()
+
+    def _claim(self) -> List[Job]:
+        with self._lock:
+            free = self.concurrency - sum(self.running.values())
+            jobs = claim(self.worker_id, free, self.kinds, self.running)
+            for job in jobs:
+                self.running[job.kind] = self.running.get(job.kind, 0) + 1
+        return jobs
+
+    def run_pending(self) -> int:
+        """
+        Run due jobs until none are left (including retries that become due
+        meanwhile) and return how many ran.
+        """
+        recover_stale_jobs()
+        count = 0
+        if self.concurrency <= 1:
+            while True:
+                jobs = self._claim()
+                if not jobs:
+                    return count
+                for job in jobs:
+                    self._run(job)
+                count += len(jobs)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = []
+            while True:
+                jobs = self._claim()
+                futures.extend(executor.submit(self._run, job) for job in jobs)
+                count += len(jobs)
+                futures = [future for future in futures if not future.done()]
+                if not jobs and not futures:
+                    return count
+                time.sleep(0.05)
+
+    def schedule_periodic(self) -> None:
+        """
+        Queue the JOBS_PERIODIC jobs whose interval has elapsed. Each kind's
+        JobSchedule row is advanced with a conditional UPDATE, like claim(),
+        so however many workers see it due only one queues the job.
+        """
+        now = timezone.now()
+        for kind, interval in getattr(settings, 'JOBS_PERIODIC', {}).items():
+            if self.kinds and kind not in self.kinds:
+                continue
+            # Don't ask the database again before the last due time we saw
+            if now < self._scheduled.get(kind, now):
+                continue
+            schedule, _ = JobSchedule.objects.get_or_create(kind=kind, defaults={'next_run_at': now})
+            if schedule.next_run_at > now:
+                self._scheduled[kind] = schedule.next_run_at
+                continue
+            next_run_at = now + timedelta(seconds=interval)
+            with transaction.atomic():
+                advanced = JobSchedule.objects.filter(
+                    id=schedule.id, next_run_at=schedule.next_run_at
+                ).update(next_run_at=next_run_at)
+                if advanced:
+                    enqueue(kind, dedupe_key='periodic')
+            if advanced:
+                self._scheduled[kind] = next_run_at
+
+    def run_forever(self) -> None:
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            last_recovery = 0
+            while not self._stop.is_set():
+                if time.monotonic() - last_recovery > 60:
+                    recover_stale_jobs()
+                    last_recovery = time.monotonic()
+                self.schedule_periodic()
+                jobs = self._claim()
+                for job in jobs:
+                    executor.submit(self._run, job)
+                if not jobs:
+                    self._stop.wait(self.poll_interval)
+
+
+@register('refresh_book')
+def refresh_book(payload: Dict) -> Dict:
+    """
+    Re-fetch a book's metadata from Google Books, bypassing the response cache.
+    The result has found=False when the volume came back but couldn't be
+    stored; retrying wouldn't change that.
+    """
+    google_books_id = payload['google_books_id']
+    book_data = GoogleBooksService.get_book_by_id(google_books_id, use_cache=False)
+    if not book_data:
+        raise JobError(f'Could not fetch {google_books_id} from Google Books')
+    book = GoogleBooksService.create_or_update_book(book_data)
+    if book is None:
+        return {'found': False, 'book_id': None, 'google_books_id': google_books_id}
+    return {'found': True, 'book_id': book.id, 'google_books_id': google_books_id}
+
+
+@register('import_books')
+def import_books_job(payload: Dict) -> Dict:
+    identifiers = [(GOOGLE_BOOKS_ID, value) for value in payload.get('google_books_ids', [])]
+    identifiers += [(ISBN, value) for value in payload.get('isbns', [])]
+    return summarize(import_books(
+        identifiers,
+        batch_size=settings.BULK_IMPORT_BATCH_SIZE,
+        max_workers=settings.BULK_IMPORT_MAX_WORKERS
+    ))
+
+
+@register('upsert_books')
+def upsert_books(payload: Dict) -> Dict:
+    """
+    Store Google Books results (see search.upsert_remote_results) in the
+    local catalog.
+    """
+    stored = GoogleBooksService.bulk_upsert_books(payload['books'])
+    return {'stored': len(stored)}
+
+
+@register('fetch_thumbnail')
+def fetch_thumbnail(payload: Dict) -> Dict:
+    """
+    Warm the thumbnail cache for a book.
+    """
+    book = Book.objects.get(pk=payload['book_id'])
+    if not is_allowed_url(book.thumbnail_url):
+        return {'cached': False}
+    thumbnail = get_thumbnail(book.thumbnail_url)
+    if thumbnail is None:
+        raise JobError(f'Could not fetch the thumbnail of book {book.pk}')
+    return {'cached': True, 'digest': thumbnail.digest, 'size': thumbnail.size}
+
+
+@register('purge_jobs')
+def purge_jobs(payload: Dict) -> Dict:
+    return {'deleted': purge_finished_jobs()}
+
+
+@register('refresh_catalog')
+def refresh_catalog_job(payload: Dict) -> Dict:
+    max_age_days = payload.get('max_age_days')
+    return refresh_catalog(
+        max_age=timedelta(days=max_age_days) if max_age_days is not None else None,
+        batch_size=payload.get('batch_size'),
+        limit=payload.get('limit'),
+    )
@@ -0,0 +1,455 @@
+# backend/books/library_import.py
+import csv
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_datetime
+from .catalog_refresh import count_shelvings
+from .importers import ISBN, import_books
+from .instrumentation import propagate
+from .models import (
+    Book, LibraryImport, Note, Quote, ReadingSession, Review, Shelf, UserBook
+)
+from .review_feed import sync_reviews
+from .services import GoogleBooksService
+from .statistics import apply_batch, session_snapshot, user_book_snapshot
+from .versioning import bump
+from .view_cache import invalidate_public_reviews
+
+logger = logging.getLogger(__name__)
+
+GOODREADS = 'goodreads'
+NDJSON = 'ndjson'
+IMPORT_FORMATS = (GOODREADS, NDJSON)
+
+# Kinds of entries produced by the parsers; the child kinds match the
+# record types of books/exporting.py
+SHELF = 'shelves'
+BOOK = 'books'
+REVIEW = 'reviews'
+NOTE = 'notes'
+QUOTE = 'quotes'
+SESSION = 'sessions'
+CHILD_KINDS = (REVIEW, NOTE, QUOTE, SESSION)
+CHILD_MODELS = {REVIEW: Review, NOTE: Note, QUOTE: Quote, SESSION: ReadingSession}
+
+# Goodreads' exclusive shelves map to a reading status instead of a shelf
+GOODREADS_STATUSES = {
+    'read': 'read',
+    'currently-reading': 'reading',
+    'to-read': 'want_to_read',
+}
+READING_STATUSES = {choice for choice, _ in UserBook.READING_STATUS_CHOICES}
+MAX_ERRORS = 100
+SHELF_NAME_LENGTH = Shelf._meta.get_field('name').max_length
+
+# "The Hunger Games (The Hunger Games, #1)" -> "The Hunger Games"
+SERIES_SUFFIX = re.compile(r'\s*\([^()]*#\d+(\.\d+)?\)\s*$')
+
+
+def guess_import_format(filename: str) -> str:
+    return GOODREADS if filename.lower().endswith('.csv') else NDJSON
+
+
+def _title_key(title: str) -> str:
+    return ' '.join(SERIES_SUFFIX.sub('', title or '').lower().split())
+
+
+def _rating(value) -> Optional[int]:
+    if value in (None, '', 0, '0'):
+        return None
+    rating = int(value)
+    if not 1 <= rating <= 5:
+        raise ValueError(f'Rating must be between 1 and 5, got {rating}')
+    return rating
+
+
+def _status(value: str) -> str:
+    if value not in READING_STATUSES:
+        raise ValueError(f'Unknown reading status: {value}')
+    return value
+
+
+def _goodreads_isbn(value: Optional[str]) -> Optional[str]:
+    # Goodreads writes ISBNs as ="0439023483" so spreadsheets keep the zeros
+    value = (value or '').strip().lstrip('=').strip('"')
+    return value or None
+
+
+def _goodreads_date(value: Optional[str]):
+    value = (value or '').strip()
+    return datetime.strptime(value, '%Y/%m/%d').date() if value else None
+
+
+def _goodreads_entry(record: Dict) -> Dict:
+    title = (record.get('Title') or '').strip()
+    if not title:
+        raise ValueError('Missing title')
+    authors = [record.get('Author') or ''] + (record.get('Additional Authors') or '').split(',')
+    shelves = [
+        name.strip() for name in (record.get('Bookshelves') or '').split(',')
+        if name.strip() and name.strip() not in GOODREADS_STATUSES
+    ]
+    return {
+        'kind': BOOK,
+        'google_books_id': None,
+        'book_data': None,
+        'isbn': _goodreads_isbn(record.get('ISBN13')) or _goodreads_isbn(record.get('ISBN')),
+        'title': title,
+        'authors': [author.strip() for author in authors if author.strip()],
+        'fields': {
+            'status': GOODREADS_STATUSES.get((record.get('Exclusive Shelf') or '').strip(), 'want_to_read'),
+            'rating': _rating(record.get('My Rating')),
+            'end_date': _goodreads_date(record.get('Date Read')),
+        },
+        'shelves': shelves,
+        'review': (record.get('My Review') or '').strip() or None,
+        'external_id': None,
+    }
+
+
+def _ndjson_entry(record: Dict) -> Dict:
+    record_type = record.get('type')
+    data = record.get('data') or {}
+    if record_type == SHELF:
+        if not data.get('name'):
+            raise ValueError('Missing shelf name')
+        return {'kind': SHELF, 'name': data['name'], 'is_default': bool(data.get('is_default'))}
+    if record_type == BOOK:
+        book = data.get('book_details') or {}
+        if not book.get('google_books_id'):
+            raise ValueError('Missing book_details.google_books_id')
+        return {
+            'kind': BOOK,
+            'google_books_id': book['google_books_id'],
+            'book_data': {field: book.get(field) for field in GoogleBooksService.BOOK_FIELDS},
+            'isbn': None,
+            'title': book.get('title') or '',
+            'authors': book.get('authors') or [],
+            'fields': {
+                'status': _status(data.get('status') or 'want_to_read'),
+                'rating': _rating(data.get('rating')),
+                'current_page': int(data.get('current_page') or 0),
+                'start_date': parse_date(data['start_date']) if data.get('start_date') else None,
+                'end_date': parse_date(data['end_date']) if data.get('end_date') else None,
+            },
+            'shelves': [shelf['name'] for shelf in data.get('shelves') or []],
+            'review': None,
+            'external_id': data.get('id'),
+        }
+    if record_type in CHILD_KINDS:
+        return {'kind': record_type, 'user_book': data.get('user_book'), 'data': data}
+    raise ValueError(f'Unknown record type: {record_type}')
+
+
+def iter_entries(lines: Iterable[str], file_format: str) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Yield (row number, entry, error) for each data row of a Goodreads CSV
+    export or an NDJSON library export, one row at a time. Exactly one of
+    entry and error is set.
+    """
+    if file_format == GOODREADS:
+        records = csv.DictReader(lines)
+        parse = _goodreads_entry
+    elif file_format == NDJSON:
+        records = (line for line in lines if line.strip())
+        parse = lambda line: _ndjson_entry(json.loads(line))
+    else:
+        raise ValueError(f'Unsupported import format: {file_format}')
+
+    for row, record in enumerate(records, 1):
+        try:
+            yield row, parse(record), None
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            yield row, None, str(e)
+
+
+class LibraryImporter:
+    """
+    Writes parsed entries to a user's library in chunks. Every chunk resolves
+    its books in a few queries (local catalog first, then Google Books for
+    the misses), writes with bulk_create and commits together with the
+    LibraryImport checkpoint.
+    """
+
+    def __init__(self, library_import: LibraryImport, chunk_size: int = 200, max_workers: int = 8):
+        self.library_import = library_import
+        self.user = library_import.user
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+    def run(self, lines: Iterable[str]) -> LibraryImport:
+        library_import = self.library_import
+        entries = iter_entries(lines, library_import.file_format)
+        # Rows committed by an earlier, interrupted run
+        entries = islice(entries, library_import.rows_processed, None)
+        try:
+            while True:
+                chunk = list(islice(entries, self.chunk_size))
+                if not chunk:
+                    break
+                self._process_chunk(chunk)
+        except Exception as e:
+            logger.exception('Error importing library %s', library_import.pk)
+            # Drop the counters of the chunk that was rolled back
+            library_import.refresh_from_db()
+            library_import.status = 'failed'
+            self._error(library_import.rows_processed + 1, f'Import stopped: {e}')
+            library_import.save()
+            return library_import
+
+        library_import.status = 'completed'
+        library_import.save()
+        return library_import
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        if amount:
+            counts = self.library_import.counts
+            counts[key] = counts.get(key, 0) + amount
+
+    def _error(self, row: int, message: str) -> None:
+        self._count('failed')
+        if len(self.library_import.errors) < MAX_ERRORS:
+            self.library_import.errors.append({'row': row, 'error': message})
+
+    def _process_chunk(self, chunk: List[Tuple[int, Optional[Dict], Optional[str]]]) -> None:
+        by_kind = {}
+        for row, entry, error in chunk:
+            if error:
+                self._error(row, error)
+            else:
+                by_kind.setdefault(entry['kind'], []).append((row, entry))
+
+        book_entries = by_kind.get(BOOK, [])
+        books = self.resolve_books([entry for _, entry in book_entries])
+
+        with transaction.atomic():
+            shelf_ids = self._write_shelves(by_kind.get(SHELF, []), book_entries)
+            new_user_books = self._write_user_books(book_entries, books, shelf_ids)
+            new_sessions, public_reviews = self._write_children(by_kind)
+
+            self.library_import.rows_processed = chunk[-1][0]
+            self.library_import.save()
+
+            # bulk_create skips the signals that maintain these
+            apply_batch(
+                self.user.id,
+                user_book_changes=[(None, user_book_snapshot(user_book)) for user_book in new_user_books],
+                session_changes=[(None, session_snapshot(session)) for session in new_sessions]
+            )
+            bump([self.user.id])
+            if public_reviews:
+                invalidate_public_reviews()
+
+    def resolve_books(self, entries: List[Dict]) -> List[Optional[Book]]:
+        """
+        The Book for each entry: from the local catalog by Google Books ID or
+        title and author, then from the export's own book data, then from
+        Google Books by ISBN and finally by title/author search.
+        """
+        google_books_ids = {entry['google_books_id'] for entry in entries if entry['google_books_id']}
+        local_by_id = Book.objects.in_bulk(google_books_ids, field_name='google_books_id') if google_books_ids else {}
+
+        local_by_title = {}
+        titles = set()
+        for entry in entries:
+            if not entry['google_books_id']:
+                titles.update({entry['title'], SERIES_SUFFIX.sub('', entry['title'])})
+        if titles:
+            for book in Book.objects.filter(title__in=titles):
+                local_by_title.setdefault(_title_key(book.title), []).append(book)
+
+        def local_match(entry):
+            if entry['google_books_id']:
+                return local_by_id.get(entry['google_books_id'])
+            authors = {author.lower() for author in entry['authors']}
+            for book in local_by_title.get(_title_key(entry['title']), []):
+                if not authors or authors & {author.lower() for author in book.authors or []}:
+                    return book
+            return None
+
+        books = [local_match(entry) for entry in entries]
+        missing = [index for index, book in enumerate(books) if book is None]
+        if not missing:
+            return books
+
+        # Our own exports carry the book metadata, so no upstream call is needed
+        fetched = {}
+        exported = [entries[index]['book_data'] for index in missing if entries[index]['book_data']]
+        if exported:
+            fetched.update(GoogleBooksService.bulk_upsert_books(exported, fetched=False))
+
+        isbns = {entries[index]['isbn'] for index in missing if entries[index]['isbn']}
+        by_isbn = {}
+        if isbns:
+            results = import_books([(ISBN, isbn) for isbn in isbns], max_workers=self.max_workers)
+            stored = Book.objects.in_bulk(
+                [result['book_id'] for result in results if result['status'] == 'imported']
+            )
+            by_isbn = {
+                result['identifier']: stored[result['book_id']]
+                for result in results if result['status'] == 'imported' and result['book_id'] in stored
+            }
+
+        def query(entry):
+            title = SERIES_SUFFIX.sub('', entry['title'])
+            return f'intitle:{title} inauthor:{entry["authors"][0]}' if entry['authors'] else f'intitle:{title}'
+
+        unresolved = [
+            index for index in missing
+            if not entries[index]['book_data'] and entries[index]['isbn'] not in by_isbn
+        ]
+        found = {}
+        if unresolved:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = executor.map(
+                    propagate(lambda entry: GoogleBooksService.search_books(query(entry), max_results=1)),
+                    [entries[index] for index in unresolved]
+                )
+                for index, result in zip(unresolved, results):
+                    if result:
+                        found[index] = result[0]
+            if found:
+                fetched.update(GoogleBooksService.bulk_upsert_books(list(found.values())))
+
+        for index in missing:
+            entry = entries[index]
+            if entry['book_data']:
+                books[index] = fetched.get(entry['google_books_id'])
+            elif entry['isbn'] in by_isbn:
+                books[index] = by_isbn[entry['isbn']]
+            elif index in found:
+                books[index] = fetched.get(found[index]['google_books_id'])
+        return books
+
+    def _write_shelves(self, shelf_entries: List[Tuple[int, Dict]],
+                       book_entries: List[Tuple[int, Dict]]) -> Dict[str, int]:
+        """
+        Create the shelves named in this chunk that the user doesn't have yet.
+        Returns {name: shelf id}.
+        """
+        defaults = {entry['name'][:SHELF_NAME_LENGTH]: entry['is_default'] for _, entry in shelf_entries}
+        names = set(defaults)
+        for _, entry in book_entries:
+            names.update(name[:SHELF_NAME_LENGTH] for name in entry['shelves'])
+        if not names:
+            return {}
+
+        shelf_ids = dict(Shelf.objects.filter(user=self.user, name__in=names).values_list('name', 'id'))
+        missing = [
+            Shelf(user=self.user, name=name, is_default=defaults.get(name, False))
+            for name in sorted(names - set(shelf_ids))
+        ]
+        if missing:
+            Shelf.objects.bulk_create(missing, ignore_conflicts=True)
+            shelf_ids = dict(Shelf.objects.filter(user=self.user, name__in=names).values_list('name', 'id'))
+            self._count('shelves', len(missing))
+        return shelf_ids
+
+    def _write_user_books(self, book_entries: List[Tuple[int, Dict]], books: List[Optional[Book]],
+                          shelf_ids: Dict[str, int]) -> List[UserBook]:
+        existing = dict(UserBook.objects.filter(
+            user=self.user, book_id__in=[book.id for book in books if book]
+        ).values_list('book_id', 'id'))
+
+        new = []
+        for (row, entry), book in zip(book_entries, books):
+            if book is None:
+                self._error(row, f'Book not found: {entry["title"] or entry["isbn"]}')
+                continue
+            if book.id in existing:
+                # Leave books already in the library (or earlier in this file) alone
+                self._count('existing')
+                if entry['external_id'] is not None:
+                    self.library_import.id_map[str(entry['external_id'])] = None
+                continue
+            user_book = UserBook(user=self.user, book=book, **entry['fields'])
+            existing[book.id] = None
+            new.append((entry, user_book))
+
+        UserBook.objects.bulk_create([user_book for _, user_book in new])
+        count_shelvings(user_book.book_id for _, user_book in new)
+        self._count('books', len(new))
+
+        Through = UserBook.shelves.through
+        links = [
+            Through(userbook_id=user_book.pk, shelf_id=shelf_ids[name[:SHELF_NAME_LENGTH]])
+            for entry, user_book in new for name in entry['shelves']
+        ]
+        Through.objects.bulk_create(links, ignore_conflicts=True)
+
+        reviews = [
+            Review(user_book=user_book, content=entry['review'])
+            for entry, user_book in new if entry['review']
+        ]
+        Review.objects.bulk_create(reviews)
+        self._count('reviews', len(reviews))
+
+        for entry, user_book in new:
+            if entry['external_id'] is not None:
+                self.library_import.id_map[str(entry['external_id'])] = user_book.pk
+        return [user_book for _, user_book in new]
+
+    @staticmethod
+    def _child(kind: str, user_book_id: int, data: Dict):
+        if kind == REVIEW:
+            return Review(user_book_id=user_book_id, content=data['content'],
+                          is_public=bool(data.get('is_public')))
+        if kind in (NOTE, QUOTE):
+            model = Note if kind == NOTE else Quote
+            return model(user_book_id=user_book_id, content=data['content'],
+                         page_number=data.get('page_number'))
+        start_time = parse_datetime(data['start_time'])
+        end_time = parse_datetime(data['end_time'])
+        if start_time is None or end_time is None or end_time < start_time:
+            raise ValueError('Invalid session times')
+        if int(data['end_page']) < int(data['start_page']):
+            raise ValueError('End page cannot be less than start page')
+        return ReadingSession(
+            user_book_id=user_book_id, start_page=int(data['start_page']),
+            end_page=int(data['end_page']), start_time=start_time, end_time=end_time,
+            notes=data.get('notes') or ''
+        )
+
+    def _write_children(self, by_kind: Dict) -> Tuple[List[ReadingSession], bool]:
+        """
+        Reviews, notes, quotes and sessions from an NDJSON export, attached to
+        the user books imported for their exported user book ids.
+        """
+        id_map = self.library_import.id_map
+        new_sessions = []
+        public_reviews = False
+        for kind in CHILD_KINDS:
+            objects = []
+            for row, entry in by_kind.get(kind, []):
+                key = str(entry['user_book'])
+                if key not in id_map:
+                    self._error(row, f'Unknown user book: {entry["user_book"]}')
+                    continue
+                if id_map[key] is None:
+                    self._count('skipped')
+                    continue
+                try:
+                    objects.append(self._child(kind, id_map[key], entry['data']))
+                except (ValueError, KeyError, TypeError) as e:
+                    self._error(row, str(e))
+
+            objects = CHILD_MODELS[kind].objects.bulk_create(objects)
+            self._count(kind, len(objects))
+            if kind == SESSION:
+                new_sessions = objects
+            elif kind == REVIEW:
+                public = [review for review in objects if review.is_public]
+                sync_reviews(public)
+                public_reviews = bool(public)
+        return new_sessions, public_reviews
+
+
+def run_import(library_import: LibraryImport, lines: Iterable[str], chunk_size: int = 200,
+               max_workers: int = 8) -> LibraryImport:
+    return LibraryImporter(library_import, chunk_size, max_workers).run(lines)
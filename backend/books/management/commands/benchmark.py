@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+from books.benchmarks import compare_to_baseline, generate_dataset, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the API on a throwaway test database filled with synthetic data, '
+        'with Google Books replaced by a local stub'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--books', type=int, default=2000, help='Size of the catalog')
+        parser.add_argument('--books-per-user', type=int, default=100)
+        parser.add_argument('--sessions-per-book', type=int, default=3)
+        parser.add_argument('--notes-per-book', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--scenarios', nargs='*', help='Scenarios to run (default: all)')
+        parser.add_argument('--iterations', type=int, default=50, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per scenario')
+        parser.add_argument('--stub-latency-ms', type=float, default=0,
+                            help='Latency added by the Google Books stub')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='Fail on regressions against this results file')
+        parser.add_argument('--latency-tolerance', type=float, default=0.25,
+                            help='Allowed p95 increase over the baseline (0.25 = 25%%)')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Could not read baseline: {e}')
+
+        old_name = connection.settings_dict['NAME']
+        old_test_name = connection.settings_dict['TEST'].get('NAME')
+        temp_dir = None
+        if connection.vendor == 'sqlite' and not old_test_name:
+            # A file rather than Django's default in-memory test database,
+            # so the journal mode and locking match a real deployment
+            temp_dir = tempfile.TemporaryDirectory()
+            connection.settings_dict['TEST']['NAME'] = os.path.join(temp_dir.name, 'benchmark.sqlite3')
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        mirrors = {}
+        for alias in connections:
+            if connections[alias].settings_dict['TEST'].get('MIRROR') == connection.alias:
+                mirrors[alias] = connections[alias].settings_dict['NAME']
+                connections[alias].close()
+                connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+        try:
+            dataset = generate_dataset(
+                users=options['users'],
+                books=options['books'],
+                books_per_user=options['books_per_user'],
+                sessions_per_book=options['sessions_per_book'],
+                notes_per_book=options['notes_per_book'],
+                seed=options['seed'],
+            )
+            try:
+                results = run_benchmarks(
+                    options['scenarios'],
+                    iterations=options['iterations'],
+                    warmup=options['warmup'],
+                    stub_latency_ms=options['stub_latency_ms'],
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+        finally:
+            for alias, name in mirrors.items():
+                connections[alias].close()
+                connections[alias].settings_dict['NAME'] = name
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            connection.settings_dict['TEST']['NAME'] = old_test_name
+            teardown_test_environment()
+            if temp_dir is not None:
+                temp_dir.cleanup()
+        results['meta']['dataset'] = dataset
+
+        self.stdout.write(
+            f"{'scenario':<20}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}"
+            f"{'queries':>10}{'errors':>8}{'rss MB':>10}"
+        )
+        for name, result in results['scenarios'].items():
+            errors = sum(count for code, count in result['status_codes'].items() if not code.startswith(('2', '3')))
+            self.stdout.write(
+                f"{name:<20}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                f"{result['throughput_rps']:>10.1f}{result['queries_per_request']:>10.2f}{errors:>8}"
+                f"{result['rss_mb']:>10.1f}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+                f.write('\n')
+
+        if baseline is not None:
+            regressions = compare_to_baseline(results, baseline, options['latency_tolerance'])
+            if regressions:
+                raise CommandError('Performance regressions:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
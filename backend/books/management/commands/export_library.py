@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from books.exporting import EXPORT_FORMATS, EXPORT_TYPES, NDJSON, export_stream
+
+
+class Command(BaseCommand):
+    help = "Stream a user's library (books, shelves, sessions, notes, quotes, reviews) as NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default=NDJSON)
+        parser.add_argument('--type', choices=EXPORT_TYPES,
+                            help='Only export this record type (CSV defaults to books)')
+        parser.add_argument('--output', help='Write to this file instead of stdout')
+        parser.add_argument('--chunk-size', type=int, default=settings.EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']}")
+
+        chunks, _ = export_stream(user, options['format'], options['type'], options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
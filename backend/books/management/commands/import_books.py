@@ -0,0 +1,54 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from books.importers import (
+    GOOGLE_BOOKS_ID, ISBN, guess_file_format, import_books, parse_identifier_file, summarize
+)
+
+
+class Command(BaseCommand):
+    help = 'Bulk import books by Google Books ID or ISBN, from arguments or a CSV/JSON-lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='CSV (with a header row) or JSON-lines file of identifiers')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='File format (guessed from the extension)')
+        parser.add_argument('--ids', nargs='*', default=[], help='Google Books IDs')
+        parser.add_argument('--isbns', nargs='*', default=[], help='ISBN-10 or ISBN-13 numbers')
+        parser.add_argument('--batch-size', type=int, default=settings.BULK_IMPORT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=settings.BULK_IMPORT_MAX_WORKERS,
+                            help='Maximum concurrent Google Books requests')
+        parser.add_argument('--report', help='Write per-item results as JSON lines to this file')
+
+    def handle(self, *args, **options):
+        identifiers = [(GOOGLE_BOOKS_ID, value) for value in options['ids']]
+        identifiers += [(ISBN, value) for value in options['isbns']]
+
+        if options['file']:
+            file_format = options['format'] or guess_file_format(options['file'])
+            try:
+                with open(options['file'], encoding='utf-8-sig', newline='') as f:
+                    identifiers += list(parse_identifier_file(f, file_format))
+            except (OSError, ValueError) as e:
+                raise CommandError(str(e))
+
+        if not identifiers:
+            raise CommandError('Nothing to import: pass --file, --ids or --isbns')
+
+        summary = summarize(import_books(
+            identifiers,
+            batch_size=options['batch_size'],
+            max_workers=options['workers']
+        ))
+
+        if options['report']:
+            with open(options['report'], 'w') as f:
+                for result in summary['results']:
+                    f.write(json.dumps(result) + '\n')
+        else:
+            for result in summary['results']:
+                if result['status'] == 'failed':
+                    self.stderr.write(f"{result['type']} {result['identifier']}: {result['error']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {summary['imported']} of {summary['total']} books ({summary['failed']} failed)"
+        ))
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from books.library_import import IMPORT_FORMATS, guess_import_format, run_import
+from books.models import LibraryImport
+
+
+class Command(BaseCommand):
+    help = "Import a Goodreads CSV export or an NDJSON library export into a user's library"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('file')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='File format (guessed from the extension)')
+        parser.add_argument('--resume', type=int, metavar='IMPORT_ID',
+                            help='Continue an interrupted import of the same file')
+        parser.add_argument('--chunk-size', type=int, default=settings.LIBRARY_IMPORT_CHUNK_SIZE)
+        parser.add_argument('--workers', type=int, default=settings.BULK_IMPORT_MAX_WORKERS,
+                            help='Maximum concurrent Google Books requests')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']}")
+
+        if options['resume']:
+            try:
+                library_import = LibraryImport.objects.get(id=options['resume'], user=user)
+            except LibraryImport.DoesNotExist:
+                raise CommandError(f"No import {options['resume']} for {user.username}")
+            library_import.status = 'running'
+        else:
+            library_import = LibraryImport.objects.create(
+                user=user,
+                file_format=options['format'] or guess_import_format(options['file']),
+                file_name=options['file'][-255:]
+            )
+
+        try:
+            with open(options['file'], encoding='utf-8-sig', newline='') as f:
+                run_import(library_import, f, options['chunk_size'], options['workers'])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        counts = ', '.join(f'{count} {key}' for key, count in sorted(library_import.counts.items()))
+        for error in library_import.errors:
+            self.stderr.write(f"Row {error['row']}: {error['error']}")
+        message = f"Import {library_import.id} {library_import.status} after {library_import.rows_processed} rows ({counts or 'nothing imported'})"
+        if library_import.status == 'completed':
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            raise CommandError(f'{message}; rerun with --resume {library_import.id}')
@@ -0,0 +1,24 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from books.statistics import rebuild_statistics
+
+
+class Command(BaseCommand):
+    help = 'Recompute materialized reading statistics from UserBook and ReadingSession rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help='Only rebuild these users (default: everyone)')
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+            missing = set(options['usernames']) - set(users.values_list('username', flat=True))
+            if missing:
+                raise CommandError(f"Unknown users: {', '.join(sorted(missing))}")
+
+        count = 0
+        for user in users.iterator():
+            rebuild_statistics(user)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt reading statistics for {count} users'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from books.models import Book
+from books.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for the Book catalog'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {type(backend).__name__} index for {Book.objects.count()} books'
+        ))
@@ -0,0 +1,30 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from books.catalog_refresh import refresh_catalog
+
+
+class Command(BaseCommand):
+    help = 'Re-fetch stale book metadata from Google Books, storing only what changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age-days', type=int, default=settings.CATALOG_REFRESH_MAX_AGE_DAYS,
+                            help='Refresh books not fetched for this many days')
+        parser.add_argument('--batch-size', type=int, default=settings.CATALOG_REFRESH_BATCH_SIZE)
+        parser.add_argument('--limit', type=int, default=settings.CATALOG_REFRESH_LIMIT,
+                            help='Maximum number of books checked in this run')
+        parser.add_argument('--workers', type=int, default=settings.BULK_IMPORT_MAX_WORKERS,
+                            help='Maximum concurrent Google Books requests')
+
+    def handle(self, *args, **options):
+        summary = refresh_catalog(
+            max_age=timedelta(days=options['max_age_days']),
+            batch_size=options['batch_size'],
+            limit=options['limit'],
+            max_workers=options['workers'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {summary['checked']} books in {summary['batches']} batches: "
+            f"{summary['changed']} changed, {summary['unchanged']} unchanged, "
+            f"{summary['failed']} failed ({summary['books_per_second']} books/s)"
+        ))
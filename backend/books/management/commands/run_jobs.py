@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from books.jobs import HANDLERS, Worker
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (metadata refreshes, bulk imports, ...)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.JOBS_WORKER_CONCURRENCY,
+                            help='Jobs run at once on the thread pool')
+        parser.add_argument('--poll-interval', type=float, default=settings.JOBS_POLL_INTERVAL)
+        parser.add_argument('--kinds', nargs='*', choices=sorted(HANDLERS),
+                            help='Only run jobs of these kinds')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once no jobs are due instead of polling forever')
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+            kinds=options['kinds'],
+        )
+        if options['once']:
+            count = worker.run_pending()
+            self.stdout.write(self.style.SUCCESS(f'Ran {count} jobs'))
+            return
+
+        self.stdout.write(f'Worker {worker.worker_id} waiting for jobs (Ctrl+C to stop)')
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            worker.stop()
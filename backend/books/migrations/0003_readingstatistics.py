@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0002_book_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReadingStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_books', models.IntegerField(default=0)),
+                ('want_to_read_count', models.IntegerField(default=0)),
+                ('reading_count', models.IntegerField(default=0)),
+                ('read_count', models.IntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('session_count', models.IntegerField(default=0)),
+                ('pages_read', models.IntegerField(default=0)),
+                ('reading_seconds', models.BigIntegerField(default=0)),
+                ('daily_activity', models.JSONField(default=dict)),
+                ('genre_counts', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reading_statistics', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_json_indexes(apps, schema_editor):
+    # GIN indexes for containment lookups on the JSON arrays
+    # (authors__contains=[...]); only Postgres has an index type for them.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS book_authors_gin_idx ON books_book '
+        'USING GIN (authors jsonb_path_ops)'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS book_categories_gin_idx ON books_book '
+        'USING GIN (categories jsonb_path_ops)'
+    )
+
+
+def drop_json_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS book_authors_gin_idx')
+    schema_editor.execute('DROP INDEX IF EXISTS book_categories_gin_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0003_readingstatistics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['language'], name='book_language_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['created_at'], name='review_public_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shelf',
+            index=models.Index(fields=['user', 'created_at'], name='shelf_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userbook',
+            index=models.Index(fields=['user', 'status'], name='userbook_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userbook',
+            index=models.Index(fields=['user', 'created_at'], name='userbook_user_created_idx'),
+        ),
+        migrations.RunPython(create_json_indexes, drop_json_indexes),
+    ]
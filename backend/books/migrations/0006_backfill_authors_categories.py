@@ -0,0 +1,49 @@
+from django.db import migrations
+
+
+def clean_names(values):
+    names = []
+    for value in values or []:
+        if isinstance(value, str):
+            name = value.strip()[:255]
+            if name and name not in names:
+                names.append(name)
+    return names
+
+
+def backfill(apps, schema_editor):
+    Book = apps.get_model('books', 'Book')
+    Author = apps.get_model('books', 'Author')
+    Category = apps.get_model('books', 'Category')
+    AuthorLink = Book.normalized_authors.through
+    CategoryLink = Book.normalized_categories.through
+
+    authors = {}
+    categories = {}
+    author_links = []
+    category_links = []
+
+    def id_for(model, cache, name):
+        if name not in cache:
+            cache[name] = model.objects.get_or_create(name=name)[0].id
+        return cache[name]
+
+    for book in Book.objects.only('id', 'authors', 'categories').iterator(chunk_size=1000):
+        for name in clean_names(book.authors):
+            author_links.append(AuthorLink(book_id=book.id, author_id=id_for(Author, authors, name)))
+        for name in clean_names(book.categories):
+            category_links.append(CategoryLink(book_id=book.id, category_id=id_for(Category, categories, name)))
+
+    AuthorLink.objects.bulk_create(author_links, batch_size=1000, ignore_conflicts=True)
+    CategoryLink.objects.bulk_create(category_links, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0005_author_category'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0006_backfill_authors_categories'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userbook',
+            name='progress_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
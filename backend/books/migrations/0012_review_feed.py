@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    Review = apps.get_model('books', 'Review')
+    ReviewFeedEntry = apps.get_model('books', 'ReviewFeedEntry')
+    entries = []
+    reviews = Review.objects.filter(is_public=True).select_related('user_book__user', 'user_book__book')
+    for review in reviews.iterator(chunk_size=1000):
+        user_book = review.user_book
+        entries.append(ReviewFeedEntry(
+            review_id=review.id,
+            user_book_id=user_book.id,
+            user_id=user_book.user_id,
+            book_id=user_book.book_id,
+            username=user_book.user.username,
+            book_title=user_book.book.title,
+            book_thumbnail_url=user_book.book.thumbnail_url,
+            rating=user_book.rating,
+            content=review.content,
+            created_at=review.created_at,
+            updated_at=review.updated_at,
+        ))
+    ReviewFeedEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0011_book_refresh_tracking'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewFeedEntry',
+            fields=[
+                ('review', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_entry', serialize=False, to='books.review')),
+                ('username', models.CharField(max_length=150)),
+                ('book_title', models.CharField(max_length=255)),
+                ('book_thumbnail_url', models.URLField(blank=True, max_length=500)),
+                ('rating', models.IntegerField(blank=True, null=True)),
+                ('content', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='books.book')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('user_book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='books.userbook')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at', 'review'], name='feed_created_idx'), models.Index(fields=['book', 'created_at', 'review'], name='feed_book_created_idx'), models.Index(fields=['user', 'created_at', 'review'], name='feed_user_created_idx')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:59
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_shelved_books(apps, schema_editor):
+    Book = apps.get_model('books', 'Book')
+    UserBook = apps.get_model('books', 'UserBook')
+    shelved = UserBook.objects.filter(book=OuterRef('pk')).order_by().values('book').annotate(
+        count=Count('pk')
+    ).values('count')
+    Book.objects.update(shelved_count=Coalesce(Subquery(shelved), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0014_book_refresh_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='book',
+            name='book_last_fetched_idx',
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='shelved_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(count_shelved_books, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['-shelved_count', 'last_fetched_at', 'id'], name='book_refresh_priority_idx'),
+        ),
+    ]
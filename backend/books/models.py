@@ -2,6 +2,22 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+
+class Author(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+
+    def __str__(self):
+        return self.name
+
+class Category(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+
+    class Meta:
+        verbose_name_plural = 'categories'
+
+    def __str__(self):
+        return self.name
 
 class Book(models.Model):
     google_books_id = models.CharField(max_length=100, unique=True)
@@ -13,6 +29,25 @@ class Book(models.Model):
     categories = models.JSONField(default=list)  # Store as JSON array
     thumbnail_url = models.URLField(max_length=500, blank=True)
     language = models.CharField(max_length=10, blank=True)
+    # Normalized copies of the JSON arrays above, kept in sync by
+    # books/taxonomy.py, for indexed "books by X" lookups and faceting
+    normalized_authors = models.ManyToManyField(Author, related_name='books', blank=True)
+    normalized_categories = models.ManyToManyField(Category, related_name='books', blank=True)
+    # When the metadata was last fetched from Google Books and a hash of it,
+    # so the catalog refresh (books/catalog_refresh.py) only rewrites changes
+    last_fetched_at = models.DateTimeField(null=True, blank=True)
+    content_hash = models.CharField(max_length=40, blank=True)
+    # Number of user books for this book, kept by the UserBook signals and
+    # the bulk paths, so the catalog refresh can put popular books first
+    # without counting them on every batch
+    shelved_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['language'], name='book_language_idx'),
+            # Keyset order of catalog_refresh.stale_books
+            models.Index(fields=['-shelved_count', 'last_fetched_at', 'id'], name='book_refresh_priority_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -25,6 +60,9 @@ class Shelf(models.Model):
 
     class Meta:
         unique_together = ['name', 'user']
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='shelf_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s {self.name} shelf"
@@ -50,9 +88,16 @@ class UserBook(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Client timestamp of the last progress update applied through the batch
+    # sync endpoint; older replayed updates lose to it
+    progress_updated_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = ['user', 'book']
+        indexes = [
+            models.Index(fields=['user', 'status'], name='userbook_user_status_idx'),
+            models.Index(fields=['user', 'created_at'], name='userbook_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s {self.book.title}"
@@ -85,9 +130,51 @@ class Review(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # The public review feed only ever reads public rows
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(is_public=True),
+                name='review_public_created_idx'
+            ),
+        ]
+
     def __str__(self):
         return f"Review for {self.user_book}"
 
+class ReviewFeedEntry(models.Model):
+    """
+    A public review with the username, book title, thumbnail and rating it
+    is shown with copied inline, so the public feed reads one indexed table
+    without joins. Maintained on write by books/review_feed.py.
+    """
+    review = models.OneToOneField(Review, on_delete=models.CASCADE, primary_key=True, related_name='feed_entry')
+    user_book = models.ForeignKey(UserBook, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    book = models.ForeignKey(Book, on_delete=models.CASCADE)
+    username = models.CharField(max_length=150)
+    book_title = models.CharField(max_length=255)
+    book_thumbnail_url = models.URLField(max_length=500, blank=True)
+    rating = models.IntegerField(null=True, blank=True)
+    content = models.TextField()
+    # The review's own timestamps
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    # Only public reviews have entries
+    is_public = True
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'review'], name='feed_created_idx'),
+            models.Index(fields=['book', 'created_at', 'review'], name='feed_book_created_idx'),
+            models.Index(fields=['user', 'created_at', 'review'], name='feed_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Feed entry for {self.review_id}"
+
 class Quote(models.Model):
     user_book = models.ForeignKey(UserBook, on_delete=models.CASCADE)
     content = models.TextField()
@@ -95,4 +182,134 @@ class Quote(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Quote from {self.user_book}"
\ No newline at end of file
+        return f"Quote from {self.user_book}"
+
+class ReadingStatistics(models.Model):
+    """
+    Per-user reading statistics, maintained incrementally by the signals in
+    books/signals.py so the statistics endpoint reads a single row.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='reading_statistics')
+    total_books = models.IntegerField(default=0)
+    want_to_read_count = models.IntegerField(default=0)
+    reading_count = models.IntegerField(default=0)
+    read_count = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    session_count = models.IntegerField(default=0)
+    pages_read = models.IntegerField(default=0)
+    reading_seconds = models.BigIntegerField(default=0)
+    # {'YYYY-MM-DD': [pages, sessions, seconds]} keyed by session end date
+    daily_activity = models.JSONField(default=dict)
+    # {category: number of the user's books in that category}
+    genre_counts = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Reading statistics for {self.user.username}"
+
+class CollectionVersion(models.Model):
+    """
+    Per-user counter bumped on every write to the user's collection (books,
+    shelves, sessions, notes, quotes, reviews). It is the validator behind
+    the ETags in books/versioning.py.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='collection_version')
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Collection version {self.version} for {self.user.username}"
+
+class LibraryImport(models.Model):
+    """
+    Progress of a streaming library import (books/library_import.py). Each
+    chunk of rows is committed together with this checkpoint, so an
+    interrupted import can be resumed from rows_processed.
+    """
+    FORMAT_CHOICES = [
+        ('goodreads', 'Goodreads CSV'),
+        ('ndjson', 'Library export (NDJSON)'),
+    ]
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    file_format = models.CharField(max_length=20, choices=FORMAT_CHOICES)
+    file_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    rows_processed = models.IntegerField(default=0)
+    # {'books': created, 'existing': already in the library, 'shelves': ..., 'failed': ...}
+    counts = models.JSONField(default=dict)
+    # [{'row': n, 'error': message}], capped
+    errors = models.JSONField(default=list)
+    # Exported user book id -> imported UserBook id (null if it already
+    # existed), for reviews/notes/quotes/sessions in later chunks
+    id_map = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.get_file_format_display()} import for {self.user.username}"
+
+class Job(models.Model):
+    """
+    A unit of background work (books/jobs.py), run by the run_jobs worker
+    command so upstream calls stay off request threads.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    # Jobs of a kind with the same non-empty key (e.g. a google_books_id)
+    # are queued at most once at a time
+    dedupe_key = models.CharField(max_length=200, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    # Touched every JOBS_HEARTBEAT_INTERVAL seconds while the job runs
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+            models.Index(fields=['user', 'created_at'], name='job_user_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'dedupe_key'],
+                condition=models.Q(status__in=['queued', 'running']) & ~models.Q(dedupe_key=''),
+                name='job_active_dedupe_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} job {self.id} ({self.status})"
+
+
+class JobSchedule(models.Model):
+    """
+    When each JOBS_PERIODIC job kind is next due, shared by all workers so
+    only one of them queues it per interval.
+    """
+    kind = models.CharField(max_length=50, unique=True)
+    next_run_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.kind} due {self.next_run_at}"
@@ -0,0 +1,22 @@
+# backend/books/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination: each page is fetched with a WHERE on the
+    ordering key instead of an OFFSET, so deep pages cost the same as the
+    first one.
+
+    Views choose their ordering with a `cursor_ordering` attribute. The first
+    field is the cursor position, so it should be (nearly) unique and
+    indexed; the trailing id keeps rows with equal positions in a stable
+    order.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, 'cursor_ordering', self.ordering)
@@ -0,0 +1,239 @@
+# backend/books/resilience.py
+import asyncio
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from requests import RequestException
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class UpstreamUnavailable(RequestException):
+    """
+    The request was not sent: the circuit is open or no rate limit token
+    became available in time. A RequestException, so callers that already
+    handle network errors handle this too.
+    """
+
+
+class RateLimiter:
+    """
+    Token bucket refilling `rate` tokens per second up to `burst`, kept in a
+    cache backend so every worker sharing that backend draws from the same
+    bucket. Stored as a single "theoretical arrival time" (GCRA), updated
+    under a short cache lock.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int = 1, alias: str = 'default'):
+        self.name = name
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.alias = alias
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def _key(self, suffix: str) -> str:
+        return f'ratelimit:{self.name}:{suffix}'
+
+    def _lock(self, deadline: float) -> str:
+        token = uuid.uuid4().hex
+        while not self.backend.add(self._key('lock'), token, 1):
+            if time.monotonic() >= deadline:
+                return ''
+            time.sleep(0.001)
+        return token
+
+    def _unlock(self, token: str) -> None:
+        if self.backend.get(self._key('lock')) == token:
+            self.backend.delete(self._key('lock'))
+
+    def _take(self, deadline: float) -> float:
+        """
+        Take a token, or return how many seconds until one is available.
+        """
+        token = self._lock(deadline)
+        if not token:
+            return 0.001
+        try:
+            now = time.time()
+            interval = 1 / self.rate
+            arrival = max(self.backend.get(self._key('tat'), now), now) + interval
+            wait = arrival - now - self.burst * interval
+            if wait > 0:
+                return wait
+            self.backend.set(self._key('tat'), arrival, int(self.burst * interval) + 1)
+            return 0
+        finally:
+            self._unlock(token)
+
+    def acquire(self, timeout: float = 0) -> bool:
+        """
+        Take a token, waiting up to `timeout` seconds for one.
+        """
+        if self.rate <= 0:
+            return True
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self._take(deadline)
+            if not wait:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def aacquire(self, timeout: float = 0) -> bool:
+        """
+        asyncio variant of acquire(): waits on the event loop instead of
+        blocking it, including while another caller holds the lock. The
+        cache round trips run in a thread.
+        """
+        if self.rate <= 0:
+            return True
+        deadline = time.monotonic() + timeout
+        while True:
+            # A deadline of now tries the lock once rather than spinning on it
+            wait = await sync_to_async(self._take)(time.monotonic())
+            if not wait:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    def reset(self) -> None:
+        self.backend.delete_many([self._key('tat'), self._key('lock')])
+
+
+class CircuitBreaker:
+    """
+    Stops calls to an upstream after `failure_threshold` consecutive
+    failures. Once `recovery_timeout` seconds have passed a single caller
+    (across all workers sharing the cache backend) is let through as a
+    probe: success closes the circuit, failure keeps it open for another
+    `recovery_timeout`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30,
+                 alias: str = 'default'):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.alias = alias
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def _key(self, suffix: str) -> str:
+        return f'circuit:{self.name}:{suffix}'
+
+    def state(self) -> str:
+        opened_at = self.backend.get(self._key('opened_at'))
+        if opened_at is None:
+            return CLOSED
+        if time.time() - opened_at < self.recovery_timeout:
+            return OPEN
+        return HALF_OPEN
+
+    def allow(self) -> bool:
+        state = self.state()
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+        # Only the caller that wins the add() probes
+        return self.backend.add(self._key('probe'), 1, max(int(self.recovery_timeout), 1))
+
+    def record_success(self) -> None:
+        if self.backend.get(self._key('opened_at')) is not None:
+            self.reset()
+        elif self.backend.get(self._key('failures')):
+            self.backend.delete(self._key('failures'))
+
+    def record_failure(self) -> None:
+        if self.backend.get(self._key('opened_at')) is not None:
+            # A failed probe (or a call that was already in flight)
+            self._open()
+            return
+        try:
+            failures = self.backend.incr(self._key('failures'))
+        except ValueError:
+            self.backend.add(self._key('failures'), 0, None)
+            failures = self.backend.incr(self._key('failures'))
+        if failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self.backend.set(self._key('opened_at'), time.time(), None)
+        self.backend.delete(self._key('probe'))
+
+    def reset(self) -> None:
+        self.backend.delete_many([self._key('opened_at'), self._key('failures'), self._key('probe')])
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key within this process: the
+    first caller runs the function and the others wait for its result (or
+    exception) instead of issuing the same request again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of SingleFlight: concurrent awaits with the same key
+    on one event loop share a single task. The task is shielded, so a
+    waiter being cancelled doesn't cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[tuple, asyncio.Task] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        call_key = (asyncio.get_running_loop(), key)
+        task = self._calls.get(call_key)
+        if task is None:
+            task = self._calls[call_key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._calls.pop(call_key, None))
+        return await asyncio.shield(task)
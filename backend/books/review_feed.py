@@ -0,0 +1,92 @@
+# backend/books/review_feed.py
+from typing import Iterable
+from django.contrib.auth.models import User
+from .models import Book, Review, ReviewFeedEntry, UserBook
+from .view_cache import invalidate_public_reviews
+
+ENTRY_FIELDS = [
+    'user_book', 'user', 'book', 'username', 'book_title', 'book_thumbnail_url', 'rating',
+    'content', 'created_at', 'updated_at',
+]
+
+
+def _entry(review: Review, user_book: UserBook) -> ReviewFeedEntry:
+    return ReviewFeedEntry(
+        review_id=review.pk,
+        user_book_id=user_book.pk,
+        user_id=user_book.user_id,
+        book_id=user_book.book_id,
+        username=user_book.user.username,
+        book_title=user_book.book.title,
+        book_thumbnail_url=user_book.book.thumbnail_url,
+        rating=user_book.rating,
+        content=review.content,
+        created_at=review.created_at,
+        updated_at=review.updated_at,
+    )
+
+
+def sync_reviews(reviews: Iterable[Review]) -> None:
+    """
+    Write the feed entries of `reviews`: public ones are added or rewritten,
+    the others' entries removed (a review made private). Bulk writes that
+    skip the Review signals call this themselves.
+    """
+    reviews = list(reviews)
+    private = [review.pk for review in reviews if not review.is_public]
+    if private:
+        ReviewFeedEntry.objects.filter(review_id__in=private).delete()
+
+    public = [review for review in reviews if review.is_public]
+    if not public:
+        return
+    user_books = UserBook.objects.select_related('user', 'book').in_bulk(
+        {review.user_book_id for review in public}
+    )
+    ReviewFeedEntry.objects.bulk_create(
+        [_entry(review, user_books[review.user_book_id]) for review in public],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['review'],
+        update_fields=ENTRY_FIELDS,
+    )
+
+
+def update_ratings(user_books: Iterable[UserBook]) -> None:
+    changed = 0
+    for user_book in user_books:
+        changed += ReviewFeedEntry.objects.filter(user_book=user_book).exclude(
+            rating=user_book.rating
+        ).update(rating=user_book.rating)
+    if changed:
+        invalidate_public_reviews()
+
+
+def update_books(books: Iterable[Book]) -> None:
+    """
+    Copy new titles and thumbnails of `books` into their feed entries. Costs
+    one query unless one of the books has reviews showing stale values.
+    """
+    by_id = {book.pk: book for book in books}
+    if not by_id:
+        return
+    shown = set(
+        ReviewFeedEntry.objects.filter(book_id__in=list(by_id))
+        .values_list('book_id', 'book_title', 'book_thumbnail_url')
+        .distinct()
+    )
+    stale = {
+        book_id for book_id, title, thumbnail_url in shown
+        if (title, thumbnail_url) != (by_id[book_id].title, by_id[book_id].thumbnail_url)
+    }
+    for book_id in stale:
+        book = by_id[book_id]
+        ReviewFeedEntry.objects.filter(book_id=book_id).update(
+            book_title=book.title, book_thumbnail_url=book.thumbnail_url
+        )
+    if stale:
+        invalidate_public_reviews()
+
+
+def update_username(user: User) -> None:
+    ReviewFeedEntry.objects.filter(user=user).exclude(username=user.username).update(username=user.username)
@@ -0,0 +1,292 @@
+# backend/books/search.py
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db import connection, connections, router
+from django.db.models import Q
+from .models import Book
+from .serializers import BookSerializer
+from .services import GoogleBooksService
+
+FTS_TABLE = 'books_book_fts'
+
+# Weighted document used by the Postgres backend. The GIN index created in
+# migration 0002 is built over exactly this expression, so keep them in sync.
+PG_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(authors::text, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(categories::text, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'D')"
+)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _read_connection():
+    # The replica when the current request reads from one
+    return connections[router.db_for_read(Book)]
+
+
+def tokenize(query: str) -> List[str]:
+    return _TOKEN_RE.findall(query.lower())
+
+
+def install(conn) -> None:
+    """
+    Create the search index structures for the given connection's backend.
+    Called from the migration, so it only uses raw SQL.
+    """
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "title, authors, categories, description, "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}(rowid, title, authors, categories, description) "
+                "SELECT id, title, authors, categories, description FROM books_book"
+            )
+        elif conn.vendor == 'postgresql':
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS books_book_search_idx ON books_book "
+                f"USING GIN (({PG_SEARCH_DOCUMENT}))"
+            )
+
+
+def uninstall(conn) -> None:
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        elif conn.vendor == 'postgresql':
+            cursor.execute("DROP INDEX IF EXISTS books_book_search_idx")
+
+
+class SimpleSearchBackend:
+    """
+    Fallback for databases without a native full-text engine. Matches every
+    term against title/authors/categories/description; results are unranked.
+    """
+
+    def index_book(self, book: Book) -> None:
+        pass
+
+    def remove_book(self, book_id: int) -> None:
+        pass
+
+    def rebuild(self) -> None:
+        pass
+
+    def search(self, query: str, limit: int, offset: int = 0) -> Tuple[List[int], int]:
+        queryset = Book.objects.all()
+        for term in tokenize(query):
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(authors__icontains=term) |
+                Q(categories__icontains=term) | Q(description__icontains=term)
+            )
+        total = queryset.count()
+        ids = list(queryset.order_by('id').values_list('id', flat=True)[offset:offset + limit])
+        return ids, total
+
+
+class SQLiteFTSBackend:
+    """
+    SQLite FTS5 index keyed by Book.id, ranked with BM25.
+    """
+
+    # BM25 column weights: title, authors, categories, description
+    WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        # Quote every term so user input can't inject FTS syntax; the last
+        # term is a prefix match to support search-as-you-type.
+        terms = [f'"{term}"' for term in tokenize(query)]
+        if terms:
+            terms[-1] += '*'
+        return ' '.join(terms)
+
+    def index_book(self, book: Book) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [book.id])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}(rowid, title, authors, categories, description) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [
+                    book.id,
+                    book.title,
+                    ' '.join(book.authors or []),
+                    ' '.join(book.categories or []),
+                    book.description,
+                ]
+            )
+
+    def remove_book(self, book_id: int) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [book_id])
+
+    def rebuild(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        for book in Book.objects.iterator(chunk_size=1000):
+            self.index_book(book)
+
+    def search(self, query: str, limit: int, offset: int = 0) -> Tuple[List[int], int]:
+        match = self._match_expression(query)
+        if not match:
+            return [], 0
+
+        weights = ', '.join(str(weight) for weight in self.WEIGHTS)
+        with _read_connection().cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                [match]
+            )
+            total = cursor.fetchone()[0]
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}, {weights}), rowid LIMIT %s OFFSET %s",
+                [match, limit, offset]
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        return ids, total
+
+
+class PostgresSearchBackend:
+    """
+    Postgres full-text search over a GIN expression index, ranked with ts_rank.
+    The index is maintained by Postgres itself.
+    """
+
+    def index_book(self, book: Book) -> None:
+        pass
+
+    def remove_book(self, book_id: int) -> None:
+        pass
+
+    def rebuild(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("REINDEX INDEX books_book_search_idx")
+
+    @staticmethod
+    def _tsquery(query: str) -> str:
+        terms = tokenize(query)
+        if terms:
+            terms[-1] += ':*'
+        return ' & '.join(terms)
+
+    def search(self, query: str, limit: int, offset: int = 0) -> Tuple[List[int], int]:
+        tsquery = self._tsquery(query)
+        if not tsquery:
+            return [], 0
+
+        with _read_connection().cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM books_book "
+                f"WHERE ({PG_SEARCH_DOCUMENT}) @@ to_tsquery('simple', %s)",
+                [tsquery]
+            )
+            total = cursor.fetchone()[0]
+            cursor.execute(
+                f"SELECT id FROM books_book "
+                f"WHERE ({PG_SEARCH_DOCUMENT}) @@ to_tsquery('simple', %s) "
+                f"ORDER BY ts_rank(({PG_SEARCH_DOCUMENT}), to_tsquery('simple', %s)) DESC, id "
+                "LIMIT %s OFFSET %s",
+                [tsquery, tsquery, limit, offset]
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        return ids, total
+
+
+def get_search_backend():
+    if connection.vendor == 'sqlite':
+        return SQLiteFTSBackend()
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return SimpleSearchBackend()
+
+
+def search_books(query: str, limit: int = 20, offset: int = 0) -> Tuple[List[Book], int]:
+    """
+    Run a ranked full-text search over the local catalog.
+    Returns the requested page of Book instances in rank order and the total
+    number of matches.
+    """
+    ids, total = get_search_backend().search(query, limit, offset)
+    books_by_id = Book.objects.in_bulk(ids)
+    return [books_by_id[book_id] for book_id in ids if book_id in books_by_id], total
+
+
+def upsert_remote_results(books: List[Dict]) -> None:
+    """
+    Store Google Books results in the local catalog so later searches can be
+    answered locally, skipping books already stored. Queued as an
+    upsert_books job, deduplicated by the set of google_books_ids, unless
+    GOOGLE_BOOKS_UPSERT_IN_BACKGROUND is disabled.
+    """
+    if not books:
+        return
+    stored = set(Book.objects.filter(
+        google_books_id__in=[book['google_books_id'] for book in books]
+    ).values_list('google_books_id', flat=True))
+    books = [book for book in books if book['google_books_id'] not in stored]
+    if not books:
+        return
+    if getattr(settings, 'GOOGLE_BOOKS_UPSERT_IN_BACKGROUND', True):
+        # Imported lazily: the jobs module depends on this one
+        from .jobs import enqueue
+        google_books_ids = ','.join(sorted(book['google_books_id'] for book in books))
+        enqueue('upsert_books', {'books': books},
+                dedupe_key=hashlib.sha1(google_books_ids.encode()).hexdigest())
+    else:
+        GoogleBooksService.bulk_upsert_books(books)
+
+
+def hybrid_search(query: str, max_results: int = 10, upsert: Optional[bool] = None) -> List[Dict]:
+    """
+    Answer a search from the local catalog first and only call Google Books
+    when fewer than max_results local matches exist. Results are merged and
+    de-duplicated by google_books_id, local entries first.
+    """
+    results = search_local_results(query, max_results)
+    if len(results) >= max_results:
+        return results
+
+    remote_books = new_remote_results(results, GoogleBooksService.search_books(query, max_results))
+
+    if upsert is None:
+        upsert = getattr(settings, 'GOOGLE_BOOKS_UPSERT_REMOTE_RESULTS', True)
+    if upsert:
+        upsert_remote_results(remote_books)
+
+    return results + serialize_remote_results(remote_books[:max_results - len(results)])
+
+
+def search_local_results(query: str, max_results: int) -> List[Dict]:
+    local_books, _ = search_books(query, limit=max_results)
+    return list(BookSerializer(local_books, many=True).data)
+
+
+def serialize_remote_results(books: List[Dict]) -> List[Dict]:
+    """
+    Render Google Books results like local ones, through BookSerializer on
+    unsaved Books, so merged lists have one shape. Their id is None.
+    """
+    return list(BookSerializer(
+        [Book(**GoogleBooksService._to_model_fields(book_data)) for book_data in books], many=True
+    ).data)
+
+
+def new_remote_results(local_results: List[Dict], remote_books: List[Dict]) -> List[Dict]:
+    """
+    Drop remote results that are already among the local results (or
+    repeated), matching on google_books_id.
+    """
+    seen = {book['google_books_id'] for book in local_results}
+    new_books = []
+    for book_data in remote_books:
+        if book_data['google_books_id'] not in seen:
+            seen.add(book_data['google_books_id'])
+            new_books.append(book_data)
+    return new_books
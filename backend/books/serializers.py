@@ -1,19 +1,24 @@
 # books/serializers.py
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Book, Shelf, UserBook, ReadingSession, Note, Review, Quote
+from .instrumentation import TimedSerializerMixin
+from .models import (
+    Book, Shelf, UserBook, ReadingSession, Note, Review, ReviewFeedEntry, Quote, LibraryImport, Job
+)
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email')
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Book
-        fields = '__all__'
+        # The normalized author/category links mirror the JSON fields
+        exclude = ('normalized_authors', 'normalized_categories', 'content_hash')
+        read_only_fields = ('last_fetched_at',)
 
-class ShelfSerializer(serializers.ModelSerializer):
+class ShelfSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Shelf
         fields = '__all__'
@@ -23,7 +28,7 @@ class ShelfSerializer(serializers.ModelSerializer):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
-class UserBookSerializer(serializers.ModelSerializer):
+class UserBookSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     book_details = BookSerializer(source='book', read_only=True)
     shelves = ShelfSerializer(many=True, read_only=True)
     shelf_ids = serializers.ListField(
@@ -35,7 +40,7 @@ class UserBookSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserBook
         fields = '__all__'
-        read_only_fields = ('user',)
+        read_only_fields = ('user', 'progress_updated_at')
 
     def create(self, validated_data):
         shelf_ids = validated_data.pop('shelf_ids', [])
@@ -51,7 +56,7 @@ class UserBookSerializer(serializers.ModelSerializer):
         
         return user_book
 
-class ReadingSessionSerializer(serializers.ModelSerializer):
+class ReadingSessionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ReadingSession
         fields = '__all__'
@@ -63,7 +68,48 @@ class ReadingSessionSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("End time cannot be before start time")
         return data
 
-class NoteSerializer(serializers.ModelSerializer):
+class ProgressSessionSerializer(serializers.Serializer):
+    start_page = serializers.IntegerField(min_value=0)
+    end_page = serializers.IntegerField(min_value=0)
+    start_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, data):
+        if data['end_page'] < data['start_page']:
+            raise serializers.ValidationError("End page cannot be less than start page")
+        if data['end_time'] < data['start_time']:
+            raise serializers.ValidationError("End time cannot be before start time")
+        return data
+
+class ProgressUpdateSerializer(serializers.Serializer):
+    """
+    One entry of a batch progress sync from an offline client.
+    """
+    user_book = serializers.IntegerField()
+    client_timestamp = serializers.DateTimeField()
+    current_page = serializers.IntegerField(min_value=0, required=False)
+    status = serializers.ChoiceField(choices=UserBook.READING_STATUS_CHOICES, required=False)
+    session = ProgressSessionSerializer(required=False)
+
+class ClientTimestampSerializer(serializers.Serializer):
+    """
+    The device clock reading an online progress update may carry, so it
+    compares with offline updates on the same clock.
+    """
+    client_timestamp = serializers.DateTimeField(required=False)
+
+class BulkImportSerializer(serializers.Serializer):
+    """
+    Options of BookViewSet.bulk_import. Accepts JSON bodies and multipart
+    forms, where lists are repeated fields and booleans are strings.
+    """
+    google_books_ids = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+    isbns = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+    format = serializers.CharField(required=False, allow_blank=True, default='')
+    background = serializers.BooleanField(required=False, default=False)
+
+class NoteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Note
         fields = '__all__'
@@ -74,7 +120,7 @@ class NoteSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("You can only create notes for your own books")
         return value
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(source='user_book.user.username', read_only=True)
 
     class Meta:
@@ -87,7 +133,20 @@ class ReviewSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("You can only create reviews for your own books")
         return value
 
-class QuoteSerializer(serializers.ModelSerializer):
+class ReviewFeedEntrySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # The review's id, so feed items match ReviewSerializer's
+    id = serializers.IntegerField(source='pk', read_only=True)
+    is_public = serializers.ReadOnlyField()
+
+    class Meta:
+        model = ReviewFeedEntry
+        fields = (
+            'id', 'user_book', 'book', 'username', 'book_title', 'book_thumbnail_url', 'rating',
+            'content', 'is_public', 'created_at', 'updated_at',
+        )
+        read_only_fields = fields
+
+class QuoteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Quote
         fields = '__all__'
@@ -96,4 +155,14 @@ class QuoteSerializer(serializers.ModelSerializer):
     def validate_user_book(self, value):
         if value.user != self.context['request'].user:
             raise serializers.ValidationError("You can only create quotes for your own books")
-        return value
\ No newline at end of file
+        return value
+
+class LibraryImportSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = LibraryImport
+        exclude = ('user', 'id_map')
+
+class JobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        exclude = ('user', 'dedupe_key', 'locked_by', 'locked_at', 'heartbeat_at')
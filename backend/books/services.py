@@ -1,27 +1,180 @@
 # backend/books/services.py
+import copy
+import hashlib
+import json
+import logging
 import os
+import re
+import time
 import requests
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterable, List, Optional
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .cache import MISSING, build_response_cache, build_stale_cache
+from .instrumentation import UPSTREAM, propagate, timed
 from .models import Book
+from .resilience import CircuitBreaker, RateLimiter, SingleFlight, UpstreamUnavailable
+from .review_feed import update_books
+from .taxonomy import sync_book_taxonomy
+from .versioning import bump_for_books
+
+logger = logging.getLogger(__name__)
+
+
+def build_http_session() -> requests.Session:
+    """
+    Build a requests session with a keep-alive connection pool. The adapter
+    doesn't retry: GoogleBooksService._get does, so that every attempt goes
+    through the rate limiter and the circuit breaker.
+    """
+    pool_size = getattr(settings, 'GOOGLE_BOOKS_HTTP_POOL_SIZE', 10)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def build_rate_limiter() -> RateLimiter:
+    return RateLimiter(
+        'google_books',
+        rate=getattr(settings, 'GOOGLE_BOOKS_RATE_LIMIT', 10),
+        burst=getattr(settings, 'GOOGLE_BOOKS_RATE_BURST', 20),
+        alias=getattr(settings, 'GOOGLE_BOOKS_CACHE_ALIAS', None) or 'default',
+    )
+
+
+def build_circuit_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        'google_books',
+        failure_threshold=getattr(settings, 'GOOGLE_BOOKS_CIRCUIT_FAILURES', 5),
+        recovery_timeout=getattr(settings, 'GOOGLE_BOOKS_CIRCUIT_RECOVERY', 30),
+        alias=getattr(settings, 'GOOGLE_BOOKS_CACHE_ALIAS', None) or 'default',
+    )
+
+
+# Shared across requests so upstream connections are reused
+http_session = build_http_session()
+response_cache = build_response_cache()
+stale_cache = build_stale_cache()
+rate_limiter = build_rate_limiter()
+circuit_breaker = build_circuit_breaker()
+in_flight = SingleFlight()
+
 
 class GoogleBooksService:
     BASE_URL = 'https://www.googleapis.com/books/v1'
-    
+    BOOK_FIELDS = (
+        'google_books_id', 'title', 'authors', 'published_date', 'description',
+        'page_count', 'categories', 'thumbnail_url', 'language',
+    )
+
+    @staticmethod
+    def _cache_key(kind: str, *parts) -> str:
+        raw = '|'.join(str(part) for part in parts)
+        return f'{kind}:{hashlib.sha1(raw.encode()).hexdigest()}'
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        return ' '.join(query.lower().split())
+
+    @staticmethod
+    def _get(path: str, params: Dict) -> requests.Response:
+        """
+        GET from the API through the circuit breaker and the shared rate
+        limiter. Throttling (429), server errors and connection failures
+        count as failures and are retried up to GOOGLE_BOOKS_HTTP_RETRIES
+        times with exponential backoff, each attempt taking its own token;
+        other error statuses are the caller's business.
+        """
+        retries = getattr(settings, 'GOOGLE_BOOKS_HTTP_RETRIES', 3)
+        backoff = getattr(settings, 'GOOGLE_BOOKS_HTTP_BACKOFF', 0.3)
+        params = {**params, 'key': os.getenv('GOOGLE_BOOKS_API_KEY')}
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(backoff * 2 ** (attempt - 1))
+            if not circuit_breaker.allow():
+                raise UpstreamUnavailable('Google Books circuit is open')
+            if not rate_limiter.acquire(getattr(settings, 'GOOGLE_BOOKS_RATE_LIMIT_WAIT', 1)):
+                raise UpstreamUnavailable('Google Books rate limit exceeded')
+
+            try:
+                with timed(UPSTREAM):
+                    response = http_session.get(
+                        f'{GoogleBooksService.BASE_URL}{path}',
+                        params=params,
+                        timeout=getattr(settings, 'GOOGLE_BOOKS_HTTP_TIMEOUT', 10),
+                    )
+            except requests.RequestException:
+                circuit_breaker.record_failure()
+                if attempt == retries:
+                    raise
+                continue
+
+            status_code = getattr(response, 'status_code', None)
+            if isinstance(status_code, int) and (status_code == 429 or status_code >= 500):
+                circuit_breaker.record_failure()
+                if attempt < retries:
+                    continue
+            else:
+                circuit_breaker.record_success()
+            return response
+
+    @staticmethod
+    def _fetch(cache_key: str, fetch, use_cache: bool = True):
+        """
+        Return the cached value for `cache_key`, or run `fetch` (coalesced
+        with identical requests already in flight) and cache its result.
+        When the upstream fails, fall back to the last good copy.
+        """
+        if use_cache:
+            cached = response_cache.get(cache_key)
+            if cached is not MISSING:
+                return copy.deepcopy(cached)
+
+        def fetch_and_store():
+            result = fetch()
+            if result is not None:
+                response_cache.set(cache_key, copy.deepcopy(result))
+                stale_cache.set(cache_key, copy.deepcopy(result))
+            return result
+
+        try:
+            return copy.deepcopy(in_flight.do(cache_key, fetch_and_store))
+        except requests.RequestException:
+            stale = stale_cache.get(cache_key) if use_cache else MISSING
+            if stale is MISSING:
+                raise
+            return copy.deepcopy(stale)
+
+    @staticmethod
+    def cache_stats() -> Dict:
+        """
+        Hit/miss counters of the Google Books response cache.
+        """
+        return response_cache.stats()
+
     @staticmethod
     def search_books(query: str, max_results: int = 10) -> List[Dict]:
         """
         Search books using the Google Books API.
         Returns a list of book data dictionaries.
         """
-        try:
+        cache_key = GoogleBooksService._cache_key(
+            'search', GoogleBooksService._normalize_query(query), max_results
+        )
+
+        def fetch():
             params = {
                 'q': query,
                 'maxResults': max_results,
-                'key': os.getenv('GOOGLE_BOOKS_API_KEY')
             }
             
-            response = requests.get(f'{GoogleBooksService.BASE_URL}/volumes', params=params)
+            response = GoogleBooksService._get('/volumes', params)
             response.raise_for_status()
             
             books = []
@@ -31,32 +184,62 @@ class GoogleBooksService:
                 book_data = GoogleBooksService._parse_book_data(item)
                 if book_data:
                     books.append(book_data)
-            
             return books
-        
+
+        try:
+            return GoogleBooksService._fetch(cache_key, fetch)
         except requests.RequestException as e:
-            print(f"Error searching books: {e}")
+            logger.warning('Error searching books: %s', e)
             return []
 
     @staticmethod
-    def get_book_by_id(google_books_id: str) -> Optional[Dict]:
+    def get_book_by_id(google_books_id: str, use_cache: bool = True) -> Optional[Dict]:
         """
         Fetch a specific book by its Google Books ID.
         Returns book data dictionary if found, None otherwise.
+        With use_cache=False neither cached nor stale data is returned.
         """
-        try:
-            response = requests.get(
-                f'{GoogleBooksService.BASE_URL}/volumes/{google_books_id}',
-                params={'key': os.getenv('GOOGLE_BOOKS_API_KEY')}
-            )
+        cache_key = GoogleBooksService._cache_key('volume', google_books_id)
+
+        def fetch():
+            response = GoogleBooksService._get(f'/volumes/{google_books_id}', {})
             response.raise_for_status()
-            
             return GoogleBooksService._parse_book_data(response.json())
-            
+
+        try:
+            return GoogleBooksService._fetch(cache_key, fetch, use_cache)
         except requests.RequestException as e:
-            print(f"Error fetching book {google_books_id}: {e}")
+            logger.warning('Error fetching book %s: %s', google_books_id, e)
             return None
 
+    @staticmethod
+    def get_book_by_isbn(isbn: str) -> Optional[Dict]:
+        """
+        Look up a book by ISBN-10 or ISBN-13.
+        Returns book data dictionary if found, None otherwise.
+        """
+        isbn = re.sub(r'[^0-9Xx]', '', isbn)
+        if not isbn:
+            return None
+        books = GoogleBooksService.search_books(f'isbn:{isbn}', 1)
+        return books[0] if books else None
+
+    @staticmethod
+    def get_books_by_ids(google_books_ids: Iterable[str], max_workers: int = 8,
+                         use_cache: bool = True) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch several books concurrently with at most max_workers upstream
+        requests in flight. Returns a mapping of ID to book data (None when
+        the lookup failed).
+        """
+        google_books_ids = list(dict.fromkeys(google_books_ids))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                propagate(lambda google_books_id: GoogleBooksService.get_book_by_id(google_books_id, use_cache)),
+                google_books_ids
+            )
+            return dict(zip(google_books_ids, results))
+
     @staticmethod
     def _parse_book_data(item: Dict) -> Optional[Dict]:
         """
@@ -86,8 +269,8 @@ class GoogleBooksService:
             
             return book_data
             
-        except Exception as e:
-            print(f"Error parsing book data: {e}")
+        except Exception:
+            logger.exception('Error parsing book data')
             return None
 
     @staticmethod
@@ -97,12 +280,111 @@ class GoogleBooksService:
         Returns the Book instance if successful, None otherwise.
         """
         try:
+            book_data = GoogleBooksService._to_model_fields(book_data)
             book, created = Book.objects.update_or_create(
                 google_books_id=book_data['google_books_id'],
-                defaults=book_data
+                defaults={
+                    **book_data,
+                    'content_hash': GoogleBooksService.content_hash(book_data),
+                    'last_fetched_at': timezone.now(),
+                }
             )
             return book
             
-        except Exception as e:
-            print(f"Error creating/updating book: {e}")
-            return None
\ No newline at end of file
+        except Exception:
+            logger.exception('Error creating/updating book')
+            return None
+
+    @staticmethod
+    def _to_model_fields(book_data: Dict) -> Dict:
+        """
+        Coerce parsed Google Books data into values the Book model accepts.
+        Google reports partial publication dates ('1965' or '1965-08'), which
+        are padded to the first day of the period.
+        """
+        fields = {
+            field: book_data[field]
+            for field in GoogleBooksService.BOOK_FIELDS
+            if field in book_data
+        }
+        published_date = fields.get('published_date')
+        if published_date:
+            match = re.match(r'^(\d{4})(?:-(\d{2}))?(?:-(\d{2}))?', str(published_date))
+            fields['published_date'] = (
+                f'{match.group(1)}-{match.group(2) or "01"}-{match.group(3) or "01"}'
+                if match else None
+            )
+        if fields.get('authors') is None:
+            fields['authors'] = []
+        if fields.get('categories') is None:
+            fields['categories'] = []
+        for field in ('description', 'language', 'thumbnail_url'):
+            if field in fields and fields[field] is None:
+                fields[field] = ''
+        fields['title'] = (fields.get('title') or '')[:255]
+        return fields
+
+    @staticmethod
+    def content_hash(fields: Dict) -> str:
+        """
+        Hash of a book's metadata (as returned by _to_model_fields, or read
+        off a Book), used to skip rewriting rows that didn't change.
+        """
+        content = {
+            field: fields.get(field)
+            for field in GoogleBooksService.BOOK_FIELDS
+            if field != 'google_books_id'
+        }
+        return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def bulk_upsert_books(books: List[Dict], batch_size: int = 500,
+                          fetched: bool = True) -> Dict[str, Book]:
+        """
+        Insert or update many books with one INSERT ... ON CONFLICT statement
+        per batch. Returns the stored Book instances keyed by google_books_id.
+        Pass fetched=False for metadata that didn't just come from Google
+        Books, so last_fetched_at is left alone.
+        """
+        # Later entries win when the same volume appears twice
+        by_id = {
+            book_data['google_books_id']: GoogleBooksService._to_model_fields(book_data)
+            for book_data in books
+        }
+        update_fields = [field for field in GoogleBooksService.BOOK_FIELDS if field != 'google_books_id']
+        update_fields.append('content_hash')
+        now = timezone.now()
+        for fields in by_id.values():
+            fields['content_hash'] = GoogleBooksService.content_hash(fields)
+            if fetched:
+                fields['last_fetched_at'] = now
+        if fetched:
+            update_fields.append('last_fetched_at')
+
+        # Imported lazily: the search module depends on this one
+        from .search import get_search_backend
+        backend = get_search_backend()
+
+        stored = {}
+        with transaction.atomic():
+            Book.objects.bulk_create(
+                [Book(**fields) for fields in by_id.values()],
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['google_books_id'],
+                update_fields=update_fields,
+            )
+
+            ids = list(by_id)
+            for start in range(0, len(ids), batch_size):
+                for book in Book.objects.filter(google_books_id__in=ids[start:start + batch_size]):
+                    stored[book.google_books_id] = book
+
+            # bulk_create doesn't send post_save, so update the search index
+            # and the normalized authors/categories here
+            for book in stored.values():
+                backend.index_book(book)
+            sync_book_taxonomy(stored.values())
+            bump_for_books(book.pk for book in stored.values())
+            update_books(stored.values())
+        return stored
\ No newline at end of file
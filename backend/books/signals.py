@@ -0,0 +1,172 @@
+# backend/books/signals.py
+import threading
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_save, pre_delete
+from django.contrib.auth.models import User
+from django.dispatch import receiver
+from .models import (
+    Book, CollectionVersion, Note, Quote, ReadingSession, ReadingStatistics, Review, Shelf,
+    UserBook
+)
+from .catalog_refresh import count_shelvings
+from .search import get_search_backend
+from .taxonomy import sync_book_taxonomy
+from .statistics import (
+    apply_session_change, apply_user_book_change, session_snapshot, user_book_snapshot
+)
+from . import review_feed, versioning
+from .view_cache import invalidate_public_reviews, invalidate_users
+
+# Owners of user books that are being deleted, so the reading sessions
+# deleted along with them don't each need a query to find their user.
+_deleting = threading.local()
+
+def _deleting_user_books():
+    if not hasattr(_deleting, 'owners'):
+        _deleting.owners = {}
+    return _deleting.owners
+
+@receiver(post_save, sender=Book)
+def index_book(sender, instance, raw=False, **kwargs):
+    get_search_backend().index_book(instance)
+    if not raw:
+        sync_book_taxonomy([instance])
+        if not kwargs.get('created'):
+            versioning.bump_for_books([instance.pk])
+            review_feed.update_books([instance])
+
+@receiver(post_delete, sender=Book)
+def remove_book_from_index(sender, instance, **kwargs):
+    get_search_backend().remove_book(instance.id)
+
+@receiver(post_save, sender=User)
+def create_reading_statistics(sender, instance, created, raw=False, **kwargs):
+    # Users created before ReadingStatistics existed get their row built on
+    # first read (or by the rebuild_reading_stats command)
+    if created and not raw:
+        ReadingStatistics.objects.get_or_create(user=instance)
+        CollectionVersion.objects.get_or_create(user=instance)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_responses(sender, instance, raw=False, **kwargs):
+    # Also covers a new user reusing the id of a deleted one. Usernames are
+    # shown in the public review feed.
+    if not raw:
+        invalidate_users([instance.pk])
+        invalidate_public_reviews()
+
+@receiver(post_save, sender=User)
+def update_review_feed_username(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Logins only save last_login
+    if not raw and not created and (update_fields is None or 'username' in update_fields):
+        review_feed.update_username(instance)
+
+@receiver(pre_save, sender=UserBook)
+def snapshot_user_book(sender, instance, raw=False, **kwargs):
+    old = None
+    if instance.pk and not raw:
+        old = UserBook.objects.filter(pk=instance.pk).select_related('book').first()
+    instance._statistics_snapshot = user_book_snapshot(old) if old else None
+    instance._shelved_book_id = old.book_id if old else None
+
+@receiver(post_save, sender=UserBook)
+def update_shelved_count(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    old_book_id = getattr(instance, '_shelved_book_id', None)
+    if created:
+        count_shelvings([instance.book_id])
+    elif old_book_id is not None and old_book_id != instance.book_id:
+        count_shelvings([old_book_id], -1)
+        count_shelvings([instance.book_id])
+
+@receiver(post_save, sender=UserBook)
+def update_statistics_for_user_book(sender, instance, raw=False, **kwargs):
+    if not raw:
+        apply_user_book_change(
+            instance.user_id,
+            getattr(instance, '_statistics_snapshot', None),
+            user_book_snapshot(instance)
+        )
+
+@receiver(post_save, sender=UserBook)
+def update_review_feed_rating(sender, instance, raw=False, **kwargs):
+    old = getattr(instance, '_statistics_snapshot', None)
+    if not raw and old is not None and old['rating'] != instance.rating:
+        review_feed.update_ratings([instance])
+
+@receiver(pre_delete, sender=UserBook)
+def remember_deleted_user_book(sender, instance, **kwargs):
+    _deleting_user_books()[instance.pk] = instance.user_id
+    instance._statistics_snapshot = user_book_snapshot(instance)
+
+@receiver(post_delete, sender=UserBook)
+def remove_user_book_from_statistics(sender, instance, **kwargs):
+    _deleting_user_books().pop(instance.pk, None)
+    apply_user_book_change(instance.user_id, instance._statistics_snapshot, None)
+    count_shelvings([instance.book_id], -1)
+
+@receiver(pre_save, sender=ReadingSession)
+def snapshot_session(sender, instance, raw=False, **kwargs):
+    old = None
+    if instance.pk and not raw:
+        old = ReadingSession.objects.filter(pk=instance.pk).first()
+    instance._statistics_snapshot = session_snapshot(old) if old else None
+
+@receiver(post_save, sender=ReadingSession)
+def update_statistics_for_session(sender, instance, raw=False, **kwargs):
+    if not raw:
+        apply_session_change(
+            instance.user_book.user_id,
+            getattr(instance, '_statistics_snapshot', None),
+            session_snapshot(instance)
+        )
+
+@receiver(post_delete, sender=ReadingSession)
+def remove_session_from_statistics(sender, instance, **kwargs):
+    user_id = _deleting_user_books().get(instance.user_book_id)
+    if user_id is None:
+        user_id = UserBook.objects.filter(
+            pk=instance.user_book_id
+        ).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        apply_session_change(user_id, session_snapshot(instance), None)
+
+@receiver(post_save, sender=Shelf)
+@receiver(post_delete, sender=Shelf)
+@receiver(post_save, sender=UserBook)
+@receiver(post_delete, sender=UserBook)
+def bump_collection_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        versioning.bump([instance.user_id])
+
+@receiver(post_save, sender=ReadingSession)
+@receiver(post_delete, sender=ReadingSession)
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+@receiver(post_save, sender=Quote)
+@receiver(post_delete, sender=Quote)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_collection_version_for_child(sender, instance, raw=False, **kwargs):
+    # Rows deleted along with their user book are covered by its own bump
+    if raw or instance.user_book_id in _deleting_user_books():
+        return
+    versioning.bump_for_user_books([instance.user_book_id])
+
+@receiver(post_save, sender=Review)
+def update_review_feed(sender, instance, raw=False, **kwargs):
+    # Deleted reviews' entries go with them (on_delete=CASCADE)
+    if not raw:
+        review_feed.sync_reviews([instance])
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_public_review_responses(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_public_reviews()
+
+@receiver(m2m_changed, sender=UserBook.shelves.through)
+def bump_collection_version_for_shelving(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        versioning.bump([instance.user_id])
@@ -0,0 +1,227 @@
+# backend/books/statistics.py
+from datetime import date, timedelta
+from typing import Dict, Optional
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from .models import ReadingStatistics, ReadingSession, UserBook
+
+STATUS_COUNT_FIELDS = {
+    'want_to_read': 'want_to_read_count',
+    'reading': 'reading_count',
+    'read': 'read_count',
+}
+
+
+def user_book_snapshot(user_book: UserBook) -> Dict:
+    """
+    The parts of a UserBook that feed into ReadingStatistics.
+    """
+    return {
+        'status': user_book.status,
+        'rating': user_book.rating,
+        'categories': list(user_book.book.categories or []),
+    }
+
+
+def session_snapshot(session: ReadingSession) -> Dict:
+    """
+    The parts of a ReadingSession that feed into ReadingStatistics.
+    """
+    return {
+        'day': timezone.localtime(session.end_time).date().isoformat(),
+        'pages': max(session.end_page - session.start_page, 0),
+        'seconds': max(int((session.end_time - session.start_time).total_seconds()), 0),
+    }
+
+
+def _add_user_book(stats: ReadingStatistics, snapshot: Dict, sign: int) -> None:
+    stats.total_books += sign
+    field = STATUS_COUNT_FIELDS.get(snapshot['status'])
+    if field:
+        setattr(stats, field, getattr(stats, field) + sign)
+    if snapshot['rating'] is not None:
+        stats.rating_count += sign
+        stats.rating_sum += sign * snapshot['rating']
+    for category in snapshot['categories']:
+        count = stats.genre_counts.get(category, 0) + sign
+        if count > 0:
+            stats.genre_counts[category] = count
+        else:
+            stats.genre_counts.pop(category, None)
+
+
+def _add_session(stats: ReadingStatistics, snapshot: Dict, sign: int) -> None:
+    stats.session_count += sign
+    stats.pages_read += sign * snapshot['pages']
+    stats.reading_seconds += sign * snapshot['seconds']
+
+    pages, sessions, seconds = stats.daily_activity.get(snapshot['day'], [0, 0, 0])
+    day = [
+        pages + sign * snapshot['pages'],
+        sessions + sign,
+        seconds + sign * snapshot['seconds'],
+    ]
+    if day[1] > 0:
+        stats.daily_activity[snapshot['day']] = day
+    else:
+        stats.daily_activity.pop(snapshot['day'], None)
+
+
+def _apply(user_id: int, apply) -> None:
+    # Rows are created lazily by get_statistics(); until then there is
+    # nothing to keep up to date.
+    with transaction.atomic():
+        stats = ReadingStatistics.objects.select_for_update().filter(user_id=user_id).first()
+        if stats is None:
+            return
+        apply(stats)
+        stats.save()
+
+
+def apply_user_book_change(user_id: int, old: Optional[Dict], new: Optional[Dict]) -> None:
+    """
+    Move a user's statistics from the `old` to the `new` snapshot of one of
+    their books. None stands for "did not exist".
+    """
+    if old == new:
+        return
+
+    def apply(stats):
+        if old:
+            _add_user_book(stats, old, -1)
+        if new:
+            _add_user_book(stats, new, 1)
+    _apply(user_id, apply)
+
+
+def apply_session_change(user_id: int, old: Optional[Dict], new: Optional[Dict]) -> None:
+    """
+    Move a user's statistics from the `old` to the `new` snapshot of one of
+    their reading sessions. None stands for "did not exist".
+    """
+    if old == new:
+        return
+
+    def apply(stats):
+        if old:
+            _add_session(stats, old, -1)
+        if new:
+            _add_session(stats, new, 1)
+    _apply(user_id, apply)
+
+
+def apply_batch(user_id: int, user_book_changes=(), session_changes=()) -> None:
+    """
+    Apply many (old, new) snapshot pairs to one user's statistics with a
+    single read and write, for bulk writes that bypass the model signals.
+    """
+    user_book_changes = [(old, new) for old, new in user_book_changes if old != new]
+    session_changes = [(old, new) for old, new in session_changes if old != new]
+    if not user_book_changes and not session_changes:
+        return
+
+    def apply(stats):
+        for old, new in user_book_changes:
+            if old:
+                _add_user_book(stats, old, -1)
+            if new:
+                _add_user_book(stats, new, 1)
+        for old, new in session_changes:
+            if old:
+                _add_session(stats, old, -1)
+            if new:
+                _add_session(stats, new, 1)
+    _apply(user_id, apply)
+
+
+def rebuild_statistics(user: User) -> ReadingStatistics:
+    """
+    Recompute a user's statistics from scratch.
+    """
+    with transaction.atomic():
+        stats, _ = ReadingStatistics.objects.select_for_update().get_or_create(user=user)
+        fresh = ReadingStatistics(id=stats.id, user=user)
+        for user_book in UserBook.objects.filter(user=user).select_related('book'):
+            _add_user_book(fresh, user_book_snapshot(user_book), 1)
+        for session in ReadingSession.objects.filter(user_book__user=user):
+            _add_session(fresh, session_snapshot(session), 1)
+        fresh.save(force_update=True)
+    return fresh
+
+
+def get_statistics(user: User) -> ReadingStatistics:
+    stats = ReadingStatistics.objects.filter(user=user).first()
+    if stats is None:
+        stats = rebuild_statistics(user)
+    return stats
+
+
+def _streaks(days, today: date) -> Dict:
+    """
+    Current and longest run of consecutive days with at least one session.
+    The current streak is still alive if the last session was yesterday.
+    """
+    longest = 0
+    run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous and day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+
+    current = run if previous and today - previous <= timedelta(days=1) else 0
+    return {'current': current, 'longest': longest}
+
+
+def statistics_payload(stats: ReadingStatistics, weeks: int = 12) -> Dict:
+    """
+    Render ReadingStatistics for the statistics endpoint. The first four
+    keys keep the shape of the original aggregate-query response.
+    """
+    today = timezone.localdate()
+    activity = {
+        date.fromisoformat(day): values
+        for day, values in stats.daily_activity.items()
+    }
+
+    def pages_since(days):
+        start = today - timedelta(days=days - 1)
+        return sum(values[0] for day, values in activity.items() if day >= start)
+
+    this_week = today - timedelta(days=today.weekday())
+    weekly = []
+    for offset in reversed(range(weeks)):
+        week_start = this_week - timedelta(weeks=offset)
+        week_end = week_start + timedelta(days=7)
+        in_week = [values for day, values in activity.items() if week_start <= day < week_end]
+        weekly.append({
+            'week_start': week_start.isoformat(),
+            'pages': sum(values[0] for values in in_week),
+            'sessions': sum(values[1] for values in in_week),
+        })
+
+    by_status = [
+        {'status': status, 'count': getattr(stats, field)}
+        for status, field in STATUS_COUNT_FIELDS.items()
+        if getattr(stats, field)
+    ]
+
+    return {
+        'total_books': stats.total_books,
+        'books_by_status': by_status,
+        'average_rating': {
+            'rating__avg': stats.rating_sum / stats.rating_count if stats.rating_count else None
+        },
+        'currently_reading': stats.reading_count,
+        'pages_read': stats.pages_read,
+        'sessions': stats.session_count,
+        'reading_hours': round(stats.reading_seconds / 3600, 2),
+        'reading_velocity': {
+            'pages_per_day_7d': round(pages_since(7) / 7, 2),
+            'pages_per_day_30d': round(pages_since(30) / 30, 2),
+            'weekly': weekly,
+        },
+        'streaks': _streaks(sorted(activity), today),
+        'genres': dict(sorted(stats.genre_counts.items(), key=lambda item: (-item[1], item[0]))),
+    }
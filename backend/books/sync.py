@@ -0,0 +1,107 @@
+# backend/books/sync.py
+from typing import Dict, List
+from django.db import transaction
+from django.utils import timezone
+from .models import ReadingSession, UserBook
+from .serializers import ProgressUpdateSerializer
+from .statistics import apply_batch, session_snapshot, user_book_snapshot
+from .versioning import bump
+
+APPLIED = 'applied'
+STALE = 'stale'
+CREATED = 'created'
+DUPLICATE = 'duplicate'
+
+
+def sync_progress(user, items: List[Dict]) -> List[Dict]:
+    """
+    Apply a batch of offline progress updates for `user` in one transaction.
+
+    Updates are applied in client_timestamp order. Progress (current_page,
+    status) is last-writer-wins against UserBook.progress_updated_at, so a
+    replayed update older than what the server already has is reported as
+    stale. Reading sessions are append-only and de-duplicated on
+    (user_book, start_time, end_time), so replaying a batch is safe.
+    Returns one result per item, in request order.
+
+    Both this and update_progress store the client's clock in
+    progress_updated_at when the client sends one. update_progress calls
+    without a client_timestamp are stamped with the server clock, so a
+    device clock running behind the server by more than the time between
+    an online update and an offline one makes the offline one stale.
+    """
+    results = [{'index': index} for index in range(len(items))]
+    valid = []
+    for index, item in enumerate(items):
+        serializer = ProgressUpdateSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index]['errors'] = serializer.errors
+
+    with transaction.atomic():
+        # Lock the rows before comparing timestamps, so a concurrent sync or
+        # update_progress can't write between our read and our write
+        user_books = UserBook.objects.select_for_update(of=('self',)).select_related('book').filter(
+            user=user
+        ).in_bulk({data['user_book'] for _, data in valid})
+
+        existing_sessions = set(
+            ReadingSession.objects.filter(
+                user_book_id__in=user_books,
+                start_time__in={data['session']['start_time'] for _, data in valid if 'session' in data}
+            ).values_list('user_book_id', 'start_time', 'end_time')
+        )
+
+        before = {pk: user_book_snapshot(user_book) for pk, user_book in user_books.items()}
+        changed = set()
+        new_sessions = []
+        now = timezone.now()
+
+        for index, data in sorted(valid, key=lambda entry: entry[1]['client_timestamp']):
+            result = results[index]
+            result['user_book'] = data['user_book']
+            user_book = user_books.get(data['user_book'])
+            if user_book is None:
+                result['errors'] = {'user_book': ['Not found.']}
+                continue
+
+            if 'current_page' in data or 'status' in data:
+                timestamp = data['client_timestamp']
+                if user_book.progress_updated_at and timestamp <= user_book.progress_updated_at:
+                    result['progress'] = STALE
+                else:
+                    if 'current_page' in data:
+                        user_book.current_page = data['current_page']
+                    if 'status' in data:
+                        user_book.status = data['status']
+                    user_book.progress_updated_at = timestamp
+                    user_book.updated_at = now
+                    changed.add(user_book.pk)
+                    result['progress'] = APPLIED
+
+            session = data.get('session')
+            if session:
+                key = (user_book.pk, session['start_time'], session['end_time'])
+                if key in existing_sessions:
+                    result['session'] = DUPLICATE
+                else:
+                    existing_sessions.add(key)
+                    new_sessions.append(ReadingSession(user_book=user_book, **session))
+                    result['session'] = CREATED
+
+        UserBook.objects.bulk_update(
+            [user_books[pk] for pk in changed],
+            ['current_page', 'status', 'progress_updated_at', 'updated_at']
+        )
+        ReadingSession.objects.bulk_create(new_sessions)
+        # bulk writes skip the signals that maintain ReadingStatistics
+        apply_batch(
+            user.id,
+            user_book_changes=[(before[pk], user_book_snapshot(user_books[pk])) for pk in changed],
+            session_changes=[(None, session_snapshot(session)) for session in new_sessions]
+        )
+        if changed or new_sessions:
+            bump([user.id])
+
+    return results
@@ -0,0 +1,88 @@
+# backend/books/taxonomy.py
+from typing import Dict, Iterable, List, Set
+from django.db import transaction
+from django.db.models import Count
+from .models import Author, Book, Category
+
+# (JSON field on Book, normalized M2M field on Book, name model)
+TAXONOMIES = (
+    ('authors', 'normalized_authors', Author),
+    ('categories', 'normalized_categories', Category),
+)
+
+
+def clean_names(values) -> List[str]:
+    """
+    Distinct, non-empty names from a JSON array, in their original order.
+    """
+    names = []
+    for value in values or []:
+        if isinstance(value, str):
+            name = value.strip()[:255]
+            if name and name not in names:
+                names.append(name)
+    return names
+
+
+def ids_by_name(model, names: Set[str]) -> Dict[str, int]:
+    """
+    Look up Author/Category rows by name, creating the missing ones.
+    """
+    if not names:
+        return {}
+    ids = dict(model.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = names - ids.keys()
+    if missing:
+        model.objects.bulk_create([model(name=name) for name in missing], ignore_conflicts=True)
+        ids.update(model.objects.filter(name__in=missing).values_list('name', 'id'))
+    return ids
+
+
+def sync_book_taxonomy(books: Iterable[Book]) -> None:
+    """
+    Rewrite the normalized author and category links of the given books from
+    their JSON fields, with a fixed number of queries per call.
+    """
+    books = [book for book in books if book.pk]
+    if not books:
+        return
+
+    with transaction.atomic():
+        for json_field, m2m_field, model in TAXONOMIES:
+            through = getattr(Book, m2m_field).through
+            target_column = f'{model._meta.model_name}_id'
+            names_by_book = {book.pk: clean_names(getattr(book, json_field)) for book in books}
+            ids = ids_by_name(model, set().union(*names_by_book.values()))
+
+            through.objects.filter(book_id__in=names_by_book).delete()
+            through.objects.bulk_create([
+                through(book_id=book_id, **{target_column: ids[name]})
+                for book_id, names in names_by_book.items()
+                for name in names
+            ])
+
+
+def facet_counts(limit: int = 20) -> Dict:
+    """
+    Book counts per category, author and language; one grouped query each.
+    """
+    def top(model):
+        return [
+            {'name': row['name'], 'count': row['count']}
+            for row in model.objects.annotate(count=Count('books'))
+                                    .filter(count__gt=0)
+                                    .order_by('-count', 'name')
+                                    .values('name', 'count')[:limit]
+        ]
+
+    languages = (
+        Book.objects.exclude(language='')
+        .values('language')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'language')[:limit]
+    )
+    return {
+        'categories': top(Category),
+        'authors': top(Author),
+        'languages': [{'name': row['language'], 'count': row['count']} for row in languages],
+    }
@@ -0,0 +1,186 @@
+# backend/books/tests/test_async_services.py
+import asyncio
+import threading
+import unittest
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from books import async_services
+from books.async_services import AsyncGoogleBooksService
+from books.models import Book
+from books.resilience import OPEN
+from books.services import GoogleBooksService, circuit_breaker, rate_limiter, response_cache, stale_cache
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+def volume(google_books_id, title):
+    return {'id': google_books_id, 'volumeInfo': {'title': title, 'authors': ['Test Author']}}
+
+class FakeGoogleBooks:
+    """
+    httpx transport handler serving a couple of volumes, recording the peak
+    number of concurrent requests.
+    """
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.status_code = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        if self.status_code is not None:
+            return httpx.Response(self.status_code, json={})
+        path = request.url.path
+        if path.endswith('/volumes'):
+            return httpx.Response(200, json={'items': [volume('remote1', 'Remote Book')]})
+        google_books_id = path.rsplit('/', 1)[1]
+        if google_books_id == 'missing':
+            return httpx.Response(404, json={})
+        return httpx.Response(200, json=volume(google_books_id, f'Book {google_books_id}'))
+
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+@override_settings(GOOGLE_BOOKS_UPSERT_IN_BACKGROUND=False)
+class AsyncGoogleBooksTests(TestCase):
+    def setUp(self):
+        response_cache.clear()
+        stale_cache.clear()
+        circuit_breaker.reset()
+        rate_limiter.reset()
+        self.addCleanup(circuit_breaker.reset)
+        async_services._clients.clear()
+        self.upstream = FakeGoogleBooks()
+        patcher = patch.object(
+            AsyncGoogleBooksService,
+            '_build_client',
+            side_effect=lambda: httpx.AsyncClient(
+                base_url=GoogleBooksService.BASE_URL,
+                transport=httpx.MockTransport(self.upstream)
+            )
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user).key}')
+
+    def test_fan_out_runs_concurrently_within_limit(self):
+        ids = [f'id{n}' for n in range(6)] + ['missing']
+        books = asyncio.run(AsyncGoogleBooksService.get_books_by_ids(ids, concurrency=3))
+
+        self.assertEqual(books['id0']['title'], 'Book id0')
+        self.assertIsNone(books['missing'])
+        self.assertEqual(self.upstream.max_in_flight, 3)
+
+    def test_per_call_timeout(self):
+        self.upstream.delay = 1
+        book = asyncio.run(AsyncGoogleBooksService.get_book_by_id('slow', timeout=0.05))
+        self.assertIsNone(book)
+
+    def test_results_are_cached(self):
+        asyncio.run(AsyncGoogleBooksService.search_books('remote'))
+        asyncio.run(AsyncGoogleBooksService.search_books('Remote'))
+        self.assertEqual(len(self.upstream.requests), 1)
+
+    def test_concurrent_identical_calls_share_one_request(self):
+        async def search_many():
+            return await asyncio.gather(*(AsyncGoogleBooksService.search_books('remote') for _ in range(5)))
+
+        results = asyncio.run(search_many())
+        self.assertEqual(len(self.upstream.requests), 1)
+        self.assertEqual([len(books) for books in results], [1] * 5)
+
+    def test_server_errors_trip_the_shared_breaker(self):
+        self.upstream.status_code = 503
+
+        for index in range(circuit_breaker.failure_threshold):
+            self.assertIsNone(asyncio.run(AsyncGoogleBooksService.get_book_by_id(f'id{index}')))
+        self.assertEqual(circuit_breaker.state(), OPEN)
+
+        self.assertIsNone(asyncio.run(AsyncGoogleBooksService.get_book_by_id('another')))
+        self.assertEqual(len(self.upstream.requests), circuit_breaker.failure_threshold)
+
+    def test_missing_volumes_do_not_trip_the_breaker(self):
+        for _ in range(circuit_breaker.failure_threshold + 1):
+            asyncio.run(AsyncGoogleBooksService.get_book_by_id('missing'))
+        self.assertNotEqual(circuit_breaker.state(), OPEN)
+
+    def test_open_circuit_serves_stale_results(self):
+        fresh = asyncio.run(AsyncGoogleBooksService.search_books('remote'))
+        response_cache.delete(GoogleBooksService._cache_key('search', 'remote', 10))
+        for _ in range(circuit_breaker.failure_threshold):
+            circuit_breaker.record_failure()
+
+        self.assertEqual(asyncio.run(AsyncGoogleBooksService.search_books('remote')), fresh)
+        self.assertEqual(asyncio.run(AsyncGoogleBooksService.search_books('uncached')), [])
+        self.assertEqual(len(self.upstream.requests), 1)
+
+    def test_rate_limited_calls_fail_fast(self):
+        async def no_token(timeout=0):
+            return False
+
+        with patch.object(rate_limiter, 'aacquire', side_effect=no_token):
+            self.assertIsNone(asyncio.run(AsyncGoogleBooksService.get_book_by_id('abc123')))
+        self.assertEqual(self.upstream.requests, [])
+
+    def test_clients_are_closed_when_their_loop_ends(self):
+        async def search():
+            await AsyncGoogleBooksService.search_books('remote')
+            return AsyncGoogleBooksService.get_client()
+
+        self.assertTrue(asyncio.run(search()).is_closed)
+        self.assertTrue(async_to_sync(search)().is_closed)
+
+    def test_cache_io_runs_off_the_event_loop(self):
+        loop_threads, cache_threads = [], []
+
+        def cache_get(key, default=None):
+            cache_threads.append(threading.get_ident())
+            return default
+
+        async def search():
+            loop_threads.append(threading.get_ident())
+            await AsyncGoogleBooksService.search_books('remote')
+
+        with patch.object(response_cache, 'get', side_effect=cache_get):
+            asyncio.run(search())
+        self.assertTrue(cache_threads)
+        self.assertNotIn(loop_threads[0], cache_threads)
+
+    def test_fetch_endpoint(self):
+        response = self.client.get('/api/async/books/fetch/', {'ids': 'a,b'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['b']['title'], 'Book b')
+
+    def test_search_endpoint_is_local_first(self):
+        Book.objects.create(google_books_id='local1', title='Remote Sensing', authors=[])
+
+        response = self.client.get('/api/async/books/search_google_books/', {'q': 'remote', 'max_results': 5})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([book['google_books_id'] for book in response.json()], ['local1', 'remote1'])
+        self.assertTrue(Book.objects.filter(google_books_id='remote1').exists())
+
+    def test_endpoints_require_authentication(self):
+        response = APIClient().get('/api/async/books/fetch/', {'ids': 'a'})
+        self.assertEqual(response.status_code, 401)
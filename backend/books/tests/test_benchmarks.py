@@ -0,0 +1,71 @@
+# backend/books/tests/test_benchmarks.py
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase
+from books.benchmarks import build_scenarios, compare_to_baseline, generate_dataset, run_benchmarks
+from books.models import Book, UserBook
+from books.services import GoogleBooksService, rate_limiter
+
+class BenchmarkTests(TestCase):
+    def test_generate_dataset_is_reproducible(self):
+        counts = generate_dataset(users=2, books=30, books_per_user=10, seed=7)
+        self.assertEqual(counts['books'], 30)
+        self.assertEqual(Book.objects.count(), 30)
+        self.assertEqual(User.objects.filter(username__startswith='bench').count(), 2)
+        self.assertEqual(UserBook.objects.count(), 20)
+        first = list(UserBook.objects.order_by('id').values_list('book__google_books_id', 'status'))
+
+        UserBook.objects.all().delete()
+        Book.objects.all().delete()
+        User.objects.all().delete()
+        generate_dataset(users=2, books=30, books_per_user=10, seed=7)
+        second = list(UserBook.objects.order_by('id').values_list('book__google_books_id', 'status'))
+        self.assertEqual(first, second)
+
+    def test_run_benchmarks_reports_every_scenario(self):
+        generate_dataset(users=2, books=30, books_per_user=10, seed=7)
+        base_url, rate = GoogleBooksService.BASE_URL, rate_limiter.rate
+        # Concurrent scenarios use other connections, which can't see this test's transaction
+        names = [name for name, scenario in build_scenarios({'search_terms': []}).items()
+                 if scenario.concurrency == 1]
+        results = run_benchmarks(names, iterations=3, warmup=1)
+
+        self.assertEqual(GoogleBooksService.BASE_URL, base_url)
+        self.assertEqual(rate_limiter.rate, rate)
+        self.assertIn('search_remote', results['scenarios'])
+        for name, result in results['scenarios'].items():
+            self.assertEqual(result['requests'], 3, name)
+            self.assertTrue(all(200 <= int(code) < 300 for code in result['status_codes']), name)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+            self.assertLessEqual(result['p95_ms'], result['max_ms'])
+
+    def test_run_benchmarks_rejects_unknown_scenarios(self):
+        generate_dataset(users=1, books=5, books_per_user=5, seed=7)
+        with self.assertRaises(ValueError):
+            run_benchmarks(['nope'], iterations=1, warmup=0)
+
+    def test_compare_to_baseline(self):
+        baseline = {'scenarios': {
+            'list': {'queries_per_request': 4.0, 'p95_ms': 20.0},
+            'search': {'queries_per_request': 3.0, 'p95_ms': 0.5},
+        }}
+        results = {'scenarios': {
+            'list': {'queries_per_request': 4.0, 'p95_ms': 24.0},
+            'search': {'queries_per_request': 3.0, 'p95_ms': 1.2},
+            'new': {'queries_per_request': 9.0, 'p95_ms': 90.0},
+        }}
+        self.assertEqual(compare_to_baseline(results, baseline), [])
+
+        results['scenarios']['list'] = {'queries_per_request': 5.0, 'p95_ms': 26.0}
+        regressions = compare_to_baseline(results, baseline)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('list: 5.0 queries'))
+        self.assertIn('p95', regressions[1])
+
+class ConcurrentBenchmarkTests(TransactionTestCase):
+    def test_concurrent_scenario_spreads_requests_over_users(self):
+        generate_dataset(users=3, books=30, books_per_user=10, seed=7)
+        results = run_benchmarks(['concurrent_progress'], iterations=6, warmup=1)
+        result = results['scenarios']['concurrent_progress']
+        self.assertEqual(result['concurrency'], 3)
+        self.assertEqual(sum(result['status_codes'].values()), 6)
+        self.assertGreater(result['throughput_rps'], 0)
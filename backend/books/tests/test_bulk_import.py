@@ -0,0 +1,177 @@
+# backend/books/tests/test_bulk_import.py
+import io
+import json
+import os
+import tempfile
+import requests
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from books.importers import GOOGLE_BOOKS_ID, ISBN, import_books, parse_identifier_file
+from books.models import Book
+from books.search import search_books
+from books.services import GoogleBooksService, response_cache
+
+VOLUMES = {
+    'abc123': {'title': 'First Book', 'published': '1999'},
+    'def456': {'title': 'Second Book', 'published': '2001-05'},
+}
+ISBN_TO_ID = {'9780000000001': 'def456'}
+
+def fake_get(url, params=None, **kwargs):
+    """
+    Stand-in for the Google Books HTTP API serving VOLUMES.
+    """
+    class FakeResponse:
+        def __init__(self, payload, status_code=200):
+            self.payload = payload
+            self.status_code = status_code
+
+        def raise_for_status(self):
+            if self.status_code >= 400:
+                raise requests.HTTPError(f'{self.status_code}')
+
+        def json(self):
+            return self.payload
+
+    def volume(google_books_id):
+        info = VOLUMES[google_books_id]
+        return {
+            'id': google_books_id,
+            'volumeInfo': {
+                'title': info['title'],
+                'authors': ['Test Author'],
+                'publishedDate': info['published'],
+            }
+        }
+
+    if '/volumes/' in url:
+        google_books_id = url.rsplit('/', 1)[1]
+        if google_books_id not in VOLUMES:
+            return FakeResponse({}, 404)
+        return FakeResponse(volume(google_books_id))
+
+    isbn = params['q'].split(':', 1)[1]
+    if isbn in ISBN_TO_ID:
+        return FakeResponse({'items': [volume(ISBN_TO_ID[isbn])]})
+    return FakeResponse({})
+
+@patch('books.services.http_session.get', side_effect=fake_get)
+class BulkImportTests(TestCase):
+    def setUp(self):
+        response_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_imports_ids_and_isbns_with_per_item_results(self, mock_get):
+        results = import_books([
+            (GOOGLE_BOOKS_ID, 'abc123'),
+            (ISBN, '978-0-00-000000-1'),
+            (GOOGLE_BOOKS_ID, 'missing'),
+        ], batch_size=1)
+
+        self.assertEqual(
+            [result['status'] for result in results],
+            ['imported', 'imported', 'failed']
+        )
+        self.assertEqual(results[1]['google_books_id'], 'def456')
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertEqual(str(Book.objects.get(google_books_id='abc123').published_date), '1999-01-01')
+
+    def test_existing_books_are_updated(self, mock_get):
+        Book.objects.create(google_books_id='abc123', title='Old Title', authors=[])
+
+        import_books([(GOOGLE_BOOKS_ID, 'abc123')])
+
+        self.assertEqual(Book.objects.get(google_books_id='abc123').title, 'First Book')
+        self.assertEqual(Book.objects.count(), 1)
+
+    def test_imported_books_are_searchable(self, mock_get):
+        import_books([(GOOGLE_BOOKS_ID, 'abc123')])
+        self.assertEqual(search_books('first')[1], 1)
+
+    def test_endpoint_accepts_id_lists(self, mock_get):
+        response = self.client.post(
+            '/api/books/bulk_import/',
+            {'google_books_ids': ['abc123', 'def456']},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual(response.data['failed'], 0)
+
+    def test_endpoint_accepts_csv_upload(self, mock_get):
+        upload = SimpleUploadedFile(
+            'books.csv',
+            b'isbn,google_books_id\n,abc123\n9780000000001,\n',
+            content_type='text/csv'
+        )
+        response = self.client.post('/api/books/bulk_import/', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['imported'], 2)
+
+    @override_settings(BULK_IMPORT_MAX_ITEMS=2)
+    def test_oversized_upload_is_rejected_without_reading_it_all(self, mock_get):
+        # The last row is invalid but past the cap, so it's never parsed
+        rows = b'isbn,google_books_id\n,abc123\n,def456\n,ghi789\n,\n'
+        upload = SimpleUploadedFile('books.csv', rows, content_type='text/csv')
+
+        response = self.client.post('/api/books/bulk_import/', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('At most 2 books', response.data['error'])
+        mock_get.assert_not_called()
+
+    def test_endpoint_accepts_multipart_forms(self, mock_get):
+        response = self.client.post(
+            '/api/books/bulk_import/',
+            {'google_books_ids': ['abc123', 'def456'], 'background': 'false'},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['imported'], 2)
+
+        response = self.client.post(
+            '/api/books/bulk_import/', {'isbns': '9780000000001', 'background': 'true'}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 202)
+
+    def test_endpoint_rejects_a_string_for_a_list(self, mock_get):
+        response = self.client.post('/api/books/bulk_import/', {'google_books_ids': 'abc123'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_endpoint_requires_identifiers(self, mock_get):
+        response = self.client.post('/api/books/bulk_import/', {}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_management_command_reads_jsonl(self, mock_get):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'books.jsonl')
+            with open(path, 'w') as f:
+                f.write(json.dumps({'google_books_id': 'abc123'}) + '\n')
+                f.write(json.dumps({'isbn': '9780000000001'}) + '\n')
+
+            out = io.StringIO()
+            call_command('import_books', '--file', path, stdout=out)
+
+        self.assertIn('Imported 2 of 2 books', out.getvalue())
+        self.assertEqual(Book.objects.count(), 2)
+
+class IdentifierParsingTests(TestCase):
+    def test_rejects_records_without_identifier(self):
+        with self.assertRaises(ValueError):
+            list(parse_identifier_file(['{"title": "No ID"}'], 'jsonl'))
+
+    def test_normalizes_partial_dates(self):
+        fields = GoogleBooksService._to_model_fields({
+            'google_books_id': 'x', 'title': 'X', 'published_date': '2001-05'
+        })
+        self.assertEqual(fields['published_date'], '2001-05-01')
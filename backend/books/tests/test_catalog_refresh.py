@@ -0,0 +1,221 @@
+# backend/books/tests/test_catalog_refresh.py
+import io
+import requests
+from datetime import timedelta
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.utils import timezone
+from unittest.mock import MagicMock, patch
+from books.catalog_refresh import count_shelvings, refresh_catalog, stale_books
+from books.jobs import Worker
+from books.models import Book, Job, UserBook
+from books.search import search_books
+from books.services import GoogleBooksService, circuit_breaker, response_cache
+from books.statistics import get_statistics
+
+VOLUMES = {}
+
+def fake_get(url, params=None, **kwargs):
+    """
+    Google Books stand-in serving VOLUMES; unknown IDs are a 404.
+    """
+    google_books_id = url.rsplit('/', 1)[1]
+    response = MagicMock(status_code=200)
+    if google_books_id not in VOLUMES:
+        response.status_code = 404
+        response.raise_for_status.side_effect = requests.HTTPError('404')
+        return response
+    response.json.return_value = {'id': google_books_id, 'volumeInfo': VOLUMES[google_books_id]}
+    return response
+
+def volume(title, authors=('Test Author',), categories=('Fiction',)):
+    return {'title': title, 'authors': list(authors), 'categories': list(categories)}
+
+@patch('books.services.http_session.get', side_effect=fake_get)
+class CatalogRefreshTests(TestCase):
+    def setUp(self):
+        response_cache.clear()
+        circuit_breaker.reset()
+        VOLUMES.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+
+    def stored_book(self, google_books_id, title, **kwargs):
+        VOLUMES[google_books_id] = volume(title, **kwargs)
+        book = GoogleBooksService.create_or_update_book(
+            GoogleBooksService.get_book_by_id(google_books_id)
+        )
+        Book.objects.filter(pk=book.pk).update(last_fetched_at=timezone.now() - timedelta(days=60))
+        return book
+
+    def shelve(self, book, *users):
+        for user in users:
+            UserBook.objects.create(user=user, book=book, status='read')
+
+    def test_stored_books_record_hash_and_fetch_time(self, mock_get):
+        book = GoogleBooksService.create_or_update_book({
+            'google_books_id': 'abc123', 'title': 'Test Book', 'authors': ['Test Author'],
+        })
+        self.assertEqual(len(book.content_hash), 40)
+        self.assertIsNotNone(book.last_fetched_at)
+
+        [upserted] = GoogleBooksService.bulk_upsert_books([{
+            'google_books_id': 'def456', 'title': 'Another', 'authors': [],
+        }], fetched=False).values()
+        self.assertTrue(upserted.content_hash)
+        self.assertIsNone(upserted.last_fetched_at)
+
+    def test_most_shelved_books_come_first(self, mock_get):
+        rare = self.stored_book('rare', 'Rare Book')
+        popular = self.stored_book('popular', 'Popular Book')
+        fresh = self.stored_book('fresh', 'Fresh Book')
+        Book.objects.filter(pk=fresh.pk).update(last_fetched_at=timezone.now())
+        self.shelve(rare, self.user)
+        self.shelve(popular, self.user, self.other)
+        self.shelve(fresh, self.user, self.other)
+
+        self.assertEqual(
+            list(stale_books(timedelta(days=30)).values_list('google_books_id', flat=True)),
+            ['popular', 'rare']
+        )
+
+        summary = refresh_catalog(limit=1)
+        self.assertEqual(summary['checked'], 1)
+        self.assertGreater(Book.objects.get(pk=popular.pk).last_fetched_at, timezone.now() - timedelta(minutes=1))
+        self.assertLess(Book.objects.get(pk=rare.pk).last_fetched_at, timezone.now() - timedelta(days=1))
+
+    def test_shelved_count_follows_user_books(self, mock_get):
+        book = self.stored_book('counted', 'Counted Book')
+        other = self.stored_book('other', 'Other Book')
+        self.shelve(book, self.user, self.other)
+        self.assertEqual(Book.objects.get(pk=book.pk).shelved_count, 2)
+
+        user_book = UserBook.objects.get(user=self.user, book=book)
+        user_book.book = other
+        user_book.save()
+        self.assertEqual(Book.objects.get(pk=book.pk).shelved_count, 1)
+        self.assertEqual(Book.objects.get(pk=other.pk).shelved_count, 1)
+
+        UserBook.objects.filter(book=book).delete()
+        self.assertEqual(Book.objects.get(pk=book.pk).shelved_count, 0)
+
+        count_shelvings([book.pk, other.pk, book.pk])
+        self.assertEqual(Book.objects.get(pk=book.pk).shelved_count, 2)
+        self.assertEqual(Book.objects.get(pk=other.pk).shelved_count, 2)
+
+    def test_least_recently_fetched_books_come_first(self, mock_get):
+        older = self.stored_book('older', 'Older Book')
+        newer = self.stored_book('newer', 'Newer Book')
+        fresh = self.stored_book('fresh', 'Fresh Book')
+        never = Book.objects.create(google_books_id='never', title='Never Fetched', authors=[])
+        Book.objects.filter(pk=older.pk).update(last_fetched_at=timezone.now() - timedelta(days=90))
+        Book.objects.filter(pk=fresh.pk).update(last_fetched_at=timezone.now())
+
+        self.assertEqual(
+            list(stale_books(timedelta(days=30)).values_list('google_books_id', flat=True)),
+            ['never', 'older', 'newer']
+        )
+        self.assertEqual(
+            list(stale_books(timedelta(days=30), after=(0, None, never.pk)).values_list('google_books_id', flat=True)),
+            ['older', 'newer']
+        )
+
+        VOLUMES['never'] = volume('Never Fetched')
+        summary = refresh_catalog(limit=2)
+        self.assertEqual(summary['checked'], 2)
+        self.assertLess(Book.objects.get(pk=newer.pk).last_fetched_at, timezone.now() - timedelta(days=1))
+
+    def test_batches_are_keyset_pages(self, mock_get):
+        books = [self.stored_book(f'book{index}', f'Book {index}') for index in range(5)]
+        self.shelve(books[3], self.user, self.other)
+        self.shelve(books[0], self.user)
+        del VOLUMES['book1']
+
+        with CaptureQueriesContext(connection) as queries:
+            summary = refresh_catalog(batch_size=2)
+
+        self.assertEqual((summary['checked'], summary['failed'], summary['batches']), (5, 1, 3))
+        selects = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'ORDER BY "books_book"."shelved_count" DESC' in query['sql']
+        ]
+        self.assertEqual(len(selects), 4)
+        self.assertFalse(any('GROUP BY' in sql or 'NOT IN' in sql for sql in selects))
+        self.assertTrue(stale_books(timedelta(days=30)).filter(pk=books[1].pk).exists())
+
+    def test_only_changed_rows_are_rewritten(self, mock_get):
+        same = self.stored_book('same', 'Same Title')
+        renamed = self.stored_book('renamed', 'Old Title')
+        VOLUMES['renamed'] = volume('New Title')
+
+        with CaptureQueriesContext(connection) as queries:
+            summary = refresh_catalog()
+
+        self.assertEqual(
+            (summary['checked'], summary['changed'], summary['unchanged'], summary['failed']),
+            (2, 1, 1, 0)
+        )
+        self.assertEqual(Book.objects.get(pk=renamed.pk).title, 'New Title')
+        self.assertEqual(search_books('new')[1], 1)
+        self.assertEqual(search_books('old')[1], 0)
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE "books_book"')]
+        self.assertEqual(len(updates), 2)
+        self.assertNotIn('Same Title', ' '.join(updates))
+        self.assertFalse(stale_books(timedelta(days=30)).filter(pk=same.pk).exists())
+
+    def test_legacy_rows_without_hash_are_not_rewritten(self, mock_get):
+        VOLUMES['legacy'] = volume('Legacy Book')
+        book = Book.objects.create(
+            google_books_id='legacy', title='Legacy Book', authors=['Test Author'],
+            categories=['Fiction']
+        )
+
+        summary = refresh_catalog()
+
+        self.assertEqual((summary['changed'], summary['unchanged']), (0, 1))
+        book.refresh_from_db()
+        self.assertEqual(book.content_hash, GoogleBooksService.content_hash(
+            GoogleBooksService._to_model_fields(GoogleBooksService.get_book_by_id('legacy'))
+        ))
+
+    def test_failed_fetches_stay_stale(self, mock_get):
+        book = self.stored_book('gone', 'Gone Book')
+        del VOLUMES['gone']
+
+        summary = refresh_catalog()
+
+        self.assertEqual((summary['checked'], summary['failed'], summary['batches']), (1, 1, 1))
+        self.assertTrue(stale_books(timedelta(days=30)).filter(pk=book.pk).exists())
+
+    def test_genre_counts_follow_category_changes(self, mock_get):
+        book = self.stored_book('abc123', 'Test Book', categories=['Fiction'])
+        self.shelve(book, self.user)
+        self.assertEqual(get_statistics(self.user).genre_counts, {'Fiction': 1})
+        VOLUMES['abc123'] = volume('Test Book', categories=['History'])
+
+        refresh_catalog()
+
+        self.assertEqual(get_statistics(self.user).genre_counts, {'History': 1})
+
+    def test_command_reports_counts(self, mock_get):
+        self.stored_book('abc123', 'Test Book')
+        out = io.StringIO()
+        call_command('refresh_catalog', stdout=out)
+        self.assertIn('Checked 1 books in 1 batches: 0 changed, 1 unchanged, 0 failed', out.getvalue())
+
+    def test_workers_schedule_periodic_refresh_once(self, mock_get):
+        with self.settings(JOBS_PERIODIC={'refresh_catalog': 3600}):
+            Worker(concurrency=1).schedule_periodic()
+            Worker(concurrency=1).schedule_periodic()
+        self.assertEqual(Job.objects.filter(kind='refresh_catalog', status='queued').count(), 1)
+
+        self.assertEqual(Worker(concurrency=1).run_pending(), 1)
+        self.assertEqual(Job.objects.get(kind='refresh_catalog').status, 'succeeded')
+
+        # A worker started later doesn't queue it again within the interval
+        with self.settings(JOBS_PERIODIC={'refresh_catalog': 3600}):
+            Worker(concurrency=1).schedule_periodic()
+        self.assertEqual(Job.objects.filter(kind='refresh_catalog').count(), 1)
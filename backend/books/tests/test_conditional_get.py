@@ -0,0 +1,96 @@
+# backend/books/tests/test_conditional_get.py
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from books.models import Book, Shelf, UserBook, ReadingSession, Note
+from books.services import GoogleBooksService
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.book = Book.objects.create(google_books_id='test123', title='Test Book', authors=[])
+        self.shelf = Shelf.objects.create(user=self.user, name='Favourites')
+        self.user_book = UserBook.objects.create(user=self.user, book=self.book, status='reading')
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('"'))
+        return response['ETag']
+
+    def assertNotModified(self, url, etag):
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304, url)
+
+    def assertModified(self, url, etag):
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200, url)
+
+    def test_unchanged_collection_is_answered_with_a_single_lookup(self):
+        for url in ('/api/userbooks/', '/api/shelves/', '/api/userbooks/statistics/',
+                    f'/api/shelves/{self.shelf.id}/books/', f'/api/userbooks/{self.user_book.id}/'):
+            etag = self.etag(url)
+            with CaptureQueriesContext(connection) as context:
+                self.assertNotModified(url, etag)
+            self.assertEqual(len(context.captured_queries), 1, url)
+
+    def test_query_string_changes_the_etag(self):
+        self.assertNotEqual(self.etag('/api/userbooks/'), self.etag('/api/userbooks/?page_size=1'))
+
+    def test_writes_change_the_etag(self):
+        url = '/api/userbooks/'
+        now = timezone.now()
+        writes = [
+            lambda: self.user_book.shelves.add(self.shelf),
+            lambda: Shelf.objects.filter(pk=self.shelf.pk).first().save(),
+            lambda: Note.objects.create(user_book=self.user_book, content='Note'),
+            lambda: ReadingSession.objects.create(
+                user_book=self.user_book, start_page=0, end_page=10,
+                start_time=now - timedelta(minutes=10), end_time=now
+            ),
+            lambda: self.client.post(
+                f'/api/userbooks/{self.user_book.id}/update_progress/', {'current_page': 5}
+            ),
+            lambda: Book.objects.filter(pk=self.book.pk).first().save(),
+            lambda: self.user_book.delete(),
+        ]
+        for write in writes:
+            etag = self.etag(url)
+            write()
+            self.assertModified(url, etag)
+
+    def test_bulk_writes_change_the_etag(self):
+        etag = self.etag('/api/userbooks/')
+        GoogleBooksService.bulk_upsert_books([{
+            'google_books_id': 'test123', 'title': 'Renamed', 'authors': []
+        }])
+        self.assertModified('/api/userbooks/', etag)
+
+        etag = self.etag('/api/userbooks/')
+        self.client.post('/api/userbooks/sync_progress/', {'updates': [{
+            'user_book': self.user_book.id,
+            'client_timestamp': timezone.now().isoformat(),
+            'current_page': 42,
+        }]}, format='json')
+        self.assertModified('/api/userbooks/', etag)
+
+    def test_other_users_writes_keep_the_etag(self):
+        etag = self.etag('/api/userbooks/')
+        other = User.objects.create_user(username='other', password='testpass123')
+        UserBook.objects.create(user=other, book=self.book)
+        self.assertNotModified('/api/userbooks/', etag)
+
+    def test_statistics_etag_changes_with_the_day(self):
+        url = '/api/userbooks/statistics/'
+        etag = self.etag(url)
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        with patch('books.versioning.timezone.localdate', return_value=tomorrow):
+            self.assertModified(url, etag)
@@ -39,7 +39,7 @@ class BookEndpointsTests(TestCase):
         
         response = self.client.get('/api/books/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
         
     def test_get_book(self):
         book = Book.objects.create(**self.book_data)
@@ -88,7 +88,7 @@ class ShelfEndpointsTests(TestCase):
         
         response = self.client.get('/api/shelves/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
         
     def test_get_shelf(self):
         shelf = Shelf.objects.create(user=self.user, **self.shelf_data)
@@ -122,4 +122,4 @@ class ShelfEndpointsTests(TestCase):
         # Verify the first user can't see the other user's shelf
         response = self.client.get('/api/shelves/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 0)
\ No newline at end of file
+        self.assertEqual(len(response.data['results']), 0)
\ No newline at end of file
@@ -0,0 +1,173 @@
+# backend/books/tests/test_db_routers.py
+import logging
+import os
+import sqlite3
+import tempfile
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connection, connections, transaction
+from django.db.utils import load_backend
+from django.http import HttpResponse
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from books.db_routers import ReadWriteRouter, ReadYourWritesMiddleware, is_sticky, release_replica, use_replica
+from books.models import Book, UserBook, Review
+
+class ReadWriteRouterTests(TransactionTestCase):
+    def setUp(self):
+        self.router = ReadWriteRouter()
+
+    def test_reads_use_primary_by_default(self):
+        self.assertIsNone(self.router.db_for_read(Book))
+        self.assertEqual(self.router.db_for_write(Book), 'default')
+
+    @override_settings(DATABASE_REPLICAS=['default'])
+    def test_reads_use_replica_when_opted_in(self):
+        token = use_replica()
+        try:
+            self.assertEqual(self.router.db_for_read(Book), 'default')
+        finally:
+            release_replica(token)
+
+    def test_only_the_primary_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate('default', 'books'))
+        self.assertFalse(self.router.allow_migrate('replica', 'books'))
+
+    @override_settings(DATABASE_REPLICAS=['default'])
+    async def test_async_writes_stick_to_primary(self):
+        cache.clear()
+        user = await User.objects.acreate_user(username='testuser', password='testpass123')
+
+        async def write(request):
+            await Book.objects.acreate(google_books_id='test123', title='Test Book', authors=[])
+            return HttpResponse()
+
+        async def read(request):
+            await Book.objects.acount()
+            return HttpResponse()
+
+        request = type('Request', (), {'user': user})()
+        await ReadYourWritesMiddleware(read)(request)
+        self.assertFalse(await sync_to_async(is_sticky)(user))
+        await ReadYourWritesMiddleware(write)(request)
+        self.assertTrue(await sync_to_async(is_sticky)(user))
+
+    @override_settings(DEBUG=True)
+    def test_no_middleware_is_adapted_under_asgi(self):
+        # With DEBUG on, Django logs every middleware it has to adapt
+        with self.assertLogs('django.request', 'DEBUG') as logs:
+            logging.getLogger('django.request').debug('Loading the ASGI middleware chain')
+            ASGIHandler()
+        self.assertEqual([line for line in logs.output if 'adapted' in line], [])
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    A second SQLite file stands in for a replica: it's a snapshot of the
+    primary, so rows written after the snapshot are only visible on the
+    primary, like replication lag.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.replica_path = os.path.join(cls.temp_dir.name, 'replica.sqlite3')
+        settings_dict = connections.configure_settings({
+            'default': connection.settings_dict,
+            'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': cls.replica_path},
+        })['replica']
+        # Registered for this thread only, not in settings.DATABASES
+        connections['replica'] = load_backend(settings_dict['ENGINE']).DatabaseWrapper(settings_dict, 'replica')
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        cls.temp_dir.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        book = Book.objects.create(google_books_id='test123', title='Test Book', authors=[])
+        self.user_book = UserBook.objects.create(user=self.user, book=book, status='read')
+        Review.objects.create(user_book=self.user_book, content='Replicated', is_public=True)
+
+        connections['replica'].close()
+        connection.ensure_connection()
+        target = sqlite3.connect(self.replica_path)
+        connection.connection.backup(target)
+        target.close()
+
+        # Only on the primary
+        Review.objects.create(user_book=self.user_book, content='Lagging', is_public=True)
+
+    def review_contents(self):
+        response = self.client.get('/api/reviews/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return sorted(review['content'] for review in (data['results'] if isinstance(data, dict) else data))
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_read_only_actions_read_from_replica(self):
+        self.assertEqual(self.review_contents(), ['Replicated'])
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_reads_use_primary(self):
+        self.assertEqual(self.review_contents(), ['Lagging', 'Replicated'])
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_writes_stick_to_primary(self):
+        response = self.client.post(
+            '/api/reviews/', {'user_book': self.user_book.id, 'content': 'Mine', 'is_public': True},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.review_contents(), ['Lagging', 'Mine', 'Replicated'])
+
+        # Once the window passes, reads go back to the replica
+        cache.clear()
+        self.assertEqual(self.review_contents(), ['Replicated'])
+
+    @override_settings(DATABASE_REPLICAS=['replica'], DATABASE_REPLICA_STICKY_SECONDS=0)
+    def test_stickiness_can_be_disabled(self):
+        self.client.post(
+            '/api/reviews/', {'user_book': self.user_book.id, 'content': 'Mine', 'is_public': True},
+            format='json'
+        )
+        self.assertEqual(self.review_contents(), ['Replicated'])
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_other_actions_use_primary(self):
+        response = self.client.get('/api/reviews/')
+        self.assertEqual(response.status_code, 200)
+        review = Review.objects.get(content='Lagging')
+        response = self.client.get(f'/api/reviews/{review.id}/')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_transactions_read_from_primary(self):
+        token = use_replica()
+        try:
+            self.assertEqual(Review.objects.count(), 1)
+            with transaction.atomic():
+                self.assertEqual(Review.objects.count(), 2)
+        finally:
+            release_replica(token)
+
+class SQLiteSettingsTests(TestCase):
+    def test_sqlite_connections_use_configured_pragmas(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertGreater(cursor.fetchone()[0], 0)
+            cursor.execute('PRAGMA foreign_keys')
+            self.assertEqual(cursor.fetchone()[0], 1)
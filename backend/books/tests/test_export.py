@@ -0,0 +1,106 @@
+# backend/books/tests/test_export.py
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from books.exporting import iter_ndjson
+from books.models import Book, Shelf, UserBook, ReadingSession, Note, Review, Quote
+
+class LibraryExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.shelf = Shelf.objects.create(user=self.user, name='Favourites')
+        now = timezone.now()
+        for i in range(3):
+            book = Book.objects.create(
+                google_books_id=f'book{i}', title=f'Book {i}', authors=['Author'], categories=['Fiction']
+            )
+            user_book = UserBook.objects.create(user=self.user, book=book, status='reading')
+            user_book.shelves.add(self.shelf)
+            ReadingSession.objects.create(
+                user_book=user_book, start_page=0, end_page=10,
+                start_time=now - timedelta(hours=1), end_time=now
+            )
+            Note.objects.create(user_book=user_book, content=f'Note {i}')
+            Quote.objects.create(user_book=user_book, content=f'Quote {i}')
+            Review.objects.create(user_book=user_book, content=f'Review {i}')
+
+        other = User.objects.create_user(username='other', password='testpass123')
+        UserBook.objects.create(user=other, book=book, status='read')
+
+    def read_ndjson(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_ndjson_export_covers_the_whole_library(self):
+        response = self.client.get('/api/userbooks/export/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = self.read_ndjson(response)
+        counts = {}
+        for record in records:
+            counts[record['type']] = counts.get(record['type'], 0) + 1
+        self.assertEqual(counts, {
+            'shelves': 1, 'books': 3, 'sessions': 3, 'notes': 3, 'quotes': 3, 'reviews': 3
+        })
+
+    def test_records_match_the_api_representation(self):
+        records = self.read_ndjson(self.client.get('/api/userbooks/export/?type=books'))
+        listed = self.client.get('/api/userbooks/?page_size=200').json()['results']
+
+        self.assertEqual(
+            [record['data'] for record in records],
+            sorted(listed, key=lambda row: row['id'])
+        )
+
+    def test_csv_export_flattens_nested_objects(self):
+        response = self.client.get('/api/userbooks/export/?file_format=csv')
+
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['book_details__title'] for row in rows], ['Book 0', 'Book 1', 'Book 2'])
+        self.assertEqual(json.loads(rows[0]['shelves'])[0]['name'], 'Favourites')
+
+    def test_rejects_unknown_format_and_type(self):
+        self.assertEqual(self.client.get('/api/userbooks/export/?file_format=xml').status_code, 400)
+        self.assertEqual(self.client.get('/api/userbooks/export/?type=friends').status_code, 400)
+
+    def test_first_line_is_sent_before_later_chunks_are_read(self):
+        chunks = iter_ndjson(self.user, ['books'], chunk_size=1)
+        with CaptureQueriesContext(connection) as context:
+            first = json.loads(next(chunks))
+        self.assertEqual(first['data']['book_details']['title'], 'Book 0')
+        # The user books query plus the shelves of the first chunk only
+        self.assertEqual(len(context.captured_queries), 2)
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(len(list(chunks)), 2)
+        # One shelf prefetch per further chunk
+        self.assertEqual(len(context.captured_queries), 2)
+
+    def test_management_command_writes_a_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'library.ndjson')
+            call_command('export_library', 'testuser', '--output', path)
+            with open(path) as f:
+                lines = f.read().splitlines()
+        self.assertEqual(len(lines), 16)
+
+        out = io.StringIO()
+        call_command('export_library', 'testuser', '--format', 'csv', '--type', 'notes', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 4)
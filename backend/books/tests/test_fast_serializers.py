@@ -0,0 +1,105 @@
+# backend/books/tests/test_fast_serializers.py
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from books.fast_serializers import SerializerPlan, get_plan
+from books.models import Book, Shelf, UserBook, ReadingSession, Note, Review, Quote
+from books.serializers import (
+    BookSerializer, ShelfSerializer, UserBookSerializer,
+    ReadingSessionSerializer, NoteSerializer, ReviewSerializer,
+    QuoteSerializer
+)
+from books.views import with_user_book_relations
+
+class FastSerializerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        shelves = [
+            Shelf.objects.create(user=self.user, name='Favourites', is_default=True),
+            Shelf.objects.create(user=self.user, name='Empty'),
+        ]
+        now = timezone.now()
+        for i in range(5):
+            book = Book.objects.create(
+                google_books_id=f'book{i}',
+                title=f'Book {i}',
+                authors=['Author'] if i % 2 else [],
+                categories=['Fiction'],
+                published_date=date(2000 + i, 1, 1) if i % 2 else None,
+                page_count=100 + i if i % 2 else None,
+                description='Ünïcode "quoted"',
+            )
+            user_book = UserBook.objects.create(
+                user=self.user, book=book, status=['read', 'reading'][i % 2],
+                rating=i if i % 2 else None, start_date=date(2024, 1, i + 1) if i % 2 else None
+            )
+            user_book.shelves.set(shelves[:i % 3])
+            ReadingSession.objects.create(
+                user_book=user_book, start_page=0, end_page=10,
+                start_time=now - timedelta(hours=1), end_time=now
+            )
+            Note.objects.create(user_book=user_book, content='Note', page_number=i if i % 2 else None)
+            Quote.objects.create(user_book=user_book, content='Quote')
+            Review.objects.create(user_book=user_book, content='Review', is_public=i % 2 == 0)
+
+    def assertSameJSON(self, serializer_class, queryset):
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        actual = JSONRenderer().render(get_plan(serializer_class).serialize_many(queryset))
+        self.assertEqual(actual, expected, serializer_class.__name__)
+
+    def test_plans_render_identical_json(self):
+        self.assertSameJSON(BookSerializer, Book.objects.all())
+        self.assertSameJSON(ShelfSerializer, Shelf.objects.all())
+        self.assertSameJSON(UserBookSerializer, with_user_book_relations(UserBook.objects.all()))
+        self.assertSameJSON(ReadingSessionSerializer, ReadingSession.objects.all())
+        self.assertSameJSON(NoteSerializer, Note.objects.all())
+        self.assertSameJSON(QuoteSerializer, Quote.objects.all())
+        self.assertSameJSON(ReviewSerializer, Review.objects.select_related('user_book__user'))
+
+    def test_list_endpoints_match_the_slow_path(self):
+        shelf = Shelf.objects.get(name='Favourites')
+        urls = ['/api/books/', '/api/shelves/', '/api/userbooks/', '/api/reading-sessions/',
+                '/api/notes/', '/api/quotes/', '/api/reviews/', '/api/books/?search=book',
+                f'/api/shelves/{shelf.id}/books/']
+        for url in urls:
+            fast = self.client.get(url).content
+            cache.clear()
+            with patch('books.fast_serializers.FastListMixin.fast_list', False), \
+                    patch('books.views.get_plan', lambda serializer_class: _SlowPlan(serializer_class)):
+                slow = self.client.get(url).content
+            cache.clear()
+            self.assertEqual(fast, slow, url)
+
+    def test_request_dependent_fields_are_rejected(self):
+        class MethodSerializer(serializers.ModelSerializer):
+            extra = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Book
+                fields = ('id', 'extra')
+
+            def get_extra(self, obj):
+                return self.context['request'].user.pk
+
+        with self.assertRaises(ImproperlyConfigured):
+            SerializerPlan(MethodSerializer())
+
+class _SlowPlan:
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    def serialize_many(self, instances):
+        return self.serializer_class(instances, many=True).data
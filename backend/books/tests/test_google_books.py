@@ -1,11 +1,12 @@
 # backend/books/tests/test_google_books.py
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from unittest.mock import patch
-from books.services import GoogleBooksService
+from books.services import GoogleBooksService, response_cache
 from books.models import Book
 
+@override_settings(GOOGLE_BOOKS_UPSERT_IN_BACKGROUND=False)
 class GoogleBooksTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -14,6 +15,7 @@ class GoogleBooksTests(TestCase):
             password='testpass123'
         )
         self.client.force_authenticate(user=self.user)
+        response_cache.clear()
         
         self.sample_book_data = {
             'id': 'abc123',
@@ -31,7 +33,7 @@ class GoogleBooksTests(TestCase):
             }
         }
 
-    @patch('books.services.requests.get')
+    @patch('books.services.http_session.get')
     def test_search_books(self, mock_get):
         # Mock the API response
         mock_get.return_value.json.return_value = {
@@ -46,7 +48,7 @@ class GoogleBooksTests(TestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['title'], 'Test Book')
 
-    @patch('books.services.requests.get')
+    @patch('books.services.http_session.get')
     def test_get_book_by_id(self, mock_get):
         # Mock the API response
         mock_get.return_value.json.return_value = self.sample_book_data
@@ -66,7 +68,7 @@ class GoogleBooksTests(TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertIn('error', response.data)
 
-    @patch('books.services.requests.get')
+    @patch('books.services.http_session.get')
     def test_create_book_from_google_data(self, mock_get):
         # Mock the API response
         mock_get.return_value.json.return_value = self.sample_book_data
@@ -0,0 +1,134 @@
+# backend/books/tests/test_hybrid_search.py
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from books.jobs import Worker
+from books.models import Book, Job
+from books.search import hybrid_search, upsert_remote_results
+from books.services import response_cache
+
+def google_item(google_books_id, title):
+    return {
+        'id': google_books_id,
+        'volumeInfo': {
+            'title': title,
+            'authors': ['Frank Herbert'],
+            'publishedDate': '1965-08-01',
+            'language': 'en'
+        }
+    }
+
+@override_settings(GOOGLE_BOOKS_UPSERT_IN_BACKGROUND=False)
+class HybridSearchTests(TestCase):
+    def setUp(self):
+        response_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.dune = Book.objects.create(
+            google_books_id='dune',
+            title='Dune',
+            authors=['Frank Herbert']
+        )
+
+    @patch('books.services.http_session.get')
+    def test_enough_local_results_skip_google_books(self, mock_get):
+        results = hybrid_search('dune', max_results=1)
+
+        self.assertEqual([book['google_books_id'] for book in results], ['dune'])
+        self.assertIn('id', results[0])
+        mock_get.assert_not_called()
+
+    @patch('books.services.http_session.get')
+    def test_local_miss_falls_back_and_deduplicates(self, mock_get):
+        mock_get.return_value.json.return_value = {
+            'items': [
+                google_item('dune', 'Dune'),
+                google_item('messiah', 'Dune Messiah'),
+            ]
+        }
+
+        results = hybrid_search('dune', max_results=5)
+
+        self.assertEqual(
+            [book['google_books_id'] for book in results],
+            ['dune', 'messiah']
+        )
+        mock_get.assert_called_once()
+        # Remote entries are rendered like local ones, without an id yet
+        local, remote = results
+        self.assertEqual(set(remote), set(local))
+        self.assertIsNone(remote['id'])
+        self.assertEqual(remote['published_date'], '1965-08-01')
+
+    @patch('books.services.http_session.get')
+    def test_remote_results_are_upserted(self, mock_get):
+        mock_get.return_value.json.return_value = {
+            'items': [google_item('messiah', 'Dune Messiah')]
+        }
+
+        hybrid_search('messiah', max_results=5)
+
+        self.assertTrue(Book.objects.filter(google_books_id='messiah').exists())
+
+    @override_settings(GOOGLE_BOOKS_UPSERT_IN_BACKGROUND=True)
+    @patch('books.services.http_session.get')
+    def test_background_upserts_are_queued_as_jobs(self, mock_get):
+        mock_get.return_value.json.return_value = {
+            'items': [google_item('messiah', 'Dune Messiah')]
+        }
+
+        hybrid_search('messiah', max_results=5)
+
+        self.assertFalse(Book.objects.filter(google_books_id='messiah').exists())
+        self.assertEqual(Job.objects.get().kind, 'upsert_books')
+
+        Worker(concurrency=1).run_pending()
+        self.assertTrue(Book.objects.filter(google_books_id='messiah').exists())
+
+    @override_settings(GOOGLE_BOOKS_UPSERT_IN_BACKGROUND=True)
+    def test_background_upserts_skip_stored_books_and_deduplicate(self):
+        dune = {'google_books_id': 'dune', 'title': 'Dune', 'authors': []}
+        books = [
+            {'google_books_id': 'messiah', 'title': 'Dune Messiah', 'authors': []},
+            {'google_books_id': 'children', 'title': 'Children of Dune', 'authors': []},
+        ]
+
+        upsert_remote_results([dune])
+        self.assertFalse(Job.objects.exists())
+
+        upsert_remote_results(books)
+        upsert_remote_results(list(reversed(books)) + [dune])
+        job = Job.objects.get()
+        self.assertEqual(
+            sorted(book['google_books_id'] for book in job.payload['books']), ['children', 'messiah']
+        )
+
+    @patch('books.services.http_session.get')
+    def test_upsert_can_be_disabled(self, mock_get):
+        mock_get.return_value.json.return_value = {
+            'items': [google_item('messiah', 'Dune Messiah')]
+        }
+
+        hybrid_search('messiah', max_results=5, upsert=False)
+
+        self.assertFalse(Book.objects.filter(google_books_id='messiah').exists())
+
+    @patch('books.services.http_session.get')
+    def test_endpoint_can_force_remote_search(self, mock_get):
+        mock_get.return_value.json.return_value = {
+            'items': [google_item('messiah', 'Dune Messiah')]
+        }
+
+        response = self.client.get(
+            '/api/books/search_google_books/',
+            {'q': 'dune', 'max_results': 1, 'source': 'remote'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['google_books_id'], 'messiah')
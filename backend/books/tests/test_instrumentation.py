@@ -0,0 +1,140 @@
+# backend/books/tests/test_instrumentation.py
+import re
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import iscoroutinefunction
+from django.test import AsyncClient, TestCase, override_settings
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from books.async_services import AsyncGoogleBooksService
+from books.instrumentation import UPSTREAM, InstrumentationMiddleware, RequestMetrics, _current, propagate, registry, timed
+from books.models import Book
+from books.services import GoogleBooksService, circuit_breaker, response_cache
+
+def server_timing(response):
+    return {
+        match.group(1): (float(match.group(2)), match.group(3))
+        for match in re.finditer(r'(\w+);dur=([\d.]+)(?:;desc="(\d+) calls")?', response['Server-Timing'])
+    }
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        response_cache.clear()
+        circuit_breaker.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.book = Book.objects.create(google_books_id='abc123', title='Test Book', authors=['Test Author'])
+
+    def test_server_timing_header(self):
+        response = self.client.get(f'/api/books/{self.book.id}/')
+
+        timings = server_timing(response)
+        self.assertIn('total', timings)
+        self.assertGreaterEqual(int(timings['db'][1]), 1)
+        self.assertEqual(timings['serializer'][1], '1')
+        self.assertNotIn('upstream', timings)
+
+    @patch('books.services.http_session.get')
+    def test_upstream_time_is_recorded(self, mock_get):
+        mock_get.return_value.json.return_value = {'items': []}
+
+        response = self.client.get('/api/books/search_google_books/', {'q': 'dune', 'source': 'remote'})
+
+        self.assertEqual(server_timing(response)['upstream'][1], '1')
+
+    def test_pool_threads_report_to_the_request(self):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            def work():
+                with timed(UPSTREAM):
+                    pass
+            wrapped = propagate(work)
+        finally:
+            _current.reset(token)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda _: wrapped(), range(3)))
+        self.assertEqual(metrics.counts[UPSTREAM], 3)
+
+    def test_metrics_endpoint_requires_staff_or_token(self):
+        self.client.get('/api/books/')
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+        anonymous = APIClient()
+        with override_settings(METRICS_TOKEN=''):
+            self.assertEqual(anonymous.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer ').status_code, 401)
+        with override_settings(METRICS_TOKEN='secret'):
+            self.assertEqual(anonymous.get('/api/metrics/').status_code, 401)
+            self.assertEqual(anonymous.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+            response = anonymous.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+        body = response.content.decode()
+        self.assertIn('books_http_requests_total{view="book-list",method="GET",status="200"} 1', body)
+        self.assertIn('books_http_request_duration_seconds_bucket{view="book-list",method="GET",le="+Inf"} 1', body)
+        self.assertRegex(body, r'books_db_calls_total\{view="book-list"\} \d+')
+
+    def test_histogram_buckets_are_cumulative(self):
+        for _ in range(3):
+            self.client.get('/api/books/')
+        self.user.is_staff = True
+        self.user.save()
+
+        body = self.client.get('/api/metrics/').content.decode()
+        counts = [
+            int(value) for value in re.findall(
+                r'books_http_request_duration_seconds_bucket\{view="book-list",method="GET",le="[^"]+"\} (\d+)', body
+            )
+        ]
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(counts[-1], 3)
+
+    @override_settings(METRICS_SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_sampled_with_their_queries(self):
+        self.client.get(f'/api/books/{self.book.id}/')
+        self.user.is_staff = True
+        self.user.save()
+
+        samples = self.client.get('/api/metrics/slow/').data
+        sample = next(sample for sample in samples if sample['view'] == 'book-detail')
+        self.assertEqual(sample['status'], 200)
+        self.assertTrue(sample['slowest_queries'])
+        self.assertIn('books_slow_requests_total{view="book-detail",method="GET"} 1',
+                      self.client.get('/api/metrics/').content.decode())
+
+    @override_settings(METRICS_SLOW_REQUEST_MS=0, METRICS_SLOW_SAMPLE_RATE=0)
+    def test_sample_rate_limits_samples_but_not_counts(self):
+        self.client.get('/api/books/')
+        self.assertEqual(registry.samples(), [])
+        self.assertEqual(sum(registry.slow_requests.values()), 1)
+
+    def test_middleware_follows_the_handler_mode(self):
+        async def async_view(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(InstrumentationMiddleware(async_view)))
+        self.assertFalse(iscoroutinefunction(InstrumentationMiddleware(lambda request: HttpResponse())))
+
+    async def test_async_views_are_instrumented_through_the_full_chain(self):
+        key = (await Token.objects.acreate(user=self.user)).key
+
+        async def search(query, max_results=10, timeout=None):
+            return []
+
+        with patch.object(AsyncGoogleBooksService, 'search_books', side_effect=search):
+            response = await AsyncClient().get(
+                '/api/async/books/search_google_books/', {'q': 'dune', 'source': 'remote'},
+                headers={'Authorization': f'Token {key}'}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        # The token lookup runs in sync_to_async and is still counted
+        self.assertGreaterEqual(int(server_timing(response)['db'][1]), 1)
+        self.assertTrue(any(view.endswith('search_google_books') and method == 'GET'
+                            for view, method, _ in registry.requests))
@@ -0,0 +1,194 @@
+# backend/books/tests/test_jobs.py
+import io
+import time
+from datetime import timedelta
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from books import jobs
+from books.jobs import (
+    Worker, claim, enqueue, purge_finished_jobs, recover_stale_jobs, register, run_job
+)
+from books.models import Book, Job
+from books.services import response_cache
+from books.tests.test_bulk_import import fake_get
+
+calls = []
+
+@register('test_echo')
+def echo(payload):
+    calls.append(payload)
+    if payload.get('fail'):
+        raise jobs.JobError('upstream unavailable')
+    return {'echo': payload.get('value')}
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+        response_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_enqueue_deduplicates_active_jobs(self):
+        first = enqueue('test_echo', {'value': 1}, dedupe_key='abc')
+        second = enqueue('test_echo', {'value': 2}, dedupe_key='abc')
+        self.assertEqual(first.id, second.id)
+
+        Worker(concurrency=1).run_pending()
+        third = enqueue('test_echo', {'value': 3}, dedupe_key='abc')
+        self.assertNotEqual(first.id, third.id)
+
+    def test_unknown_kinds_are_rejected(self):
+        with self.assertRaises(ValueError):
+            enqueue('no_such_job')
+
+    def test_worker_runs_due_jobs(self):
+        job = enqueue('test_echo', {'value': 'hi'})
+        later = enqueue('test_echo', {'value': 'later'}, delay=60)
+
+        self.assertEqual(Worker(concurrency=1).run_pending(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.attempts), ('succeeded', {'echo': 'hi'}, 1))
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(Job.objects.get(id=later.id).status, 'queued')
+
+    @override_settings(JOBS_RETRY_BACKOFF=10)
+    def test_failures_are_retried_with_backoff_then_fail(self):
+        job = enqueue('test_echo', {'fail': True}, max_attempts=2)
+        [claimed] = claim('worker', 1)
+        with self.assertLogs('books.jobs', 'ERROR') as logs:
+            run_job(claimed)
+        self.assertIn(f'Error running test_echo job {job.id}', logs.output[0])
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+        self.assertIn('upstream unavailable', job.last_error)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=9))
+        self.assertEqual(claim('worker', 1), [])
+
+        Job.objects.filter(id=job.id).update(run_after=timezone.now())
+        run_job(claim('worker', 1)[0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+
+    @override_settings(JOBS_CONCURRENCY={'test_echo': 1})
+    def test_per_kind_concurrency_limit(self):
+        enqueue('test_echo', {'value': 1})
+        enqueue('test_echo', {'value': 2})
+
+        self.assertEqual(len(claim('worker', 5)), 1)
+        self.assertEqual(claim('worker', 5, running={'test_echo': 1}), [])
+
+    @override_settings(JOBS_LOCK_TIMEOUT=60)
+    def test_stale_jobs_are_recovered(self):
+        job = enqueue('test_echo', {'value': 1})
+        claim('worker', 1)
+        five_minutes_ago = timezone.now() - timedelta(minutes=5)
+        Job.objects.filter(id=job.id).update(locked_at=five_minutes_ago)
+
+        # Started long ago but its heartbeat is recent
+        self.assertEqual(recover_stale_jobs(), 0)
+
+        Job.objects.filter(id=job.id).update(heartbeat_at=five_minutes_ago)
+        self.assertEqual(recover_stale_jobs(), 1)
+        self.assertEqual(Job.objects.get(id=job.id).status, 'queued')
+
+    @override_settings(JOBS_RETENTION_DAYS=7)
+    def test_finished_jobs_are_purged_after_retention(self):
+        old = enqueue('test_echo', {'value': 1})
+        recent = enqueue('test_echo', {'value': 2})
+        queued = enqueue('test_echo', {'value': 3}, delay=60)
+        Worker(concurrency=1).run_pending()
+        Job.objects.filter(id=old.id).update(finished_at=timezone.now() - timedelta(days=8))
+
+        self.assertEqual(purge_finished_jobs(), 1)
+        self.assertEqual(
+            set(Job.objects.values_list('id', flat=True)), {recent.id, queued.id}
+        )
+
+    @patch('books.services.http_session.get', side_effect=fake_get)
+    def test_background_bulk_import_and_status_endpoint(self, mock_get):
+        response = self.client.post(
+            '/api/books/bulk_import/',
+            {'google_books_ids': ['abc123', 'def456'], 'background': True},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'queued')
+        mock_get.assert_not_called()
+
+        out = io.StringIO()
+        call_command('run_jobs', '--once', '--concurrency', '1', stdout=out)
+        self.assertIn('Ran 1 jobs', out.getvalue())
+
+        job = self.client.get(f"/api/jobs/{response.data['id']}/").data
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['result']['imported'], 2)
+        self.assertEqual(Book.objects.count(), 2)
+
+    @patch('books.services.http_session.get', side_effect=fake_get)
+    def test_refresh_endpoint_dedupes_by_google_books_id(self, mock_get):
+        book = Book.objects.create(google_books_id='abc123', title='Stale Title', authors=[])
+
+        first = self.client.post(f'/api/books/{book.id}/refresh/')
+        second = self.client.post(f'/api/books/{book.id}/refresh/')
+        self.assertEqual(first.data['id'], second.data['id'])
+
+        Worker(concurrency=1).run_pending()
+        book.refresh_from_db()
+        self.assertEqual(book.title, 'First Book')
+        self.assertEqual(Job.objects.get(id=first.data['id']).result['book_id'], book.id)
+
+    @patch('books.services.http_session.get', side_effect=fake_get)
+    def test_refresh_reports_books_that_could_not_be_stored(self, mock_get):
+        job = enqueue('refresh_book', {'google_books_id': 'abc123'})
+
+        with patch('books.jobs.GoogleBooksService.create_or_update_book', return_value=None):
+            Worker(concurrency=1).run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.result, {'found': False, 'book_id': None, 'google_books_id': 'abc123'})
+
+    def test_users_only_see_their_own_jobs(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        enqueue('test_echo', {'value': 1}, user=other)
+        mine = enqueue('test_echo', {'value': 2}, user=self.user)
+
+        response = self.client.get('/api/jobs/')
+        self.assertEqual([job['id'] for job in response.data['results']], [mine.id])
+
+@register('test_slow')
+def slow(payload):
+    time.sleep(payload['seconds'])
+    job = Job.objects.get(kind='test_slow')
+    return {'beat': job.heartbeat_at > job.locked_at}
+
+class WorkerPoolTests(TransactionTestCase):
+    def test_thread_pool_drains_the_queue(self):
+        calls.clear()
+        for value in range(8):
+            enqueue('test_echo', {'value': value})
+
+        self.assertEqual(Worker(concurrency=4).run_pending(), 8)
+
+        self.assertEqual(Job.objects.filter(status='succeeded').count(), 8)
+        self.assertEqual(sorted(call['value'] for call in calls), list(range(8)))
+
+    @override_settings(JOBS_HEARTBEAT_INTERVAL=0.05)
+    def test_running_jobs_send_heartbeats(self):
+        job = enqueue('test_slow', {'seconds': 0.3})
+
+        Worker(concurrency=1).run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.result, {'beat': True})
+        self.assertIsNone(job.heartbeat_at)
@@ -0,0 +1,205 @@
+# backend/books/tests/test_library_import.py
+import io
+import requests
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from books.exporting import iter_ndjson
+from books.library_import import run_import
+from books.models import (
+    Book, LibraryImport, Note, Quote, ReadingSession, ReadingStatistics, Review, Shelf, UserBook
+)
+from books.services import response_cache
+from books.statistics import rebuild_statistics
+
+GOODREADS_HEADER = (
+    'Book Id,Title,Author,Additional Authors,ISBN,ISBN13,My Rating,'
+    'Exclusive Shelf,Bookshelves,Date Read,My Review\n'
+)
+
+def fake_get(url, params=None, **kwargs):
+    """
+    Stand-in for Google Books that only knows ISBN 9780000000001.
+    """
+    class FakeResponse:
+        status_code = 200
+
+        def __init__(self, payload):
+            self.payload = payload
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return self.payload
+
+    if params and params.get('q') == 'isbn:9780000000001':
+        return FakeResponse({'items': [{
+            'id': 'remote1',
+            'volumeInfo': {'title': 'Remote Book', 'authors': ['Remote Author'], 'categories': ['History']},
+        }]})
+    return FakeResponse({})
+
+@patch('books.services.http_session.get', side_effect=fake_get)
+class LibraryImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        response_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.local = Book.objects.create(
+            google_books_id='local1', title='Local Book', authors=['Local Author'], categories=['Fiction']
+        )
+
+    def goodreads_csv(self):
+        return GOODREADS_HEADER + (
+            '1,"Local Book (Local Series, #1)",Local Author,,="",="",4,read,"favourites, read",2020/01/31,Loved it\n'
+            '2,Remote Book,Remote Author,,="0000000001",="9780000000001",0,currently-reading,,,\n'
+            '3,Nowhere Book,Nobody,,,,0,to-read,,,\n'
+            '4,,No Title,,,,0,to-read,,,\n'
+        )
+
+    def start(self, user=None, file_format='goodreads'):
+        return LibraryImport.objects.create(user=user or self.user, file_format=file_format)
+
+    def assertStatisticsMatch(self, user):
+        incremental = ReadingStatistics.objects.get(user=user)
+        rebuilt = rebuild_statistics(user)
+        for field in ('total_books', 'read_count', 'reading_count', 'rating_sum', 'session_count', 'genre_counts'):
+            self.assertEqual(getattr(incremental, field), getattr(rebuilt, field), field)
+
+    def test_goodreads_import_resolves_locally_first(self, mock_get):
+        library_import = run_import(self.start(), io.StringIO(self.goodreads_csv()))
+
+        self.assertEqual(library_import.status, 'completed')
+        self.assertEqual(library_import.rows_processed, 4)
+        self.assertEqual(library_import.counts, {'books': 2, 'shelves': 1, 'reviews': 1, 'failed': 2})
+        self.assertEqual(sorted(error['row'] for error in library_import.errors), [3, 4])
+
+        local = UserBook.objects.get(user=self.user, book=self.local)
+        self.assertEqual((local.status, local.rating, str(local.end_date)), ('read', 4, '2020-01-31'))
+        self.assertEqual([shelf.name for shelf in local.shelves.all()], ['favourites'])
+        self.assertEqual(Review.objects.get(user_book=local).content, 'Loved it')
+        self.assertFalse(Review.objects.get(user_book=local).is_public)
+
+        remote = UserBook.objects.get(user=self.user, book__google_books_id='remote1')
+        self.assertEqual(remote.status, 'reading')
+        self.assertStatisticsMatch(self.user)
+
+        # Only the two unresolved rows went upstream: one ISBN lookup, one search
+        queries = [call.kwargs['params']['q'] for call in mock_get.call_args_list]
+        self.assertEqual(len(queries), 2)
+        self.assertIn('isbn:9780000000001', queries)
+
+    def test_reimport_leaves_existing_books_alone(self, mock_get):
+        run_import(self.start(), io.StringIO(self.goodreads_csv()))
+        library_import = run_import(self.start(), io.StringIO(self.goodreads_csv()))
+
+        self.assertEqual(library_import.counts.get('existing'), 2)
+        self.assertEqual(UserBook.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(Review.objects.count(), 1)
+
+    def test_ndjson_export_round_trip(self, mock_get):
+        shelf = Shelf.objects.create(user=self.user, name='Favourites')
+        user_book = UserBook.objects.create(user=self.user, book=self.local, status='reading', rating=5)
+        user_book.shelves.add(shelf)
+        now = timezone.now()
+        ReadingSession.objects.create(
+            user_book=user_book, start_page=0, end_page=30,
+            start_time=now - timedelta(hours=1), end_time=now
+        )
+        Note.objects.create(user_book=user_book, content='Note', page_number=3)
+        Quote.objects.create(user_book=user_book, content='Quote')
+        Review.objects.create(user_book=user_book, content='Review', is_public=True)
+        export = ''.join(iter_ndjson(self.user))
+        # A book the target catalog has never seen is created from the export
+        export += (
+            '{"type": "books", "data": {"id": 999, "status": "read", "shelves": [], '
+            '"book_details": {"google_books_id": "exported1", "title": "Exported Book", "authors": []}}}\n'
+        )
+
+        other = User.objects.create_user(username='other', password='testpass123')
+        library_import = run_import(self.start(other, 'ndjson'), io.StringIO(export), chunk_size=2)
+
+        self.assertEqual(library_import.status, 'completed')
+        self.assertEqual(library_import.counts, {
+            'shelves': 1, 'books': 2, 'sessions': 1, 'notes': 1, 'quotes': 1, 'reviews': 1
+        })
+        imported = UserBook.objects.get(user=other, book=self.local)
+        self.assertEqual((imported.status, imported.rating), ('reading', 5))
+        self.assertEqual([shelf.name for shelf in imported.shelves.all()], ['Favourites'])
+        self.assertTrue(Review.objects.get(user_book=imported).is_public)
+        self.assertEqual(Book.objects.get(google_books_id='exported1').title, 'Exported Book')
+        self.assertStatisticsMatch(other)
+        mock_get.assert_not_called()
+
+    def test_interrupted_import_resumes_without_duplicates(self, mock_get):
+        library_import = self.start()
+        with patch('books.library_import.bump', side_effect=[None, RuntimeError('disk full')]):
+            run_import(library_import, io.StringIO(self.goodreads_csv()), chunk_size=1)
+
+        library_import.refresh_from_db()
+        self.assertEqual(library_import.status, 'failed')
+        self.assertEqual(library_import.rows_processed, 1)
+        self.assertEqual(UserBook.objects.filter(user=self.user).count(), 1)
+
+        run_import(library_import, io.StringIO(self.goodreads_csv()), chunk_size=1)
+
+        self.assertEqual(library_import.status, 'completed')
+        self.assertEqual(library_import.counts['books'], 2)
+        self.assertEqual(UserBook.objects.filter(user=self.user).count(), 2)
+
+    def test_chunks_cost_a_constant_number_of_queries(self, mock_get):
+        def import_queries(count, offset):
+            for i in range(count):
+                Book.objects.create(google_books_id=f'b{offset + i}', title=f'Book {offset + i}', authors=['A'])
+            csv_data = GOODREADS_HEADER + ''.join(
+                f'{i},Book {offset + i},A,,,,3,read,shelf{offset + i % 2},,Review\n' for i in range(count)
+            )
+            with CaptureQueriesContext(connection) as context:
+                run_import(self.start(), io.StringIO(csv_data), chunk_size=100)
+            return len(context.captured_queries)
+
+        self.assertEqual(import_queries(3, 0), import_queries(30, 100))
+
+    def test_upload_keeps_line_breaks_inside_quoted_fields(self, mock_get):
+        csv_data = GOODREADS_HEADER + '1,Local Book,Local Author,,,,4,read,,,"Loved it\r\nRead it twice"\r\n'
+        upload = SimpleUploadedFile('goodreads_library_export.csv', csv_data.encode())
+
+        response = self.client.post('/api/userbooks/import_library/', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            Review.objects.get(user_book__book=self.local).content, 'Loved it\r\nRead it twice'
+        )
+
+    def test_endpoint_accepts_goodreads_upload(self, mock_get):
+        upload = SimpleUploadedFile('goodreads_library_export.csv', self.goodreads_csv().encode())
+
+        response = self.client.post('/api/userbooks/import_library/', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertEqual(response.data['file_format'], 'goodreads')
+        self.assertEqual(response.data['counts']['books'], 2)
+        self.assertNotIn('id_map', response.data)
+
+        # Completed imports can't be resumed
+        upload = SimpleUploadedFile('goodreads_library_export.csv', self.goodreads_csv().encode())
+        response = self.client.post(
+            '/api/userbooks/import_library/',
+            {'file': upload, 'import_id': response.data['id']},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, 400)
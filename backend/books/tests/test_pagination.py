@@ -0,0 +1,57 @@
+# backend/books/tests/test_pagination.py
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from books.models import Book, Shelf, UserBook
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.books = [
+            Book.objects.create(google_books_id=f'book{n}', title=f'Book {n}', authors=[])
+            for n in range(7)
+        ]
+
+    def collect(self, url, params):
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.data['results']]
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_walks_every_row_once_in_stable_order(self):
+        ids = self.collect('/api/books/', {'page_size': 3})
+        self.assertEqual(ids, [book.id for book in reversed(self.books)])
+
+    def test_page_size_is_capped(self):
+        Book.objects.bulk_create([
+            Book(google_books_id=f'extra{n}', title=f'Extra {n}', authors=[])
+            for n in range(250)
+        ])
+        response = self.client.get('/api/books/', {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 200)
+
+    def test_pages_use_keyset_not_offset(self):
+        response = self.client.get('/api/books/', {'page_size': 3})
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(response.data['next'])
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        self.assertNotIn('OFFSET', sql.upper())
+
+    def test_userbooks_and_shelf_books_are_paginated(self):
+        shelf = Shelf.objects.create(user=self.user, name='All')
+        for book in self.books:
+            UserBook.objects.create(user=self.user, book=book, status='read').shelves.add(shelf)
+
+        self.assertEqual(len(self.collect('/api/userbooks/', {'page_size': 2})), 7)
+        self.assertEqual(len(self.collect(f'/api/shelves/{shelf.id}/books/', {'page_size': 2})), 7)
@@ -0,0 +1,159 @@
+# backend/books/tests/test_progress_sync.py
+from datetime import timedelta
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from books.models import Book, UserBook, ReadingSession, ReadingStatistics
+from books.statistics import rebuild_statistics
+
+class ProgressSyncTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.book = Book.objects.create(
+            google_books_id='test123', title='Test Book', authors=[], categories=['Fiction']
+        )
+        self.user_book = UserBook.objects.create(user=self.user, book=self.book, status='want_to_read')
+        self.now = timezone.now()
+
+    def sync(self, updates):
+        return self.client.post('/api/userbooks/sync_progress/', {'updates': updates}, format='json')
+
+    def update(self, minutes_ago, **fields):
+        return {
+            'user_book': self.user_book.id,
+            'client_timestamp': (self.now - timedelta(minutes=minutes_ago)).isoformat(),
+            **fields
+        }
+
+    def session(self, start_page, end_page, minutes_ago):
+        end = self.now - timedelta(minutes=minutes_ago)
+        return {
+            'start_page': start_page,
+            'end_page': end_page,
+            'start_time': (end - timedelta(minutes=20)).isoformat(),
+            'end_time': end.isoformat(),
+        }
+
+    def test_applies_updates_in_client_timestamp_order(self):
+        # Sent out of order: the newest update must win
+        response = self.sync([
+            self.update(5, current_page=80, status='reading', session=self.session(40, 80, 5)),
+            self.update(30, current_page=40, status='reading', session=self.session(0, 40, 30)),
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['applied'], 2)
+        self.assertEqual(response.data['sessions_created'], 2)
+        self.user_book.refresh_from_db()
+        self.assertEqual(self.user_book.current_page, 80)
+        self.assertEqual(self.user_book.status, 'reading')
+        self.assertEqual(ReadingSession.objects.filter(user_book=self.user_book).count(), 2)
+
+    def test_replayed_batch_is_stale_and_does_not_duplicate_sessions(self):
+        batch = [self.update(10, current_page=50, session=self.session(0, 50, 10))]
+        self.sync(batch)
+
+        response = self.sync(batch)
+
+        self.assertEqual(response.data['results'][0]['progress'], 'stale')
+        self.assertEqual(response.data['results'][0]['session'], 'duplicate')
+        self.assertEqual(ReadingSession.objects.count(), 1)
+
+    def test_older_update_loses_to_server_side_progress(self):
+        self.client.post(f'/api/userbooks/{self.user_book.id}/update_progress/', {'current_page': 120})
+
+        response = self.sync([self.update(60, current_page=10)])
+
+        self.assertEqual(response.data['results'][0]['progress'], 'stale')
+        self.user_book.refresh_from_db()
+        self.assertEqual(self.user_book.current_page, 120)
+
+    def test_online_updates_with_a_client_clock_compare_like_offline_ones(self):
+        url = f'/api/userbooks/{self.user_book.id}/update_progress/'
+        response = self.client.post(url, {
+            'current_page': 120, 'client_timestamp': (self.now - timedelta(minutes=30)).isoformat()
+        })
+        self.assertEqual(response.status_code, 200)
+
+        # Made later on the same clock, so it wins even though it arrives later
+        response = self.sync([self.update(10, current_page=130)])
+        self.assertEqual(response.data['results'][0]['progress'], 'applied')
+
+        response = self.client.post(url, {
+            'current_page': 90, 'client_timestamp': (self.now - timedelta(minutes=20)).isoformat()
+        })
+        self.assertEqual(response.status_code, 409)
+        self.user_book.refresh_from_db()
+        self.assertEqual(self.user_book.current_page, 130)
+
+    def test_online_updates_without_a_client_clock_use_the_server_clock(self):
+        self.client.post(f'/api/userbooks/{self.user_book.id}/update_progress/', {'current_page': 120})
+
+        # Made after the online update on a device whose clock is 5 minutes
+        # behind the server's: documented to lose
+        response = self.sync([self.update(4, current_page=130)])
+
+        self.assertEqual(response.data['results'][0]['progress'], 'stale')
+        self.user_book.refresh_from_db()
+        self.assertEqual(self.user_book.current_page, 120)
+
+    def test_invalid_and_foreign_items_are_reported_per_item(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        foreign = UserBook.objects.create(user=other, book=self.book)
+
+        response = self.sync([
+            self.update(5, current_page=-1),
+            {**self.update(5, current_page=10), 'user_book': foreign.id},
+            self.update(5, current_page=10),
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['failed'], 2)
+        self.assertIn('current_page', response.data['results'][0]['errors'])
+        self.assertIn('user_book', response.data['results'][1]['errors'])
+        self.assertEqual(response.data['results'][2]['progress'], 'applied')
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.current_page, 0)
+
+    def test_statistics_stay_in_sync(self):
+        self.sync([
+            self.update(10, status='reading', session=self.session(0, 30, 10)),
+            self.update(5, status='read', session=self.session(30, 60, 5)),
+        ])
+
+        incremental = ReadingStatistics.objects.get(user=self.user)
+        rebuilt = rebuild_statistics(self.user)
+        for field in ('read_count', 'want_to_read_count', 'session_count', 'pages_read', 'daily_activity'):
+            self.assertEqual(getattr(incremental, field), getattr(rebuilt, field), field)
+        self.assertEqual(rebuilt.pages_read, 60)
+
+    def test_batch_runs_in_constant_queries(self):
+        books = [
+            UserBook.objects.create(
+                user=self.user,
+                book=Book.objects.create(google_books_id=f'book{i}', title=f'Book {i}', authors=[])
+            )
+            for i in range(10)
+        ]
+        updates = [
+            {**self.update(i, current_page=i + 1, session=self.session(0, i + 1, i)), 'user_book': user_book.id}
+            for i, user_book in enumerate(books)
+        ]
+
+        # lookup, session dedupe, bulk update, bulk insert, statistics read
+        # and write, version bump, plus two savepoints and their releases
+        with self.assertNumQueries(11):
+            response = self.sync(updates)
+        self.assertEqual(response.data['applied'], 10)
+
+    def test_rejects_empty_and_oversized_batches(self):
+        self.assertEqual(self.sync([]).status_code, 400)
+        with self.settings(PROGRESS_SYNC_MAX_ITEMS=1):
+            response = self.sync([self.update(1, current_page=1), self.update(2, current_page=2)])
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,87 @@
+# backend/books/tests/test_query_counts.py
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from books.models import Book, Shelf, UserBook, ReadingSession, Note, Review, Quote
+
+class ListQueryCountTests(TestCase):
+    """
+    Guards against N+1 queries: every list endpoint must issue the same
+    number of queries no matter how many rows it returns.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.shelves = [
+            Shelf.objects.create(user=self.user, name='Favourites'),
+            Shelf.objects.create(user=self.user, name='Sci-fi'),
+        ]
+        self.created = 0
+
+    def add_books(self, count):
+        now = timezone.now()
+        for _ in range(count):
+            self.created += 1
+            book = Book.objects.create(
+                google_books_id=f'book{self.created}',
+                title=f'Book {self.created}',
+                authors=['Test Author']
+            )
+            user_book = UserBook.objects.create(user=self.user, book=book, status='reading')
+            user_book.shelves.set(self.shelves)
+            ReadingSession.objects.create(
+                user_book=user_book, start_page=1, end_page=10,
+                start_time=now - timedelta(hours=1), end_time=now
+            )
+            Note.objects.create(user_book=user_book, content='Note')
+            Quote.objects.create(user_book=user_book, content='Quote')
+            Review.objects.create(user_book=user_book, content='Review', is_public=True)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, url):
+        self.add_books(2)
+        small = self.count_queries(url)
+        self.add_books(10)
+        large = self.count_queries(url)
+        self.assertEqual(small, large, f'{url} issues queries per row')
+
+    def test_books(self):
+        self.assertConstantQueries('/api/books/')
+
+    def test_shelves(self):
+        self.assertConstantQueries('/api/shelves/')
+
+    def test_shelf_books(self):
+        self.assertConstantQueries(f'/api/shelves/{self.shelves[0].id}/books/')
+
+    def test_userbooks(self):
+        self.assertConstantQueries('/api/userbooks/')
+
+    def test_statistics(self):
+        self.assertConstantQueries('/api/userbooks/statistics/')
+
+    def test_reading_sessions(self):
+        self.assertConstantQueries('/api/reading-sessions/')
+
+    def test_notes(self):
+        self.assertConstantQueries('/api/notes/')
+
+    def test_reviews(self):
+        self.assertConstantQueries('/api/reviews/')
+
+    def test_quotes(self):
+        self.assertConstantQueries('/api/quotes/')
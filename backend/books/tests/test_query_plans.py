@@ -0,0 +1,87 @@
+# backend/books/tests/test_query_plans.py
+import re
+import unittest
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from books.models import Book, Shelf, UserBook, ReadingSession, Note, Review, Quote
+
+# A plan step that reads a whole table without an index
+FULL_SCAN = re.compile(r'\bSCAN (\w+)\b(?! USING)')
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'query plans are checked on SQLite')
+class ListQueryPlanTests(TestCase):
+    """
+    Runs EXPLAIN QUERY PLAN on every query issued by the list endpoints and
+    fails if any of them falls back to a full table scan. The catalog-wide
+    book list is the one exception: walking the primary key in order with a
+    LIMIT is exactly what keyset pagination is meant to do.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        shelf = Shelf.objects.create(user=self.user, name='Favourites')
+        now = timezone.now()
+        for n in range(3):
+            book = Book.objects.create(google_books_id=f'book{n}', title=f'Book {n}', authors=[])
+            user_book = UserBook.objects.create(user=self.user, book=book, status='reading')
+            user_book.shelves.add(shelf)
+            ReadingSession.objects.create(
+                user_book=user_book, start_page=0, end_page=10,
+                start_time=now - timedelta(hours=1), end_time=now
+            )
+            Note.objects.create(user_book=user_book, content='Note')
+            Quote.objects.create(user_book=user_book, content='Quote')
+            Review.objects.create(user_book=user_book, content='Review', is_public=True)
+        self.shelf = shelf
+
+    def full_scans(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'page_size': 2})
+        self.assertEqual(response.status_code, 200, url)
+
+        scans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                for row in cursor.fetchall():
+                    match = FULL_SCAN.search(row[-1])
+                    if match and not self.is_keyset_walk(sql, match.group(1)):
+                        scans.append(f'{row[-1]}  <-  {sql}')
+        return scans
+
+    @staticmethod
+    def is_keyset_walk(sql, table):
+        return table == 'books_book' and ' WHERE ' not in sql and ' LIMIT ' in sql
+
+    def assertNoFullScans(self, url):
+        scans = self.full_scans(url)
+        self.assertEqual(scans, [], f'{url} falls back to a full scan')
+
+    def test_list_endpoints_use_indexes(self):
+        for url in (
+            '/api/books/',
+            '/api/shelves/',
+            f'/api/shelves/{self.shelf.id}/books/',
+            '/api/userbooks/',
+            '/api/userbooks/statistics/',
+            '/api/reading-sessions/',
+            '/api/notes/',
+            '/api/reviews/',
+            '/api/quotes/',
+        ):
+            with self.subTest(url=url):
+                self.assertNoFullScans(url)
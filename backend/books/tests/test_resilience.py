@@ -0,0 +1,248 @@
+# backend/books/tests/test_resilience.py
+import asyncio
+import threading
+import time
+import requests
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from unittest.mock import MagicMock, patch
+from books.resilience import (
+    CLOSED, HALF_OPEN, OPEN, AsyncSingleFlight, CircuitBreaker, RateLimiter, SingleFlight,
+    UpstreamUnavailable
+)
+from books.services import GoogleBooksService, circuit_breaker, rate_limiter, response_cache, stale_cache
+
+def response(payload, status_code=200):
+    mock = MagicMock(status_code=status_code)
+    mock.json.return_value = payload
+    if status_code >= 400:
+        mock.raise_for_status.side_effect = requests.HTTPError(str(status_code))
+    return mock
+
+class RateLimiterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_burst_then_refill(self):
+        limiter = RateLimiter('test', rate=50, burst=2)
+
+        self.assertTrue(limiter.acquire())
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+
+        time.sleep(0.03)
+        self.assertTrue(limiter.acquire())
+
+    def test_waits_for_a_token(self):
+        limiter = RateLimiter('test', rate=50, burst=1)
+        limiter.acquire()
+
+        start = time.monotonic()
+        self.assertTrue(limiter.acquire(timeout=1))
+        self.assertGreater(time.monotonic() - start, 0.01)
+
+    def test_bucket_is_shared_through_the_cache(self):
+        first = RateLimiter('shared', rate=1, burst=1)
+        second = RateLimiter('shared', rate=1, burst=1)
+
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+
+    def test_async_acquire_waits_on_the_event_loop(self):
+        limiter = RateLimiter('test', rate=50, burst=1)
+        limiter.acquire()
+
+        async def acquire_twice():
+            ticks = []
+
+            async def tick():
+                while len(ticks) < 100:
+                    ticks.append(1)
+                    await asyncio.sleep(0.001)
+
+            ticker = asyncio.ensure_future(tick())
+            acquired = await limiter.aacquire(timeout=1)
+            ticker.cancel()
+            return acquired, len(ticks), await limiter.aacquire()
+
+        acquired, ticks, again = asyncio.run(acquire_twice())
+        self.assertTrue(acquired)
+        self.assertGreater(ticks, 1)
+        self.assertFalse(again)
+
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.breaker = CircuitBreaker('test', failure_threshold=3, recovery_timeout=0.05)
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), CLOSED)
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_lets_one_probe_through(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        time.sleep(0.06)
+
+        self.assertEqual(self.breaker.state(), HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state(), CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_probe_reopens(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        time.sleep(0.06)
+
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), OPEN)
+
+class SingleFlightTests(TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            release.wait(1)
+            return 'result'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do('key', slow)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, ['result'] * 5)
+
+    def test_errors_reach_every_waiter(self):
+        flight = SingleFlight()
+        with self.assertRaises(KeyError):
+            flight.do('key', lambda: {}['missing'])
+        self.assertEqual(flight.do('key', lambda: 'retried'), 'retried')
+
+    def test_async_calls_share_one_task(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return 'result'
+
+        async def run():
+            return await asyncio.gather(*(flight.do('key', slow) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(run()), ['result'] * 5)
+        self.assertEqual(calls, [1])
+
+    def test_async_errors_reach_every_waiter(self):
+        flight = AsyncSingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise KeyError('missing')
+
+        async def run():
+            return await asyncio.gather(*(flight.do('key', fail) for _ in range(3)), return_exceptions=True)
+
+        self.assertTrue(all(isinstance(result, KeyError) for result in asyncio.run(run())))
+
+class GoogleBooksResilienceTests(TestCase):
+    def setUp(self):
+        response_cache.clear()
+        stale_cache.clear()
+        circuit_breaker.reset()
+        rate_limiter.reset()
+        self.sample_book_data = {
+            'id': 'abc123',
+            'volumeInfo': {'title': 'Test Book', 'authors': ['Test Author']}
+        }
+
+    def tearDown(self):
+        circuit_breaker.reset()
+
+    @patch('books.services.http_session.get')
+    def test_open_circuit_serves_stale_results_without_calling_upstream(self, mock_get):
+        mock_get.return_value = response({'items': [self.sample_book_data]})
+        fresh = GoogleBooksService.search_books('test')
+        response_cache.delete(GoogleBooksService._cache_key('search', 'test', 10))
+
+        mock_get.reset_mock()
+        for _ in range(circuit_breaker.failure_threshold):
+            circuit_breaker.record_failure()
+
+        self.assertEqual(GoogleBooksService.search_books('test'), fresh)
+        self.assertEqual(GoogleBooksService.search_books('uncached'), [])
+        mock_get.assert_not_called()
+
+    @patch('books.services.http_session.get')
+    def test_server_errors_trip_the_breaker(self, mock_get):
+        mock_get.return_value = response({}, 503)
+
+        for index in range(circuit_breaker.failure_threshold):
+            self.assertIsNone(GoogleBooksService.get_book_by_id(f'id{index}'))
+        self.assertEqual(circuit_breaker.state(), OPEN)
+
+        self.assertIsNone(GoogleBooksService.get_book_by_id('another'))
+        self.assertEqual(mock_get.call_count, circuit_breaker.failure_threshold)
+
+    @override_settings(GOOGLE_BOOKS_HTTP_BACKOFF=0)
+    @patch('books.services.http_session.get')
+    def test_retries_take_a_token_and_report_to_the_breaker(self, mock_get):
+        mock_get.side_effect = [
+            requests.ConnectionError('reset'), response({}, 503), response(self.sample_book_data)
+        ]
+
+        with patch.object(rate_limiter, 'acquire', wraps=rate_limiter.acquire) as acquire, \
+                patch.object(circuit_breaker, 'record_failure', wraps=circuit_breaker.record_failure) as failure:
+            self.assertEqual(GoogleBooksService.get_book_by_id('abc123')['title'], 'Test Book')
+        self.assertEqual((mock_get.call_count, acquire.call_count, failure.call_count), (3, 3, 2))
+        self.assertEqual(circuit_breaker.state(), CLOSED)
+
+    @patch('books.services.http_session.get')
+    def test_missing_volumes_do_not_trip_the_breaker(self, mock_get):
+        mock_get.return_value = response({}, 404)
+
+        for index in range(circuit_breaker.failure_threshold + 1):
+            GoogleBooksService.get_book_by_id(f'id{index}')
+        self.assertEqual(circuit_breaker.state(), CLOSED)
+
+    @patch('books.services.http_session.get')
+    def test_rate_limited_calls_fail_fast(self, mock_get):
+        mock_get.return_value = response(self.sample_book_data)
+
+        with patch.object(rate_limiter, 'acquire', return_value=False):
+            with self.assertRaises(UpstreamUnavailable):
+                GoogleBooksService._get('/volumes/abc123', {})
+            self.assertIsNone(GoogleBooksService.get_book_by_id('abc123'))
+        mock_get.assert_not_called()
+
+    @patch('books.services.http_session.get')
+    def test_refresh_bypasses_cached_and_stale_copies(self, mock_get):
+        mock_get.return_value = response(self.sample_book_data)
+        GoogleBooksService.get_book_by_id('abc123')
+
+        mock_get.return_value = response({}, 503)
+        self.assertEqual(GoogleBooksService.get_book_by_id('abc123')['title'], 'Test Book')
+        self.assertIsNone(GoogleBooksService.get_book_by_id('abc123', use_cache=False))
@@ -0,0 +1,115 @@
+# backend/books/tests/test_response_cache.py
+import requests
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from books.cache import MISSING, LocalTTLCache, DjangoCacheTier, ResponseCache
+from books.services import GoogleBooksService, response_cache
+
+class LocalTTLCacheTests(TestCase):
+    def test_entries_expire_after_ttl(self):
+        cache = LocalTTLCache(max_entries=10, ttl=60)
+        with patch('books.cache.time.monotonic', return_value=100):
+            cache.set('key', 'value')
+        with patch('books.cache.time.monotonic', return_value=159):
+            self.assertEqual(cache.get('key'), 'value')
+        with patch('books.cache.time.monotonic', return_value=161):
+            self.assertIs(cache.get('key'), MISSING)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LocalTTLCache(max_entries=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIs(cache.get('b'), MISSING)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_falsy_values_are_cached(self):
+        cache = LocalTTLCache()
+        cache.set('empty', [])
+        self.assertEqual(cache.get('empty'), [])
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.local = LocalTTLCache()
+        self.shared = DjangoCacheTier(alias='google_books')
+        self.cache = ResponseCache([self.local, self.shared])
+        self.cache.clear()
+
+    def test_shared_tier_hit_populates_local_tier(self):
+        self.shared.set('key', {'title': 'Test Book'})
+
+        self.assertEqual(self.cache.get('key'), {'title': 'Test Book'})
+        self.assertEqual(self.local.get('key'), {'title': 'Test Book'})
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['tiers'][1]['hits'], 1)
+
+    def test_counts_misses(self):
+        self.assertIs(self.cache.get('unknown'), MISSING)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+        self.assertEqual(self.cache.stats()['hit_ratio'], 0.0)
+
+class GoogleBooksCachingTests(TestCase):
+    def setUp(self):
+        response_cache.clear()
+        self.sample_book_data = {
+            'id': 'abc123',
+            'volumeInfo': {'title': 'Test Book', 'authors': ['Test Author']}
+        }
+
+    @patch('books.services.http_session.get')
+    def test_search_is_cached_by_normalized_query(self, mock_get):
+        mock_get.return_value.json.return_value = {'items': [self.sample_book_data]}
+
+        first = GoogleBooksService.search_books('Test  Book', 10)
+        second = GoogleBooksService.search_books('test book', 10)
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(GoogleBooksService.cache_stats()['hits'], 1)
+
+    @patch('books.services.http_session.get')
+    def test_max_results_is_part_of_the_key(self, mock_get):
+        mock_get.return_value.json.return_value = {'items': [self.sample_book_data]}
+
+        GoogleBooksService.search_books('test', 10)
+        GoogleBooksService.search_books('test', 20)
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('books.services.http_session.get')
+    def test_failed_requests_are_not_cached(self, mock_get):
+        mock_get.return_value.raise_for_status.side_effect = requests.RequestException('boom')
+
+        self.assertEqual(GoogleBooksService.search_books('test'), [])
+        self.assertEqual(GoogleBooksService.search_books('test'), [])
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('books.services.http_session.get')
+    def test_cached_results_are_copies(self, mock_get):
+        mock_get.return_value.json.return_value = self.sample_book_data
+
+        book_data = GoogleBooksService.get_book_by_id('abc123')
+        book_data['title'] = 'Changed'
+
+        self.assertEqual(GoogleBooksService.get_book_by_id('abc123')['title'], 'Test Book')
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_cache_stats_endpoint_requires_admin(self):
+        client = APIClient()
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        client.force_authenticate(user=user)
+        response = client.get('/api/books/google_books_cache_stats/')
+        self.assertEqual(response.status_code, 403)
+
+        user.is_staff = True
+        user.save()
+        response = client.get('/api/books/google_books_cache_stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hits', response.data)
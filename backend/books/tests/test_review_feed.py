@@ -0,0 +1,131 @@
+# backend/books/tests/test_review_feed.py
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from books.models import Book, UserBook, Review, ReviewFeedEntry
+from books.review_feed import sync_reviews, update_books
+
+class ReviewFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.book = Book.objects.create(
+            google_books_id='test123', title='Test Book', authors=['Ann Author'],
+            thumbnail_url='http://books.google.com/cover.jpg'
+        )
+        self.other_book = Book.objects.create(google_books_id='test456', title='Other Book', authors=['Bo Writer'])
+        self.user_book = UserBook.objects.create(user=self.user, book=self.book, status='read', rating=4)
+        self.other_user_book = UserBook.objects.create(user=self.other, book=self.other_book, status='read')
+
+    def feed(self, **params):
+        response = self.client.get('/api/reviews/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_public_reviews_are_listed_with_inline_details(self):
+        review = Review.objects.create(user_book=self.user_book, content='Great', is_public=True)
+        Review.objects.create(user_book=self.other_user_book, content='Secret')
+
+        [item] = self.feed()
+        self.assertEqual(item['id'], review.id)
+        self.assertEqual(item['user_book'], self.user_book.id)
+        self.assertEqual(item['book'], self.book.id)
+        self.assertEqual(item['username'], 'testuser')
+        self.assertEqual(item['book_title'], 'Test Book')
+        self.assertEqual(item['book_thumbnail_url'], 'http://books.google.com/cover.jpg')
+        self.assertEqual(item['rating'], 4)
+        self.assertEqual(item['content'], 'Great')
+        self.assertTrue(item['is_public'])
+
+    def test_visibility_changes_and_deletes_update_the_feed(self):
+        response = self.client.post(
+            '/api/reviews/', {'user_book': self.user_book.id, 'content': 'Draft'}, format='json'
+        )
+        review_id = response.json()['id']
+        self.assertEqual(self.feed(), [])
+
+        self.client.patch(f'/api/reviews/{review_id}/', {'is_public': True, 'content': 'Final'}, format='json')
+        self.assertEqual([item['content'] for item in self.feed()], ['Final'])
+
+        self.client.patch(f'/api/reviews/{review_id}/', {'is_public': False}, format='json')
+        self.assertEqual(self.feed(), [])
+
+        self.client.patch(f'/api/reviews/{review_id}/', {'is_public': True}, format='json')
+        self.client.delete(f'/api/reviews/{review_id}/')
+        self.assertEqual(self.feed(), [])
+        self.assertFalse(ReviewFeedEntry.objects.exists())
+
+    def test_denormalized_fields_follow_their_sources(self):
+        Review.objects.create(user_book=self.user_book, content='Great', is_public=True)
+        self.feed()
+
+        self.user_book.rating = 2
+        self.user_book.save()
+        self.book.title = 'Renamed'
+        self.book.save()
+        self.user.username = 'renamed'
+        self.user.save()
+
+        [item] = self.feed()
+        self.assertEqual((item['rating'], item['book_title'], item['username']), (2, 'Renamed', 'renamed'))
+
+    def test_deleting_the_user_book_removes_its_entries(self):
+        Review.objects.create(user_book=self.user_book, content='Great', is_public=True)
+        self.user_book.delete()
+        self.assertEqual(self.feed(), [])
+
+    def test_filters(self):
+        mine = Review.objects.create(user_book=self.user_book, content='Mine', is_public=True)
+        theirs = Review.objects.create(user_book=self.other_user_book, content='Theirs', is_public=True)
+
+        self.assertEqual([item['id'] for item in self.feed(book=self.book.id)], [mine.id])
+        self.assertEqual([item['id'] for item in self.feed(author='Bo Writer')], [theirs.id])
+        self.assertEqual([item['id'] for item in self.feed(user='other')], [theirs.id])
+        self.assertEqual(self.feed(book='abc'), [])
+        self.assertEqual(self.feed(user='nobody'), [])
+
+    def test_filtered_feed_reads_only_feed_columns(self):
+        Review.objects.create(user_book=self.other_user_book, content='Theirs', is_public=True)
+
+        for params in ({'author': 'Bo Writer'}, {'user': 'other'}, {'author': 'Bo Writer', 'user': 'other'}):
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(len(self.feed(**params)), 1)
+            [feed_query] = [query['sql'] for query in queries if 'books_reviewfeedentry' in query['sql']]
+            self.assertNotIn('JOIN', feed_query, params)
+
+    def test_keyset_pagination_walks_the_whole_feed(self):
+        reviews = [
+            Review.objects.create(user_book=self.user_book, content=f'Review {n}', is_public=True)
+            for n in range(5)
+        ]
+        seen = []
+        url = '/api/reviews/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            data = response.json()
+            seen.extend(item['id'] for item in data['results'])
+            url = data['next']
+        self.assertEqual(seen, [review.id for review in reversed(reviews)])
+
+    def test_bulk_helpers(self):
+        reviews = Review.objects.bulk_create([
+            Review(user_book=self.user_book, content='Public', is_public=True),
+            Review(user_book=self.other_user_book, content='Private'),
+        ])
+        sync_reviews(reviews)
+        self.assertEqual(list(ReviewFeedEntry.objects.values_list('content', flat=True)), ['Public'])
+
+        Book.objects.filter(pk=self.book.pk).update(title='Bulk renamed')
+        self.book.refresh_from_db()
+        update_books([self.book, self.other_book])
+        self.assertEqual(ReviewFeedEntry.objects.get().book_title, 'Bulk renamed')
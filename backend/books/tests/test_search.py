@@ -0,0 +1,83 @@
+# backend/books/tests/test_search.py
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from books.models import Book
+from books.search import search_books, get_search_backend
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.dune = Book.objects.create(
+            google_books_id='dune',
+            title='Dune',
+            authors=['Frank Herbert'],
+            categories=['Science Fiction'],
+            description='A desert planet and its spice.'
+        )
+        self.guide = Book.objects.create(
+            google_books_id='guide',
+            title='Field Guide to Deserts',
+            authors=['Jane Doe'],
+            categories=['Nature'],
+            description='Plants and animals of the dune landscape.'
+        )
+        self.other = Book.objects.create(
+            google_books_id='other',
+            title='Cooking at Home',
+            authors=['Chef Example'],
+            categories=['Cooking'],
+            description='Recipes.'
+        )
+
+    def test_title_matches_rank_above_description_matches(self):
+        books, total = search_books('dune')
+        self.assertEqual(total, 2)
+        self.assertEqual(books, [self.dune, self.guide])
+
+    def test_searches_authors_and_categories(self):
+        self.assertEqual(search_books('herbert')[0], [self.dune])
+        self.assertEqual(search_books('cooking')[0], [self.other])
+
+    def test_last_term_is_a_prefix_match(self):
+        self.assertEqual(search_books('frank herb')[0], [self.dune])
+
+    def test_query_syntax_is_escaped(self):
+        books, total = search_books('dune" OR "cooking')
+        self.assertEqual(total, 0)
+        self.assertEqual(search_books('"*()')[1], 0)
+
+    def test_index_follows_save_and_delete(self):
+        self.other.title = 'Dune Cookbook'
+        self.other.save()
+        self.assertIn(self.other, search_books('dune')[0])
+
+        self.dune.delete()
+        self.assertNotIn('dune', [book.google_books_id for book in search_books('dune')[0]])
+
+    def test_rebuild_reindexes_catalog(self):
+        get_search_backend().rebuild()
+        self.assertEqual(search_books('dune')[1], 2)
+
+    def test_search_endpoint_is_paginated(self):
+        response = self.client.get('/api/books/search/', {'q': 'dune', 'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([book['title'] for book in response.data['results']], ['Dune'])
+
+        response = self.client.get('/api/books/search/', {'q': 'dune', 'page_size': 1, 'page': 2})
+        self.assertEqual(
+            [book['title'] for book in response.data['results']],
+            ['Field Guide to Deserts']
+        )
+
+    def test_search_endpoint_requires_query(self):
+        response = self.client.get('/api/books/search/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
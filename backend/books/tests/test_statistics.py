@@ -0,0 +1,124 @@
+# backend/books/tests/test_statistics.py
+import io
+from datetime import timedelta
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from books.models import Book, UserBook, ReadingSession, ReadingStatistics
+from books.statistics import get_statistics, rebuild_statistics, statistics_payload
+
+STAT_FIELDS = (
+    'total_books', 'want_to_read_count', 'reading_count', 'read_count',
+    'rating_count', 'rating_sum', 'session_count', 'pages_read',
+    'reading_seconds', 'daily_activity', 'genre_counts',
+)
+
+class ReadingStatisticsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.fiction = Book.objects.create(
+            google_books_id='fiction', title='Fiction Book', authors=[], categories=['Fiction']
+        )
+        self.history = Book.objects.create(
+            google_books_id='history', title='History Book', authors=[], categories=['History', 'Fiction']
+        )
+
+    def add_session(self, user_book, pages, days_ago=0, minutes=30):
+        end = timezone.now() - timedelta(days=days_ago)
+        return ReadingSession.objects.create(
+            user_book=user_book, start_page=0, end_page=pages,
+            start_time=end - timedelta(minutes=minutes), end_time=end
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = ReadingStatistics.objects.get(user=self.user)
+        rebuilt = rebuild_statistics(self.user)
+        for field in STAT_FIELDS:
+            self.assertEqual(getattr(incremental, field), getattr(rebuilt, field), field)
+
+    def test_incremental_updates_match_rebuild(self):
+        fiction = UserBook.objects.create(user=self.user, book=self.fiction, status='reading')
+        history = UserBook.objects.create(user=self.user, book=self.history, status='want_to_read')
+        self.assertMatchesRebuild()
+
+        fiction.status = 'read'
+        fiction.rating = 4
+        fiction.save()
+        history.rating = 2
+        history.save()
+        self.assertMatchesRebuild()
+
+        first = self.add_session(fiction, 20)
+        second = self.add_session(fiction, 10, days_ago=1)
+        self.add_session(history, 5, days_ago=1)
+        self.assertMatchesRebuild()
+
+        first.end_page = 50
+        first.save()
+        second.delete()
+        self.assertMatchesRebuild()
+
+        history.delete()
+        self.assertMatchesRebuild()
+
+        stats = ReadingStatistics.objects.get(user=self.user)
+        self.assertEqual(stats.total_books, 1)
+        self.assertEqual(stats.pages_read, 50)
+        self.assertEqual(stats.genre_counts, {'Fiction': 1})
+
+    def test_other_users_are_not_affected(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        UserBook.objects.create(user=other, book=self.fiction, status='reading')
+
+        self.assertEqual(ReadingStatistics.objects.get(user=self.user).total_books, 0)
+        self.assertEqual(ReadingStatistics.objects.get(user=other).total_books, 1)
+
+    def test_streaks_and_velocity(self):
+        user_book = UserBook.objects.create(user=self.user, book=self.fiction, status='reading')
+        for days_ago in (0, 1, 2, 5, 6):
+            self.add_session(user_book, 14, days_ago=days_ago)
+
+        payload = statistics_payload(get_statistics(self.user))
+
+        self.assertEqual(payload['streaks'], {'current': 3, 'longest': 3})
+        self.assertEqual(payload['reading_velocity']['pages_per_day_7d'], 10.0)
+        self.assertEqual(sum(week['sessions'] for week in payload['reading_velocity']['weekly']), 5)
+
+    def test_endpoint_keeps_original_fields(self):
+        UserBook.objects.create(user=self.user, book=self.fiction, status='reading', rating=5)
+        UserBook.objects.create(user=self.user, book=self.history, status='read', rating=3)
+
+        response = self.client.get('/api/userbooks/statistics/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_books'], 2)
+        self.assertEqual(response.data['currently_reading'], 1)
+        self.assertEqual(response.data['average_rating'], {'rating__avg': 4.0})
+        self.assertEqual(
+            sorted((row['status'], row['count']) for row in response.data['books_by_status']),
+            [('read', 1), ('reading', 1)]
+        )
+        self.assertEqual(response.data['genres'], {'Fiction': 2, 'History': 1})
+
+    def test_missing_row_is_built_on_first_read(self):
+        UserBook.objects.create(user=self.user, book=self.fiction, status='reading')
+        ReadingStatistics.objects.filter(user=self.user).delete()
+
+        self.assertEqual(get_statistics(self.user).total_books, 1)
+
+    def test_rebuild_command(self):
+        UserBook.objects.create(user=self.user, book=self.fiction, status='reading')
+        ReadingStatistics.objects.filter(user=self.user).update(total_books=99)
+
+        out = io.StringIO()
+        call_command('rebuild_reading_stats', 'testuser', stdout=out)
+
+        self.assertEqual(ReadingStatistics.objects.get(user=self.user).total_books, 1)
+        self.assertIn('1 users', out.getvalue())
@@ -0,0 +1,87 @@
+# backend/books/tests/test_taxonomy.py
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from books.models import Author, Book, Category
+from books.services import GoogleBooksService
+from books.taxonomy import sync_book_taxonomy
+
+class TaxonomyTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.dune = Book.objects.create(
+            google_books_id='dune', title='Dune', authors=['Frank Herbert'],
+            categories=['Fiction', 'Science Fiction'], language='en'
+        )
+        self.children = Book.objects.create(
+            google_books_id='children', title='Children of Dune', authors=['Frank Herbert'],
+            categories=['Fiction'], language='en'
+        )
+        self.essays = Book.objects.create(
+            google_books_id='essays', title='Essais', authors=['Michel de Montaigne'],
+            categories=['Philosophy'], language='fr'
+        )
+
+    def test_saving_a_book_syncs_normalized_links(self):
+        self.assertEqual(
+            list(Author.objects.get(name='Frank Herbert').books.order_by('id')),
+            [self.dune, self.children]
+        )
+
+        self.dune.categories = ['Classics']
+        self.dune.save()
+
+        self.assertEqual(
+            list(self.dune.normalized_categories.values_list('name', flat=True)),
+            ['Classics']
+        )
+        self.assertNotIn(self.dune, Category.objects.get(name='Fiction').books.all())
+
+    def test_ingest_writes_normalized_links(self):
+        GoogleBooksService.create_or_update_book({
+            'google_books_id': 'new', 'title': 'New', 'authors': ['New Author'], 'categories': ['Poetry']
+        })
+        GoogleBooksService.bulk_upsert_books([
+            {'google_books_id': 'bulk', 'title': 'Bulk', 'authors': ['New Author'], 'categories': []}
+        ])
+
+        self.assertEqual(Author.objects.get(name='New Author').books.count(), 2)
+        self.assertTrue(Category.objects.filter(name='Poetry').exists())
+
+    def test_sync_is_constant_queries(self):
+        books = list(Book.objects.all())
+        with CaptureQueriesContext(connection) as small:
+            sync_book_taxonomy(books[:1])
+        with CaptureQueriesContext(connection) as large:
+            sync_book_taxonomy(books)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_filter_books_by_author_and_category(self):
+        response = self.client.get('/api/books/', {'author': 'Frank Herbert', 'category': 'Science Fiction'})
+        self.assertEqual([book['title'] for book in response.data['results']], ['Dune'])
+
+    def test_book_serializer_output_is_unchanged(self):
+        response = self.client.get(f'/api/books/{self.dune.id}/')
+        self.assertNotIn('normalized_authors', response.data)
+        self.assertEqual(response.data['authors'], ['Frank Herbert'])
+
+    def test_facets(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/books/facets/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['categories'][0], {'name': 'Fiction', 'count': 2})
+        self.assertEqual(response.data['authors'][0], {'name': 'Frank Herbert', 'count': 2})
+        self.assertEqual(
+            response.data['languages'],
+            [{'name': 'en', 'count': 2}, {'name': 'fr', 'count': 1}]
+        )
+        self.assertEqual(len(context.captured_queries), 3)
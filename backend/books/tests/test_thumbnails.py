@@ -0,0 +1,146 @@
+# backend/books/tests/test_thumbnails.py
+import os
+import shutil
+import tempfile
+import time
+import requests
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from unittest.mock import MagicMock, patch
+from books.jobs import Worker
+from books.models import Book, Job
+from books.thumbnails import ThumbnailCache, get_thumbnail, get_thumbnail_cache
+
+COVER_URL = 'http://books.google.com/books/content?id=abc123&printsec=frontcover&img=1'
+
+def image_response(content=b'\x89PNG cover', content_type='image/png', status_code=200):
+    response = MagicMock(status_code=status_code, headers={'Content-Type': content_type}, is_redirect=False)
+    response.iter_content.return_value = [content]
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(str(status_code))
+    return response
+
+def redirect_response(location):
+    return MagicMock(status_code=302, headers={'Location': location}, is_redirect=True)
+
+class ThumbnailCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_identical_images_share_one_blob(self):
+        cache = ThumbnailCache(self.directory)
+        first = cache.put('http://a/1', b'same', 'image/png')
+        second = cache.put('http://a/2', b'same', 'image/png')
+
+        self.assertEqual(first.path, second.path)
+        self.assertEqual(cache.size(), 4)
+        self.assertEqual(cache.get('http://a/2').digest, first.digest)
+
+    def test_least_recently_used_blobs_are_evicted(self):
+        cache = ThumbnailCache(self.directory, max_bytes=25)
+        old = cache.put('http://a/old', b'o' * 10, 'image/png')
+        recent = cache.put('http://a/recent', b'r' * 10, 'image/png')
+        past = time.time() - 100
+        os.utime(old.path, (past, past))
+        os.utime(recent.path, (past - 100, past - 100))
+        cache.get('http://a/recent')
+
+        cache.put('http://a/new', b'n' * 10, 'image/png')
+
+        self.assertIsNone(cache.get('http://a/old'))
+        self.assertIsNotNone(cache.get('http://a/recent'))
+        self.assertIsNotNone(cache.get('http://a/new'))
+        self.assertLessEqual(cache.size(), 25)
+
+class ThumbnailProxyTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        settings_override = override_settings(THUMBNAIL_CACHE_DIR=self.directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.book = Book.objects.create(
+            google_books_id='abc123', title='Test Book', authors=[], thumbnail_url=COVER_URL
+        )
+
+    @patch('books.thumbnails.http_session.get', return_value=image_response())
+    def test_serves_cached_image_with_cache_headers(self, mock_get):
+        url = f'/api/books/{self.book.id}/thumbnail/'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'\x89PNG cover')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertIn('max-age=604800', response['Cache-Control'])
+        self.assertIn('public', response['Cache-Control'])
+        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+        self.assertEqual(response['Content-Security-Policy'], "default-src 'none'")
+
+        again = self.client.get(url)
+        self.assertEqual(again['ETag'], response['ETag'])
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('books.thumbnails.http_session.get', return_value=image_response())
+    def test_conditional_requests_get_not_modified(self, mock_get):
+        url = f'/api/books/{self.book.id}/thumbnail/'
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    @patch('books.thumbnails.http_session.get')
+    def test_other_hosts_and_non_images_are_refused(self, mock_get):
+        mock_get.return_value = image_response(b'<html>', 'text/html')
+        self.assertIsNone(get_thumbnail(COVER_URL))
+        mock_get.return_value = image_response(b'<svg onload="alert(1)"/>', 'image/svg+xml')
+        self.assertIsNone(get_thumbnail(COVER_URL))
+
+        self.book.thumbnail_url = 'http://169.254.169.254/latest/meta-data'
+        self.book.save()
+        response = self.client.get(f'/api/books/{self.book.id}/thumbnail/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('books.thumbnails.http_session.get')
+    def test_redirects_are_only_followed_to_allowed_hosts(self, mock_get):
+        mock_get.side_effect = [redirect_response('https://books.google.com/cover.png'), image_response()]
+        self.assertIsNotNone(get_thumbnail(COVER_URL))
+        self.assertEqual(mock_get.call_args.args[0], 'https://books.google.com/cover.png')
+        self.assertFalse(mock_get.call_args.kwargs['allow_redirects'])
+
+        get_thumbnail_cache().clear()
+        mock_get.reset_mock()
+        mock_get.side_effect = [redirect_response('http://169.254.169.254/latest/meta-data'), image_response()]
+        self.assertIsNone(get_thumbnail(COVER_URL))
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('books.thumbnails.http_session.get', return_value=image_response())
+    def test_add_to_collection_prefetches_in_background(self, mock_get):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            f'/api/books/{self.book.id}/add_to_collection/', {'status': 'reading'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], 'reading')
+        mock_get.assert_not_called()
+        self.assertTrue(Job.objects.filter(kind='fetch_thumbnail', status='queued').exists())
+
+        Worker(concurrency=1).run_pending()
+        self.assertIsNotNone(get_thumbnail_cache().get(COVER_URL))
+        self.assertEqual(Job.objects.get(kind='fetch_thumbnail').status, 'succeeded')
+
+    @patch('books.thumbnails.http_session.get', return_value=image_response(status_code=503))
+    def test_failed_prefetch_is_retried(self, mock_get):
+        self.client.force_authenticate(user=self.user)
+        self.client.post(f'/api/books/{self.book.id}/add_to_collection/', {}, format='json')
+
+        Worker(concurrency=1).run_pending()
+        job = Job.objects.get(kind='fetch_thumbnail')
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
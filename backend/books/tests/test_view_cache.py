@@ -0,0 +1,94 @@
+# backend/books/tests/test_view_cache.py
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from books.models import Book, Shelf, UserBook, Review, Note
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.other_client = APIClient()
+        self.other_client.force_authenticate(user=self.other)
+
+        self.book = Book.objects.create(google_books_id='test123', title='Test Book', authors=[])
+        self.shelf = Shelf.objects.create(user=self.user, name='Favourites')
+        self.user_book = UserBook.objects.create(user=self.user, book=self.book, status='reading')
+        self.user_book.shelves.add(self.shelf)
+
+    def get(self, url, client=None):
+        with CaptureQueriesContext(connection) as context:
+            response = (client or self.client).get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(context.captured_queries)
+
+    def test_repeated_reads_skip_the_database(self):
+        for url in ('/api/userbooks/', f'/api/shelves/{self.shelf.id}/books/', '/api/reviews/'):
+            first, _ = self.get(url)
+            second, queries = self.get(url)
+            self.assertEqual(first, second)
+            # Only the ETag's version lookup remains
+            self.assertLessEqual(queries, 1, url)
+
+    def test_query_string_is_part_of_the_key(self):
+        other_book = Book.objects.create(google_books_id='other', title='Other Book', authors=[])
+        UserBook.objects.create(user=self.user, book=other_book)
+
+        full, _ = self.get('/api/userbooks/')
+        page, _ = self.get('/api/userbooks/?page_size=1')
+
+        self.assertEqual(len(full['results']), 2)
+        self.assertEqual(len(page['results']), 1)
+
+    def test_writes_invalidate_the_owner(self):
+        self.get('/api/userbooks/')
+        self.client.post(f'/api/userbooks/{self.user_book.id}/update_progress/', {'current_page': 42})
+
+        data, _ = self.get('/api/userbooks/')
+        self.assertEqual(data['results'][0]['current_page'], 42)
+
+        self.get(f'/api/shelves/{self.shelf.id}/books/')
+        self.user_book.shelves.remove(self.shelf)
+        data, _ = self.get(f'/api/shelves/{self.shelf.id}/books/')
+        self.assertEqual(data['results'], [])
+
+    def test_child_rows_invalidate_the_owner(self):
+        self.get('/api/notes/')
+        Note.objects.create(user_book=self.user_book, content='Note')
+        data, _ = self.get('/api/notes/')
+        self.assertEqual(len(data['results']), 1)
+
+    def test_book_changes_invalidate_owners(self):
+        self.get('/api/userbooks/')
+        self.book.title = 'Renamed'
+        self.book.save()
+        data, _ = self.get('/api/userbooks/')
+        self.assertEqual(data['results'][0]['book_details']['title'], 'Renamed')
+
+    def test_responses_never_cross_users(self):
+        mine, _ = self.get('/api/userbooks/')
+        theirs, _ = self.get('/api/userbooks/', self.other_client)
+
+        self.assertEqual(len(mine['results']), 1)
+        self.assertEqual(theirs['results'], [])
+
+    def test_public_reviews_are_invalidated_for_everyone(self):
+        self.get('/api/reviews/', self.other_client)
+        review = Review.objects.create(user_book=self.user_book, content='Great', is_public=True)
+
+        data, _ = self.get('/api/reviews/', self.other_client)
+        self.assertEqual([row['id'] for row in data['results']], [review.id])
+
+        review.is_public = False
+        review.save()
+        data, _ = self.get('/api/reviews/', self.other_client)
+        self.assertEqual(data['results'], [])
@@ -0,0 +1,212 @@
+# backend/books/thumbnails.py
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import namedtuple
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urljoin, urlsplit
+import requests
+from django.conf import settings
+from .instrumentation import UPSTREAM, timed
+from .resilience import SingleFlight
+from .services import http_session
+
+logger = logging.getLogger(__name__)
+
+Thumbnail = namedtuple('Thumbnail', ['path', 'digest', 'content_type', 'size'])
+
+# Raster formats only: an SVG can carry scripts
+IMAGE_TYPES = ('image/jpeg', 'image/png', 'image/gif', 'image/webp')
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class ThumbnailCache:
+    """
+    On-disk image cache. Images are stored once per content hash under
+    blobs/, with a small index file per source URL pointing at its blob, so
+    identical images (such as Google's "no cover" placeholder) share one
+    file. Blob modification times double as LRU timestamps: reads touch
+    them, and once the cache grows past max_bytes the least recently used
+    blobs are removed until it is 10% under the limit.
+    """
+
+    def __init__(self, directory, max_bytes: int = 200 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.directory / 'blobs' / digest[:2] / digest
+
+    def _index_path(self, url: str) -> Path:
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return self.directory / 'urls' / key[:2] / key
+
+    def get(self, url: str) -> Optional[Thumbnail]:
+        index_path = self._index_path(url)
+        try:
+            entry = json.loads(index_path.read_text())
+            path = self._blob_path(entry['digest'])
+            os.utime(path)
+            size = path.stat().st_size
+        except FileNotFoundError:
+            # No entry, or its blob was evicted
+            index_path.unlink(missing_ok=True)
+            return None
+        except (ValueError, KeyError):
+            index_path.unlink(missing_ok=True)
+            return None
+        return Thumbnail(path, entry['digest'], entry['content_type'], size)
+
+    def put(self, url: str, content: bytes, content_type: str) -> Thumbnail:
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(digest)
+        added = 0
+        if path.exists():
+            os.utime(path)
+        else:
+            _write_atomic(path, content)
+            added = len(content)
+        _write_atomic(
+            self._index_path(url),
+            json.dumps({'digest': digest, 'content_type': content_type}).encode()
+        )
+        if added:
+            self._grow(added)
+        return Thumbnail(path, digest, content_type, len(content))
+
+    def _blobs(self):
+        for path in (self.directory / 'blobs').glob('*/*'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield stat.st_mtime, stat.st_size, path
+
+    def _grow(self, added: int) -> None:
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._blobs())
+            else:
+                self._size += added
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Rescan: other processes may share the directory
+        blobs = sorted(self._blobs())
+        total = sum(size for _, size, _ in blobs)
+        target = self.max_bytes * 0.9
+        for _, size, path in blobs:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._size = total
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._blobs())
+
+    def clear(self) -> None:
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self._size = None
+
+
+_caches = {}
+_in_flight = SingleFlight()
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    directory = str(settings.THUMBNAIL_CACHE_DIR)
+    max_bytes = getattr(settings, 'THUMBNAIL_CACHE_MAX_BYTES', 200 * 1024 * 1024)
+    cache = _caches.get((directory, max_bytes))
+    if cache is None:
+        cache = _caches[(directory, max_bytes)] = ThumbnailCache(directory, max_bytes)
+    return cache
+
+
+def is_allowed_url(url: str) -> bool:
+    """
+    Only images from the configured hosts are fetched, so the proxy can't be
+    pointed at arbitrary (or internal) addresses.
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    return parts.scheme in ('http', 'https') and any(
+        host == allowed or host.endswith(f'.{allowed}')
+        for allowed in getattr(settings, 'THUMBNAIL_ALLOWED_HOSTS', ())
+    )
+
+
+def _download(url: str) -> Optional[Thumbnail]:
+    max_bytes = getattr(settings, 'THUMBNAIL_MAX_IMAGE_BYTES', 2 * 1024 * 1024)
+    location = url
+    try:
+        # Redirects are followed by hand so every hop is checked against
+        # THUMBNAIL_ALLOWED_HOSTS, not just the first
+        for _ in range(getattr(settings, 'THUMBNAIL_MAX_REDIRECTS', 3) + 1):
+            with timed(UPSTREAM):
+                response = http_session.get(
+                    location, timeout=getattr(settings, 'THUMBNAIL_HTTP_TIMEOUT', 10), stream=True,
+                    allow_redirects=False
+                )
+            if not response.is_redirect:
+                break
+            response.close()
+            location = urljoin(location, response.headers['Location'])
+            if not is_allowed_url(location):
+                logger.warning('Error fetching thumbnail %s: redirected to %s', url, location)
+                return None
+        else:
+            logger.warning('Error fetching thumbnail %s: too many redirects', url)
+            return None
+        with response:
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if content_type not in IMAGE_TYPES:
+                logger.warning('Error fetching thumbnail %s: not an image (%s)', url, content_type)
+                return None
+            chunks = []
+            received = 0
+            for chunk in response.iter_content(64 * 1024):
+                chunks.append(chunk)
+                received += len(chunk)
+                if received > max_bytes:
+                    logger.warning('Error fetching thumbnail %s: larger than %s bytes', url, max_bytes)
+                    return None
+    except requests.RequestException as e:
+        logger.warning('Error fetching thumbnail %s: %s', url, e)
+        return None
+    return get_thumbnail_cache().put(url, b''.join(chunks), content_type)
+
+
+def get_thumbnail(url: str) -> Optional[Thumbnail]:
+    """
+    The cached image for `url`, downloading it on a miss. Concurrent misses
+    for the same URL share one download. None if the URL isn't allowed or
+    the download failed.
+    """
+    if not url or not is_allowed_url(url):
+        return None
+    cached = get_thumbnail_cache().get(url)
+    if cached is not None:
+        return cached
+    return _in_flight.do(url, lambda: _download(url))
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BookViewSet, ShelfViewSet, UserBookViewSet, ReadingSessionViewSet, NoteViewSet, ReviewViewSet, QuoteViewSet  # Change this import
+from . import async_views, views
+from .views import BookViewSet, ShelfViewSet, UserBookViewSet, ReadingSessionViewSet, NoteViewSet, ReviewViewSet, QuoteViewSet, JobViewSet  # Change this import
 
 router = DefaultRouter()
 router.register(r'books', BookViewSet)
@@ -10,7 +11,12 @@ router.register(r'reading-sessions', ReadingSessionViewSet, basename='readingses
 router.register(r'notes', NoteViewSet, basename='note')
 router.register(r'reviews', ReviewViewSet, basename='review')
 router.register(r'quotes', QuoteViewSet, basename='quote')
+router.register(r'jobs', JobViewSet, basename='job')
 
 urlpatterns = [
+    path('async/books/search_google_books/', async_views.search_google_books),
+    path('async/books/fetch/', async_views.fetch_google_books),
+    path('metrics/', views.metrics),
+    path('metrics/slow/', views.slow_requests),
     path('', include(router.urls)),
 ]
\ No newline at end of file
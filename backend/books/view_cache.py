@@ -0,0 +1,94 @@
+# backend/books/view_cache.py
+import hashlib
+import uuid
+from functools import wraps
+from typing import Iterable
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+KEY_PREFIX = 'books:views'
+# Scope shared by everyone who can see the public review feed
+PUBLIC_REVIEWS = 'public-reviews'
+
+
+def _cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _generation_key(scope: str) -> str:
+    return f'{KEY_PREFIX}:generation:{scope}'
+
+
+def _user_scope(user_id: int) -> str:
+    return f'user:{user_id}'
+
+
+def _generations(scopes) -> list:
+    """
+    Current generation token of each scope. Invalidating a scope deletes its
+    token, which orphans every response cached under the old one.
+    """
+    cache = _cache()
+    keys = [_generation_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, uuid.uuid4().hex, None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def _invalidate(scopes) -> None:
+    keys = [_generation_key(scope) for scope in scopes]
+    if not keys:
+        return
+    _cache().delete_many(keys)
+    # Again once the write is visible, so a request that read the old rows
+    # in the meantime can't have cached them under the new generation
+    transaction.on_commit(lambda: _cache().delete_many(keys))
+
+
+def invalidate_users(user_ids: Iterable[int]) -> None:
+    _invalidate([_user_scope(user_id) for user_id in set(user_ids)])
+
+
+def invalidate_public_reviews() -> None:
+    _invalidate([PUBLIC_REVIEWS])
+
+
+def cache_response(*scopes):
+    """
+    Viewset method decorator caching the rendered response per user and full
+    path (including the query string). `scopes` names shared data the
+    response also depends on, such as PUBLIC_REVIEWS.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if not request.user.is_authenticated:
+                return view_method(self, request, *args, **kwargs)
+
+            generations = _generations([_user_scope(request.user.pk), *scopes])
+            digest = hashlib.sha1(':'.join([
+                *generations, request.get_full_path(), request.META.get('HTTP_ACCEPT', '')
+            ]).encode()).hexdigest()
+            key = f'{KEY_PREFIX}:response:{request.user.pk}:{digest}'
+
+            cache = _cache()
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                timeout = getattr(settings, 'RESPONSE_CACHE_TTL', 300)
+
+                def store(rendered):
+                    cache.set(key, (rendered.content, rendered['Content-Type']), timeout)
+                response.add_post_render_callback(store)
+            return response
+        return wrapper
+    return decorator
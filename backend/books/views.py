@@ -1,24 +1,88 @@
 # books/views.py
+import hmac
+from itertools import islice
 from rest_framework import viewsets, permissions, status, filters
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Count, Avg
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from .models import Book, Shelf, UserBook, ReadingSession, Note, Review, Quote
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from .models import (
+    Book, Shelf, UserBook, ReadingSession, Note, Review, ReviewFeedEntry, Quote, LibraryImport, Job
+)
 from .serializers import (
     BookSerializer, ShelfSerializer, UserBookSerializer,
-    ReadingSessionSerializer, NoteSerializer, ReviewSerializer,
-    QuoteSerializer
+    ReadingSessionSerializer, NoteSerializer, ReviewSerializer, ReviewFeedEntrySerializer,
+    QuoteSerializer, LibraryImportSerializer, JobSerializer, ClientTimestampSerializer,
+    BulkImportSerializer
 )
 from .services import GoogleBooksService  # Add this line
+from .search import search_books, hybrid_search
+from .statistics import get_statistics, statistics_payload
+from .versioning import ConditionalGetMixin, conditional, statistics_etag
+from .db_routers import ReplicaReadMixin
+from .view_cache import PUBLIC_REVIEWS, cache_response
+from .fast_serializers import FastListMixin, get_plan
+from .exporting import CSV, NDJSON, export_stream
+from .library_import import IMPORT_FORMATS, guess_import_format, run_import
+from .jobs import enqueue
+from .instrumentation import PROMETHEUS_CONTENT_TYPE, registry
+from .thumbnails import get_thumbnail, get_thumbnail_cache, is_allowed_url
+from .sync import sync_progress as apply_progress_updates
+from .taxonomy import facet_counts
+from .importers import (
+    GOOGLE_BOOKS_ID, ISBN, guess_file_format, import_books, parse_identifier_file,
+    read_uploaded_file, summarize
+)
+
+def with_user_book_relations(queryset):
+    """
+    Load the book and shelves rendered by UserBookSerializer up front, so
+    listing N user books costs a constant number of queries.
+    """
+    return queryset.select_related('book').prefetch_related('shelves')
 
-class BookViewSet(viewsets.ModelViewSet):
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
+class BookViewSet(ReplicaReadMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [permissions.IsAuthenticated]
+    replica_actions = ('list', 'retrieve', 'search', 'facets')
+    cursor_ordering = ('-id',)
     filter_backends = [filters.SearchFilter]
     search_fields = ['title', 'authors']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Exact-name filters over the normalized author/category tables
+        author = self.request.query_params.get('author')
+        if author:
+            queryset = queryset.filter(normalized_authors__name=author)
+        category = self.request.query_params.get('category')
+        if category:
+            queryset = queryset.filter(normalized_categories__name=category)
+        language = self.request.query_params.get('language')
+        if language:
+            queryset = queryset.filter(language=language)
+        return queryset
+
+    @action(detail=False)
+    def facets(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(facet_counts(limit))
+
     @action(detail=False, methods=['get'])
     def search_google_books(self, request):
         query = request.query_params.get('q', '')
@@ -30,21 +94,156 @@ class BookViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        books = GoogleBooksService.search_books(query, max_results)
+        # 'hybrid' answers from the local catalog first, 'remote' always
+        # proxies to Google Books
+        if request.query_params.get('source', 'hybrid') == 'remote':
+            books = GoogleBooksService.search_books(query, max_results)
+        else:
+            books = hybrid_search(query, max_results)
         return Response(books)
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked full-text search over title, authors, categories and
+        description of the local catalog.
+        """
+        query = request.query_params.get('q', '')
+        if not query:
+            return Response(
+                {'error': 'Search query is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = int(request.query_params.get('page_size', SEARCH_PAGE_SIZE))
+        except ValueError:
+            return Response(
+                {'error': 'page and page_size must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        page_size = min(max(page_size, 1), SEARCH_MAX_PAGE_SIZE)
+
+        books, total = search_books(query, limit=page_size, offset=(page - 1) * page_size)
+        return Response({
+            'count': total,
+            'page': page,
+            'page_size': page_size,
+            'results': BookSerializer(books, many=True).data
+        })
+
+    @action(detail=False, methods=['post'])
+    def bulk_import(self, request):
+        """
+        Import many books at once from lists of Google Books IDs and ISBNs,
+        or from an uploaded CSV/JSON-lines file.
+        """
+        options = BulkImportSerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        options = options.validated_data
+        identifiers = [(GOOGLE_BOOKS_ID, value) for value in options['google_books_ids']]
+        identifiers += [(ISBN, value) for value in options['isbns']]
+
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file:
+            file_format = options['format'] or guess_file_format(uploaded_file.name)
+            try:
+                # Stop reading one past the cap; the check below rejects the request
+                identifiers += islice(
+                    parse_identifier_file(read_uploaded_file(uploaded_file), file_format),
+                    max(settings.BULK_IMPORT_MAX_ITEMS + 1 - len(identifiers), 0)
+                )
+            except (ValueError, UnicodeDecodeError) as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not identifiers:
+            return Response(
+                {'error': 'google_books_ids, isbns or file is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(identifiers) > settings.BULK_IMPORT_MAX_ITEMS:
+            return Response(
+                {'error': f'At most {settings.BULK_IMPORT_MAX_ITEMS} books can be imported per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if options['background']:
+            # Hand the upstream calls to the job queue and answer right away
+            job = enqueue('import_books', {
+                'google_books_ids': [value for kind, value in identifiers if kind == GOOGLE_BOOKS_ID],
+                'isbns': [value for kind, value in identifiers if kind == ISBN],
+            }, user=request.user)
+            return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+        results = import_books(
+            identifiers,
+            batch_size=settings.BULK_IMPORT_BATCH_SIZE,
+            max_workers=settings.BULK_IMPORT_MAX_WORKERS
+        )
+        return Response(summarize(results))
+
+    @action(detail=True, methods=['post'])
+    def refresh(self, request, pk=None):
+        """
+        Queue a re-fetch of this book's metadata from Google Books.
+        """
+        book = self.get_object()
+        job = enqueue(
+            'refresh_book',
+            {'google_books_id': book.google_books_id},
+            user=request.user,
+            dedupe_key=book.google_books_id
+        )
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, permission_classes=[permissions.IsAdminUser])
+    def google_books_cache_stats(self, request):
+        return Response(GoogleBooksService.cache_stats())
+
+    @action(detail=True, permission_classes=[permissions.AllowAny], authentication_classes=[])
+    def thumbnail(self, request, pk=None):
+        """
+        The book's cover image, served from the local thumbnail cache. Public,
+        like the image itself, since <img> tags can't send the API token.
+        """
+        book = self.get_object()
+        thumbnail = get_thumbnail(book.thumbnail_url)
+        if thumbnail is None:
+            return Response({'error': 'No thumbnail available'}, status=status.HTTP_404_NOT_FOUND)
+
+        etag = f'"{thumbnail.digest}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            try:
+                image = open(thumbnail.path, 'rb')
+            except FileNotFoundError:
+                # Evicted since the lookup
+                return Response({'error': 'No thumbnail available'}, status=status.HTTP_404_NOT_FOUND)
+            response = FileResponse(image, content_type=thumbnail.content_type)
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=settings.THUMBNAIL_MAX_AGE)
+        # Never let a browser treat the upstream bytes as anything but an image
+        response['X-Content-Type-Options'] = 'nosniff'
+        response['Content-Security-Policy'] = "default-src 'none'"
+        return response
+
     @action(detail=True, methods=['post'])
     def add_to_collection(self, request, pk=None):
         book = self.get_object()
-        status = request.data.get('status', 'want_to_read')
+        reading_status = request.data.get('status', 'want_to_read')
         shelf_ids = request.data.get('shelf_ids', [])
 
         user_book = UserBook.objects.create(
             user=request.user,
             book=book,
-            status=status
+            status=reading_status
         )
 
+        # Warm the thumbnail cache before the library page asks for it
+        if is_allowed_url(book.thumbnail_url) and get_thumbnail_cache().get(book.thumbnail_url) is None:
+            enqueue('fetch_thumbnail', {'book_id': book.id}, dedupe_key=str(book.id))
+
         if shelf_ids:
             shelves = Shelf.objects.filter(
                 id__in=shelf_ids,
@@ -55,26 +254,32 @@ class BookViewSet(viewsets.ModelViewSet):
         serializer = UserBookSerializer(user_book)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-class ShelfViewSet(viewsets.ModelViewSet):
+class ShelfViewSet(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = ShelfSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         return Shelf.objects.filter(user=self.request.user)
 
     @action(detail=True)
+    @conditional()
+    @cache_response()
     def books(self, request, pk=None):
         shelf = self.get_object()
-        books = UserBook.objects.filter(shelves=shelf)
-        serializer = UserBookSerializer(books, many=True)
-        return Response(serializer.data)
+        books = with_user_book_relations(UserBook.objects.filter(shelves=shelf))
+        page = self.paginate_queryset(books)
+        return self.get_paginated_response(get_plan(UserBookSerializer).serialize_many(page))
 
-class UserBookViewSet(viewsets.ModelViewSet):
+class UserBookViewSet(ReplicaReadMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = UserBookSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-created_at', '-id')
+    replica_actions = ('statistics',)
 
     def get_queryset(self):
-        return UserBook.objects.filter(user=self.request.user)
+        queryset = UserBook.objects.filter(user=self.request.user)
+        return with_user_book_relations(queryset)
 
     @action(detail=True, methods=['post'])
     def update_progress(self, request, pk=None):
@@ -82,8 +287,25 @@ class UserBookViewSet(viewsets.ModelViewSet):
         current_page = request.data.get('current_page')
         
         if current_page is not None:
-            user_book.current_page = current_page
-            user_book.save()
+            timestamp_serializer = ClientTimestampSerializer(data=request.data)
+            timestamp_serializer.is_valid(raise_exception=True)
+            client_timestamp = timestamp_serializer.validated_data.get('client_timestamp')
+
+            with transaction.atomic():
+                # Same lock and comparison as sync_progress when the client
+                # sends its clock; without it the server clock is stored
+                progress_updated_at = UserBook.objects.select_for_update().values_list(
+                    'progress_updated_at', flat=True
+                ).get(pk=user_book.pk)
+                if client_timestamp and progress_updated_at and client_timestamp <= progress_updated_at:
+                    return Response(
+                        {'error': 'A newer progress update has already been applied'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                user_book.current_page = current_page
+                # Offline updates replayed later than this one must not win
+                user_book.progress_updated_at = client_timestamp or timezone.now()
+                user_book.save()
 
             # Create reading session
             if request.data.get('create_session'):
@@ -102,27 +324,114 @@ class UserBookViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(user_book)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'])
+    def sync_progress(self, request):
+        """
+        Apply a batch of progress updates and reading sessions recorded while
+        offline: {"updates": [{"user_book", "client_timestamp", "current_page",
+        "status", "session": {...}}, ...]}. Invalid entries are reported per
+        item and do not block the rest of the batch.
+        """
+        updates = request.data.get('updates') if isinstance(request.data, dict) else None
+        if not isinstance(updates, list) or not updates:
+            return Response(
+                {'error': 'updates must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(updates) > settings.PROGRESS_SYNC_MAX_ITEMS:
+            return Response(
+                {'error': f'At most {settings.PROGRESS_SYNC_MAX_ITEMS} updates can be synced per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = apply_progress_updates(request.user, updates)
+        return Response({
+            'applied': sum(1 for result in results if result.get('progress') == 'applied'),
+            'sessions_created': sum(1 for result in results if result.get('session') == 'created'),
+            'failed': sum(1 for result in results if 'errors' in result),
+            'results': results,
+        })
+
+    @action(detail=False, methods=['post'])
+    def import_library(self, request):
+        """
+        Import a Goodreads CSV export or one of our NDJSON exports, streamed
+        in chunks. Pass import_id with the same file to resume an import
+        that stopped part way.
+        """
+        uploaded_file = request.FILES.get('file')
+        if not uploaded_file:
+            return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        import_id = request.data.get('import_id')
+        if import_id:
+            library_import = get_object_or_404(LibraryImport, id=import_id, user=request.user)
+            if library_import.status == 'completed':
+                return Response(
+                    {'error': 'This import has already completed'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            library_import.status = 'running'
+        else:
+            file_format = request.data.get('file_format') or guess_import_format(uploaded_file.name)
+            if file_format not in IMPORT_FORMATS:
+                return Response(
+                    {'error': f'file_format must be one of {", ".join(IMPORT_FORMATS)}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            library_import = LibraryImport.objects.create(
+                user=request.user, file_format=file_format, file_name=uploaded_file.name[:255]
+            )
+
+        run_import(
+            library_import,
+            read_uploaded_file(uploaded_file),
+            chunk_size=settings.LIBRARY_IMPORT_CHUNK_SIZE,
+            max_workers=settings.BULK_IMPORT_MAX_WORKERS
+        )
+        return Response(LibraryImportSerializer(library_import).data)
+
+    @action(detail=False)
+    def export(self, request):
+        """
+        Stream the user's whole library as NDJSON (?file_format=ndjson, all
+        record types) or CSV (?file_format=csv&type=books|shelves|sessions|
+        notes|quotes|reviews).
+        """
+        export_format = request.query_params.get('file_format', NDJSON)
+        try:
+            chunks, content_type = export_stream(
+                request.user,
+                export_format,
+                request.query_params.get('type'),
+                chunk_size=settings.EXPORT_CHUNK_SIZE
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        extension = 'csv' if export_format == CSV else 'ndjson'
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="library.{extension}"'
+        return response
+
     @action(detail=False)
+    @conditional(statistics_etag)
     def statistics(self, request):
-        user_books = self.get_queryset()
-        stats = {
-            'total_books': user_books.count(),
-            'books_by_status': user_books.values('status').annotate(count=Count('id')),
-            'average_rating': user_books.exclude(rating=None).aggregate(Avg('rating')),
-            'currently_reading': user_books.filter(status='reading').count()
-        }
-        return Response(stats)
-
-class ReadingSessionViewSet(viewsets.ModelViewSet):
+        # Served from the materialized ReadingStatistics row
+        return Response(statistics_payload(get_statistics(request.user)))
+
+class ReadingSessionViewSet(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = ReadingSessionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-id',)
 
     def get_queryset(self):
         return ReadingSession.objects.filter(user_book__user=self.request.user)
 
-class NoteViewSet(viewsets.ModelViewSet):
+class NoteViewSet(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = NoteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         return Note.objects.filter(user_book__user=self.request.user)
@@ -135,18 +444,45 @@ class NoteViewSet(viewsets.ModelViewSet):
         )
         serializer.save(user_book=user_book)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ReplicaReadMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticated]
+    replica_actions = ('list',)
+    cursor_ordering = ('-created_at', '-pk')
 
     def get_queryset(self):
         if self.action == 'list':
-            # For list action, include public reviews from other users
-            return Review.objects.filter(
-                is_public=True
-            ).select_related('user_book__user', 'user_book__book')
+            # Public reviews from every user, read from the denormalized
+            # feed so the list never joins users, books or user books.
+            # Filters are resolved to ids first for the same reason.
+            queryset = ReviewFeedEntry.objects.all()
+            book = self.request.query_params.get('book')
+            if book:
+                queryset = queryset.filter(book_id=book) if book.isdigit() else queryset.none()
+            author = self.request.query_params.get('author')
+            if author:
+                book_ids = list(
+                    Book.objects.filter(normalized_authors__name=author).values_list('pk', flat=True)
+                )
+                queryset = queryset.filter(book_id__in=book_ids)
+            username = self.request.query_params.get('user')
+            if username:
+                user_id = User.objects.filter(username=username).values_list('pk', flat=True).first()
+                queryset = queryset.filter(user_id=user_id) if user_id else queryset.none()
+            return queryset
         # For other actions, only show user's own reviews
-        return Review.objects.filter(user_book__user=self.request.user)
+        return Review.objects.filter(
+            user_book__user=self.request.user
+        ).select_related('user_book__user')
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ReviewFeedEntrySerializer
+        return super().get_serializer_class()
+
+    @cache_response(PUBLIC_REVIEWS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         user_book = get_object_or_404(
@@ -156,9 +492,10 @@ class ReviewViewSet(viewsets.ModelViewSet):
         )
         serializer.save(user_book=user_book)
 
-class QuoteViewSet(viewsets.ModelViewSet):
+class QuoteViewSet(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = QuoteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         return Quote.objects.filter(user_book__user=self.request.user)
@@ -169,4 +506,52 @@ class QuoteViewSet(viewsets.ModelViewSet):
             id=self.request.data.get('user_book'),
             user=self.request.user
         )
-        serializer.save(user_book=user_book)
\ No newline at end of file
+        serializer.save(user_book=user_book)
+
+class JobViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Status of the background jobs the user started.
+    """
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-created_at', '-id')
+
+    def get_queryset(self):
+        queryset = Job.objects.filter(user=self.request.user)
+        job_status = self.request.query_params.get('status')
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        return queryset
+
+
+class CanReadMetrics(permissions.BasePermission):
+    """
+    Staff users, or scrapers sending "Authorization: Bearer <METRICS_TOKEN>".
+    Bearer requests are rejected while METRICS_TOKEN is unset.
+    """
+
+    def has_permission(self, request, view):
+        authorization = request.headers.get('Authorization', '')
+        if authorization.startswith('Bearer '):
+            token = getattr(settings, 'METRICS_TOKEN', '')
+            return bool(token) and hmac.compare_digest(
+                authorization[len('Bearer '):].encode(), token.encode()
+            )
+        return bool(request.user and request.user.is_staff)
+
+@api_view(['GET'])
+@permission_classes([CanReadMetrics])
+def metrics(request):
+    """
+    Request metrics of this worker process in the Prometheus text format.
+    """
+    return HttpResponse(registry.render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+@api_view(['GET'])
+@permission_classes([CanReadMetrics])
+def slow_requests(request):
+    """
+    The most recent sampled slow requests, newest first, with their
+    slowest queries.
+    """
+    return Response(registry.samples())
@@ -20,7 +20,7 @@ import {
   CircularProgress,
   Backdrop
 } from '@mui/material';
-import api from '../../services/api';
+import api, { getAll, thumbnailUrl } from '../../services/api';
 
 function TabPanel({ children, value, index }) {
   return (
@@ -71,25 +71,25 @@ function BookDetail() {
       const bookResponse = await api.get(`/api/books/${id}/`);
       setBook(bookResponse.data);
 
-      const userBooksResponse = await api.get('/api/userbooks/', {
+      const userBooks = await getAll('/api/userbooks/', {
         params: { book: id }
       });
       
-      if (userBooksResponse.data.length > 0) {
-        const userBookData = userBooksResponse.data[0];
+      if (userBooks.length > 0) {
+        const userBookData = userBooks[0];
         setUserBook(userBookData);
         setCurrentPage(userBookData.current_page);
 
         try {
-          const [notesRes, reviewsRes, quotesRes] = await Promise.all([
-            api.get('/api/notes/', { params: { user_book: userBookData.id } }),
-            api.get('/api/reviews/', { params: { user_book: userBookData.id } }),
-            api.get('/api/quotes/', { params: { user_book: userBookData.id } })
+          const [bookNotes, bookReviews, bookQuotes] = await Promise.all([
+            getAll('/api/notes/', { params: { user_book: userBookData.id } }),
+            getAll('/api/reviews/', { params: { user_book: userBookData.id } }),
+            getAll('/api/quotes/', { params: { user_book: userBookData.id } })
           ]);
 
-          setNotes(notesRes.data);
-          setReviews(reviewsRes.data);
-          setQuotes(quotesRes.data);
+          setNotes(bookNotes);
+          setReviews(bookReviews);
+          setQuotes(bookQuotes);
         } catch (error) {
           showSnackbar('Error loading some book details', 'warning');
         }
@@ -226,7 +226,7 @@ function BookDetail() {
             <Paper sx={{ p: 2 }}>
               <Box
                 component="img"
-                src={book.thumbnail_url || '/book-placeholder.png'}
+                src={thumbnailUrl(book) || '/book-placeholder.png'}
                 alt={book.title}
                 sx={{ width: '100%', height: 'auto', mb: 2 }}
                 onError={(e) => {
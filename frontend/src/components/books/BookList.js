@@ -22,7 +22,7 @@ import {
   Skeleton,
 } from '@mui/material';
 import { Add as AddIcon } from '@mui/icons-material';
-import api from '../../services/api';
+import api, { getAll, thumbnailUrl } from '../../services/api';
 
 function BookList() {
   const [books, setBooks] = useState([]);
@@ -48,8 +48,7 @@ function BookList() {
     setLoading(true);
     setError(null);
     try {
-      const response = await api.get('/api/userbooks/');
-      setBooks(response.data);
+      setBooks(await getAll('/api/userbooks/'));
     } catch (error) {
       setError('Failed to load your books. Please try again later.');
       showSnackbar('Error loading books', 'error');
@@ -162,7 +161,7 @@ function BookList() {
                 <CardMedia
                   component="img"
                   height="140"
-                  image={userBook.book_details.thumbnail_url || '/book-placeholder.png'}
+                  image={thumbnailUrl(userBook.book_details) || '/book-placeholder.png'}
                   alt={userBook.book_details.title}
                   sx={{ objectFit: 'contain', pt: 2 }}
                   onError={(e) => {
@@ -18,7 +18,7 @@ import {
   Backdrop,
 } from '@mui/material';
 import { Search as SearchIcon } from '@mui/icons-material';
-import api from '../../services/api';
+import api, { thumbnailUrl } from '../../services/api';
 
 function BookSearch() {
   const [query, setQuery] = useState('');
@@ -138,7 +138,7 @@ function BookSearch() {
                 <CardMedia
                   component="img"
                   height="140"
-                  image={book.thumbnail_url || '/book-placeholder.png'}
+                  image={thumbnailUrl(book) || '/book-placeholder.png'}
                   alt={book.title}
                   sx={{ objectFit: 'contain', pt: 2 }}
                   onError={(e) => {
@@ -30,7 +30,7 @@ import {
   Delete as DeleteIcon,
   Add as AddIcon 
 } from '@mui/icons-material';
-import api from '../../services/api';
+import api, { getAll, thumbnailUrl } from '../../services/api';
 
 function ShelfDetail() {
   const { id } = useParams();
@@ -58,12 +58,12 @@ function ShelfDetail() {
     setLoading(true);
     setError(null);
     try {
-      const [shelfResponse, booksResponse] = await Promise.all([
+      const [shelfResponse, shelfBooks] = await Promise.all([
         api.get(`/api/shelves/${id}/`),
-        api.get(`/api/shelves/${id}/books/`)
+        getAll(`/api/shelves/${id}/books/`)
       ]);
       setShelf(shelfResponse.data);
-      setBooks(booksResponse.data);
+      setBooks(shelfBooks);
     } catch (error) {
       if (error.response?.status === 404) {
         setError('Shelf not found');
@@ -83,9 +83,9 @@ function ShelfDetail() {
   const handleOpenAddBookDialog = useCallback(async () => {
     setActionLoading(true);
     try {
-      const response = await api.get('/api/userbooks/');
+      const userBooks = await getAll('/api/userbooks/');
       const shelfBookIds = new Set(books.map(book => book.id));
-      const availableBooks = response.data.filter(book => !shelfBookIds.has(book.id));
+      const availableBooks = userBooks.filter(book => !shelfBookIds.has(book.id));
       setAvailableBooks(availableBooks);
       setAddBookDialogOpen(true);
     } catch (error) {
@@ -190,7 +190,7 @@ function ShelfDetail() {
                     <CardMedia
                       component="img"
                       height="140"
-                      image={userBook.book_details.thumbnail_url || '/book-placeholder.png'}
+                      image={thumbnailUrl(userBook.book_details) || '/book-placeholder.png'}
                       alt={userBook.book_details.title}
                       sx={{ objectFit: 'contain', pt: 2 }}
                       onError={(e) => {
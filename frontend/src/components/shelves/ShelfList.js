@@ -22,7 +22,7 @@ import {
   Skeleton
 } from '@mui/material';
 import { Add as AddIcon, Delete as DeleteIcon, Edit as EditIcon } from '@mui/icons-material';
-import api from '../../services/api';
+import api, { getAll } from '../../services/api';
 
 function ShelfList() {
   const [shelves, setShelves] = useState([]);
@@ -50,8 +50,7 @@ function ShelfList() {
     setLoading(true);
     setError(null);
     try {
-      const response = await api.get('/api/shelves/');
-      setShelves(response.data);
+      setShelves(await getAll('/api/shelves/'));
     } catch (error) {
       setError('Failed to load shelves. Please try again later.');
       showSnackbar('Error loading shelves', 'error');
@@ -9,4 +9,27 @@ const api = axios.create({
   withCredentials: true
 });
 
-export default api;
\ No newline at end of file
+export default api;
+// List endpoints are cursor-paginated ({ next, previous, results }).
+// Follows `next` links and returns every row of a list endpoint.
+export const getAll = async (url, config = {}) => {
+  let response = await api.get(url, config);
+  if (Array.isArray(response.data)) {
+    return response.data;
+  }
+  const rows = [...response.data.results];
+  while (response.data.next) {
+    response = await api.get(response.data.next);
+    rows.push(...response.data.results);
+  }
+  return rows;
+};
+
+// Cover images go through the API's thumbnail cache when the book is in the
+// local catalog; remote search results fall back to Google's URL.
+export const thumbnailUrl = (book) => {
+  if (!book || !book.thumbnail_url) {
+    return null;
+  }
+  return book.id ? `${api.defaults.baseURL}/api/books/${book.id}/thumbnail/` : book.thumbnail_url;
+};